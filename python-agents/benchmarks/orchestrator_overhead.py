@@ -0,0 +1,93 @@
+"""
+Orchestrator Overhead Benchmark
+Per-request orchestration cost of direct dispatch vs the LangGraph workflow
+
+The agent answers instantly, so the timings are pure orchestration
+overhead (state construction, routing, graph execution).
+
+Run from python-agents/:
+    python benchmarks/orchestrator_overhead.py --requests 5000 --concurrency 1
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import logging
+from typing import Dict, List
+
+import structlog
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.orchestrator import Orchestrator, AgentState  # noqa: E402
+
+
+class EchoAgent:
+    """Agent with no work of its own"""
+    name = "Echo"
+    role = "Benchmark"
+    
+    async def process(self, state: AgentState) -> str:
+        return state.user_input
+
+
+async def run_mode(mode: str, requests: int, concurrency: int, warmup: int) -> Dict[str, float]:
+    orchestrator = Orchestrator(execution_mode=mode)
+    orchestrator.registry.register("marie", EchoAgent())
+    
+    for i in range(warmup):
+        await orchestrator.invoke("marie", "bonjour", f"warmup-{i}")
+    
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await orchestrator.invoke("marie", "bonjour", f"session-{i}")
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+            assert result["success"], result
+    
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies),
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "throughput_rps": requests / elapsed
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+    
+    # Keep logging out of the measurement
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    
+    results = {}
+    for mode in ("graph", "direct"):
+        results[mode] = await run_mode(mode, args.requests, args.concurrency, args.warmup)
+    
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'mode':<8} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'req/s':>10}")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<8} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} "
+            f"{stats['p99_us']:>10.1f} {stats['throughput_rps']:>10.0f}"
+        )
+    speedup = results["graph"]["mean_us"] / results["direct"]["mean_us"]
+    print(f"direct dispatch: {speedup:.1f}x less orchestration overhead per request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,184 @@
+"""
+Agent State Allocation Benchmark
+Memory allocated per request by the orchestrator's state handling
+
+The agents answer instantly after reading the conversation history,
+so what's measured is the state plumbing: state construction, graph
+steps, fan-out branch snapshots and history reads.
+
+For each path and history length it reports, per request:
+- peak_kb: high-water mark of memory allocated during the request
+- live_blocks / live_kb: allocations alive while the agents run
+  (what every concurrent request holds while waiting on the LLM)
+
+Run from python-agents/:
+    python benchmarks/state_allocations.py --requests 200 --history 0 20 100
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.base import BaseAgent  # noqa: E402
+from src.orchestrator import Orchestrator, AgentState  # noqa: E402
+
+FANOUT_AGENTS = ["marie", "hugo", "lucas"]
+
+
+class HistoryAgent:
+    """Agent that reads the history, like a real agent building its prompt"""
+    name = "History"
+    role = "Benchmark"
+    
+    def __init__(self, probe: "LiveProbe"):
+        self.probe = probe
+    
+    async def process(self, state: AgentState) -> str:
+        history = BaseAgent._get_conversation_history(self, state)
+        self.probe.sample()
+        return f"{len(history)} messages"
+
+
+class LiveProbe:
+    """Measures what's allocated since `arm()` at the moment agents run"""
+    
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self.blocks = 0
+        self.size = 0
+    
+    def arm(self) -> None:
+        self._baseline = self._snapshot()
+        self.blocks = self.size = 0
+    
+    def disarm(self) -> None:
+        self._baseline = None
+    
+    def sample(self) -> None:
+        # Fan-out branches run concurrently: keep the largest sample
+        if self._baseline is None:
+            return
+        diff = self._snapshot().compare_to(self._baseline, "filename")
+        blocks = sum(stat.count_diff for stat in diff)
+        size = sum(stat.size_diff for stat in diff)
+        if size > self.size:
+            self.blocks, self.size = blocks, size
+    
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ])
+
+
+def make_history(length: int) -> Tuple[Dict[str, Any], ...]:
+    """Alternating user / assistant turns of realistic size"""
+    return tuple(
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i}: " + "bonjour, je voudrais un devis pour un site e-commerce " * 3,
+            "timestamp": "2026-01-01T12:00:00"
+        }
+        for i in range(length)
+    )
+
+
+async def run_path(
+    orchestrator: Orchestrator,
+    probe: LiveProbe,
+    path: str,
+    history: Tuple[Dict[str, Any], ...],
+    requests: int,
+    probes: int
+) -> Dict[str, float]:
+    async def one(i: int) -> None:
+        if path == "fanout":
+            state = AgentState(
+                messages=history,
+                session_id=f"session-{i}",
+                current_agent="fanout",
+                user_input="bonjour",
+                context={"page": "/"},
+                metadata={"fanout_agents": FANOUT_AGENTS, "branch_timeout": 5.0}
+            )
+            await orchestrator.workflows["fanout"].ainvoke(state)
+            return
+        state = AgentState(
+            messages=history,
+            session_id=f"session-{i}",
+            current_agent="marie",
+            user_input="bonjour",
+            context={"page": "/"}
+        )
+        if path == "graph":
+            await orchestrator.workflows["default"].ainvoke(state)
+        else:
+            await orchestrator._run_agent("marie", state)
+    
+    for i in range(20):
+        await one(i)
+    
+    peaks: List[int] = []
+    for i in range(requests):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        await one(i)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - start)
+    
+    blocks: List[int] = []
+    sizes: List[int] = []
+    for i in range(probes):
+        probe.arm()
+        await one(i)
+        blocks.append(probe.blocks)
+        sizes.append(probe.size)
+    probe.disarm()
+    
+    return {
+        "peak_kb": sum(peaks) / len(peaks) / 1024,
+        "live_blocks": sum(blocks) / len(blocks),
+        "live_kb": sum(sizes) / len(sizes) / 1024
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per measurement")
+    parser.add_argument("--probes", type=int, default=20, help="Requests sampled for live allocations")
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 20, 100], help="History lengths")
+    args = parser.parse_args()
+    
+    # Keep logging out of the measurements
+    logging.disable(logging.CRITICAL)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    
+    probe = LiveProbe()
+    orchestrator = Orchestrator(execution_mode="direct")
+    for agent_id in FANOUT_AGENTS:
+        orchestrator.registry.register(agent_id, HistoryAgent(probe))
+    
+    tracemalloc.start()
+    print(f"{'path':<8} {'history':>8} {'peak_kb':>10} {'live_blocks':>12} {'live_kb':>10}")
+    for length in args.history:
+        history = make_history(length)
+        for path in ("direct", "graph", "fanout"):
+            result = await run_path(orchestrator, probe, path, history, args.requests, args.probes)
+            print(
+                f"{path:<8} {length:>8} {result['peak_kb']:>10.1f} "
+                f"{result['live_blocks']:>12.0f} {result['live_kb']:>10.1f}"
+            )
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,10 +4,16 @@ Agents module
 
 from .base import BaseAgent, AgentConfig
 from .marie_support import MarieAgent, get_marie_agent
+from .templates import ResponseTemplates, get_response_templates
+from .profiles import GenerationProfile, GenerationProfiles
 
 __all__ = [
     "BaseAgent",
     "AgentConfig",
     "MarieAgent",
-    "get_marie_agent"
+    "get_marie_agent",
+    "ResponseTemplates",
+    "get_response_templates",
+    "GenerationProfile",
+    "GenerationProfiles"
 ]
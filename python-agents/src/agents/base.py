@@ -4,15 +4,21 @@ All agents inherit from this base class
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 import structlog
 
 from ..orchestrator import AgentState
+from ..llm.models import LLMResponse, SystemPrompt, TokenUsage
+from .profiles import GenerationProfile
 
 logger = structlog.get_logger()
 
 
+# Keys of a message as sent to the LLM
+HISTORY_KEYS = {"role", "content"}
+
+
 @dataclass
 class AgentConfig:
     """Configuration for an agent"""
@@ -23,6 +29,8 @@ class AgentConfig:
     temperature: float = 0.7
     max_tokens: int = 2048
     system_prompt: str = ""
+    cache_responses: bool = False  # Opt in to the LLM response cache
+    max_input_tokens: int = 0  # Prompt token budget (0 = model context window)
 
 
 class BaseAgent(ABC):
@@ -38,6 +46,9 @@ class BaseAgent(ABC):
     - NOAH: Analytics
     """
     
+    # Background actions `run_action` handles ("chat" is always available)
+    actions: Tuple[str, ...] = ()
+    
     def __init__(self, config: AgentConfig):
         self.config = config
         self.name = config.name
@@ -59,6 +70,56 @@ class BaseAgent(ABC):
         """
         pass
     
+    async def process_stream(self, state: AgentState) -> AsyncIterator[str]:
+        """
+        Process the agent state and stream the response.
+        
+        Agents without token streaming yield their full response as a
+        single chunk, so every agent can be served by streaming endpoints.
+        
+        Args:
+            state: Current agent state containing user input and context
+            
+        Yields:
+            Response text chunks
+        """
+        yield await self.process(state)
+    
+    def is_low_cost(self, message: str) -> bool:
+        """
+        Whether a message will be answered without an LLM call.
+        
+        Asked by load shedding under pressure, so it must be cheap;
+        agents with template or cached answers override it.
+        """
+        return False
+    
+    def may_answer_from_cache(self, message: str) -> bool:
+        """
+        Whether a cache might answer a message without an LLM call.
+        
+        Asked by load shedding under pressure, for messages that aren't
+        low-cost: False sheds them at once. Agents with caches override it.
+        """
+        return False
+    
+    async def run_action(self, action: str, params: Dict[str, Any]) -> Any:
+        """
+        Run a named action outside the chat flow (background jobs).
+        
+        Agents with long-running actions (quote PDFs, content
+        generation, email batches) override this and list them in
+        `actions`, so unknown actions are refused at submission.
+        
+        Args:
+            action: Action name
+            params: Action parameters
+            
+        Returns:
+            JSON-serializable result
+        """
+        raise ValueError(f"{self.name} has no action '{action}'")
+    
     @abstractmethod
     def get_system_prompt(self) -> str:
         """Get the system prompt for this agent"""
@@ -67,46 +128,136 @@ class BaseAgent(ABC):
     async def invoke_llm(
         self,
         messages: List[Dict[str, str]],
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[SystemPrompt] = None,
+        profile: Optional[GenerationProfile] = None,
+        session_id: Optional[str] = None
     ) -> str:
         """
         Invoke the LLM with the given messages.
         
         Args:
             messages: List of message dicts with 'role' and 'content'
-            system_prompt: Optional override for system prompt
+            system_prompt: Optional override for system prompt (text or cacheable blocks)
+            profile: Optional generation profile overriding model, temperature and max_tokens
+            session_id: Conversation the call is metered against
             
         Returns:
             LLM response text
         """
+        response = await self.complete_llm(messages, system_prompt, profile, session_id)
+        return response.text
+    
+    async def complete_llm(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[SystemPrompt] = None,
+        profile: Optional[GenerationProfile] = None,
+        session_id: Optional[str] = None
+    ) -> LLMResponse:
+        """
+        Invoke the LLM and return the full result (text, token usage, latency).
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            system_prompt: Optional override for system prompt (text or cacheable blocks)
+            profile: Optional generation profile overriding model, temperature and max_tokens
+            session_id: Conversation the call is metered against
+            
+        Returns:
+            LLMResponse
+        """
         from ..llm import get_llm_router
         
         router = get_llm_router()
         prompt = system_prompt or self.get_system_prompt()
+        model, temperature, max_tokens = self._generation_settings(profile)
         
-        result = await router.chat(
+        return await router.complete(
             messages=messages,
             system_prompt=prompt,
-            model=self.config.model,
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cache=self.config.cache_responses,
+            cache_namespace=self.cache_namespace(),
+            agent=self.name.lower(),
+            session_id=session_id
         )
+    
+    async def invoke_llm_stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[SystemPrompt] = None,
+        profile: Optional[GenerationProfile] = None,
+        session_id: Optional[str] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> AsyncIterator[str]:
+        """
+        Invoke the LLM and stream the response.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            system_prompt: Optional override for system prompt (text or cacheable blocks)
+            profile: Optional generation profile overriding model, temperature and max_tokens
+            session_id: Conversation the call is metered against
+            usage: Filled with the token usage once the stream is done
+            
+        Yields:
+            LLM response text chunks
+        """
+        from ..llm import get_llm_router
+        
+        router = get_llm_router()
+        prompt = system_prompt or self.get_system_prompt()
+        model, temperature, max_tokens = self._generation_settings(profile)
         
-        return result
+        async for chunk in router.chat_stream(
+            messages=messages,
+            system_prompt=prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cache=self.config.cache_responses,
+            cache_namespace=self.cache_namespace(),
+            agent=self.name.lower(),
+            session_id=session_id,
+            usage=usage
+        ):
+            yield chunk
+    
+    def _generation_settings(self, profile: Optional[GenerationProfile]) -> Tuple[str, float, int]:
+        """Model, temperature and max_tokens for a call"""
+        if profile is None:
+            return self.config.model, self.config.temperature, self.config.max_tokens
+        return profile.model, profile.temperature, profile.max_tokens
+    
+    def cache_namespace(self) -> str:
+        """
+        Namespace for this agent's cached LLM responses.
+        
+        Agents whose answers depend on external data (e.g. a knowledge
+        base) should include its version so updates invalidate the cache.
+        """
+        return self.name.lower()
     
     def _extract_user_message(self, state: AgentState) -> str:
         """Extract the user message from state"""
         return state.user_input
     
     def _get_conversation_history(self, state: AgentState) -> List[Dict[str, str]]:
-        """Get conversation history from state"""
-        history = []
-        for msg in state.messages:
-            history.append({
+        """
+        Get conversation history from state.
+        
+        Messages already in LLM shape (just role and content) are shared,
+        not copied; the others are reduced to it.
+        """
+        return [
+            msg if msg.keys() == HISTORY_KEYS else {
                 "role": msg.get("role", "user"),
                 "content": msg.get("content", "")
-            })
-        return history
+            }
+            for msg in state.messages
+        ]
     
     def __repr__(self) -> str:
         return f"<Agent {self.name}: {self.role}>"
@@ -3,20 +3,38 @@ MARIE - Support Chatbot Agent v2.0
 Enhanced with RAG, Tools, Memory, Sentiment Analysis, and Guardrails
 """
 
-from typing import List, Dict, Any, Optional
+import os
+import time
+import asyncio
+import hashlib
+from typing import AsyncIterator, List, Dict, Any, Optional
+from dataclasses import dataclass, field
 import structlog
 
 from .base import BaseAgent, AgentConfig
-from ..orchestrator import AgentState
-from ..rag import get_rag_retriever
-from ..memory import get_conversation_memory, get_short_term_memory
-from ..analysis import get_text_analyzer, Sentiment, Intent
+from .templates import get_response_templates
+from .profiles import GenerationProfile, build_marie_profiles
+from ..orchestrator import AgentState, deadline
+from ..orchestrator.deadline import DeadlineExceeded
+from ..orchestrator.shedding import LoadShed
+from ..rag import get_rag_retriever, RAGResult
+from ..memory import get_conversation_memory, get_short_term_memory, get_semantic_cache
+from ..analysis import get_text_analyzer, Sentiment, Intent, AnalysisResult
 from ..guardrails import get_guardrails
 from ..tools import get_tool, PriceCalculatorTool
+from ..llm.models import SystemBlock, TokenUsage
+from ..llm.metering import BudgetStatus, get_usage_meter
+from ..llm.context import estimate_tokens, get_context_packer, input_budget
 
 logger = structlog.get_logger()
 
 
+# Time left in the request budget below which optional stages are skipped
+RAG_MIN_BUDGET_SECONDS = 3.0
+TOOL_MIN_BUDGET_SECONDS = 2.0
+LLM_MIN_BUDGET_SECONDS = 1.0
+
+
 MARIE_SYSTEM_PROMPT_V2 = """Tu es MARIE, l'assistante virtuelle de Web Shop, une agence web premium française.
 
 🎯 TA PERSONNALITÉ:
@@ -54,6 +72,18 @@ Options: SEO (150€), Maintenance (49€/mois), Multilangue (200€), Blog (100
 """
 
 
+@dataclass
+class PreparedTurn:
+    """Output of MARIE's pre-generation pipeline for one user turn"""
+    analysis: Optional[AnalysisResult] = None
+    system_prompt: List[SystemBlock] = field(default_factory=list)
+    llm_messages: List[Dict[str, str]] = field(default_factory=list)
+    reply: Optional[str] = None  # Set when the turn is answered without the LLM
+    question: str = ""
+    semantic_key: Optional[str] = None  # Set when the answer may be reused for paraphrases
+    profile: Optional[GenerationProfile] = None
+
+
 class MarieAgentV2(BaseAgent):
     """
     MARIE - Enhanced Support Chatbot Agent v2.0
@@ -71,8 +101,11 @@ class MarieAgentV2(BaseAgent):
             name="MARIE",
             role="Support Chatbot",
             description="Agent de support client intelligent avec RAG, outils et analyse de sentiment",
+            model=os.getenv("MARIE_MODEL", AgentConfig.model),
             temperature=0.7,
-            max_tokens=600
+            max_tokens=600,
+            cache_responses=True,
+            max_input_tokens=4000
         )
         super().__init__(config)
         
@@ -80,8 +113,17 @@ class MarieAgentV2(BaseAgent):
         self.rag = get_rag_retriever()
         self.memory = get_conversation_memory()
         self.short_memory = get_short_term_memory()
+        self.semantic_cache = get_semantic_cache()
+        self.templates = get_response_templates()
+        self.context_packer = get_context_packer()
+        self.profiles = build_marie_profiles(
+            self.config.model, self.config.max_tokens, self.config.temperature
+        )
+        self.usage_meter = get_usage_meter()
         self.analyzer = get_text_analyzer()
         self.guardrails = get_guardrails()
+        self._invalidations: set = set()
+        self.rag.kb.subscribe(self._forget_knowledge)
         
         # Escalation keywords
         self.escalation_keywords = [
@@ -96,13 +138,46 @@ class MarieAgentV2(BaseAgent):
         """Get MARIE's enhanced system prompt"""
         return MARIE_SYSTEM_PROMPT_V2
     
+    def cache_namespace(self) -> str:
+        """Cached answers are tied to the knowledge base they were built from"""
+        return f"{self.name.lower()}:{self.rag.kb.version}"
+    
+    def _forget_knowledge(self, version: str) -> None:
+        """Drop the answers cached from a knowledge base version that was replaced"""
+        from ..llm import get_llm_router
+        
+        removed = self.semantic_cache.invalidate(f"{version}|")
+        logger.info(f"Knowledge base {version} replaced: {removed} semantic cache entries dropped")
+        invalidation = get_llm_router().cache.invalidate(namespace=f"{self.name.lower()}:{version}")
+        try:
+            task = asyncio.get_running_loop().create_task(invalidation)
+        except RuntimeError:
+            # Updated outside the server's event loop
+            asyncio.run(invalidation)
+            return
+        self._invalidations.add(task)
+        task.add_done_callback(self._invalidations.discard)
+    
+    def is_low_cost(self, message: str) -> bool:
+        """Greetings, thanks and goodbyes are answered from templates"""
+        return self.templates.would_answer(message, self.analyzer.analyze(message))
+    
+    def may_answer_from_cache(self, message: str) -> bool:
+        """Blocked messages, and paraphrases of questions in the semantic cache"""
+        input_check = self.guardrails.check_input(message)
+        if not input_check.passed:
+            return True
+        safe_message = input_check.sanitized_text or message
+        analysis = self.analyzer.analyze(safe_message)
+        return self.semantic_cache.may_contain(self._semantic_key_prefix(analysis), safe_message)
+    
     async def process(self, state: AgentState) -> str:
         """
         Process user message with full enhancement pipeline.
         
         Pipeline:
         1. Input guardrails check
-        2. Sentiment + Intent analysis
+        2. Sentiment + Intent analysis (trivial turns answered from templates)
         3. RAG knowledge retrieval
         4. Tool usage if needed
         5. Memory context
@@ -114,17 +189,97 @@ class MarieAgentV2(BaseAgent):
             
         Returns:
             MARIE's enhanced response
+            
+        Raises:
+            LoadShed: Admitted under load for a cached answer, and none was found
         """
+        turn = await self._prepare_turn(state)
+        if turn.reply is not None:
+            return turn.reply
+        
+        # ==== 6. LLM GENERATION ====
+        try:
+            started = time.perf_counter()
+            result = await self.complete_llm(
+                turn.llm_messages, turn.system_prompt, turn.profile, state.session_id
+            )
+            generation_ms = (time.perf_counter() - started) * 1000
+            self.profiles.observe(turn.profile, generation_ms, self._output_tokens(result.usage, result.text))
+            return self._finalize_response(state, turn, result.text, generation_ms)
+            
+        except LoadShed:
+            self._withdraw_question(state, turn)
+            raise
+        except Exception as e:
+            logger.error(f"MARIE v2 error: {e}")
+            return self._get_fallback_response(turn.analysis.sentiment)
+    
+    async def process_stream(self, state: AgentState) -> AsyncIterator[str]:
+        """
+        Same pipeline as `process`, but streams the LLM answer.
+        
+        Output guardrails and the memory write run once the stream
+        has finished, on the full response text. A stream that fails
+        before its first chunk falls back like `process`; one that
+        fails partway raises, and its partial answer is neither
+        remembered nor cached.
+        
+        Args:
+            state: Agent state with user input
+            
+        Yields:
+            MARIE's response text chunks
+            
+        Raises:
+            LoadShed: Admitted under load for a cached answer, and none was found
+            Exception: The LLM stream failed after yielding some chunks
+        """
+        turn = await self._prepare_turn(state)
+        if turn.reply is not None:
+            yield turn.reply
+            return
+        
+        # ==== 6. LLM GENERATION (streamed) ====
+        chunks: List[str] = []
+        usage = TokenUsage()
+        started = time.perf_counter()
+        try:
+            async for chunk in self.invoke_llm_stream(
+                turn.llm_messages, turn.system_prompt, turn.profile, state.session_id, usage
+            ):
+                chunks.append(chunk)
+                yield chunk
+        except LoadShed:
+            self._withdraw_question(state, turn)
+            raise
+        except Exception as e:
+            if chunks:
+                # The client already has part of the answer: let the
+                # endpoint report the failure instead of a finished turn
+                logger.error(f"MARIE v2 stream cut off after {len(chunks)} chunks: {e}")
+                raise
+            logger.error(f"MARIE v2 stream error: {e}")
+            yield self._get_fallback_response(turn.analysis.sentiment)
+            return
+        
+        generation_ms = (time.perf_counter() - started) * 1000
+        response = "".join(chunks)
+        self.profiles.observe(turn.profile, generation_ms, self._output_tokens(usage, response))
+        self._finalize_response(state, turn, response, generation_ms)
+    
+    async def _prepare_turn(self, state: AgentState) -> "PreparedTurn":
+        """Run every pipeline stage that comes before LLM generation"""
         user_message = self._extract_user_message(state)
         session_id = state.session_id
         
         logger.info(f"MARIE v2 processing: {user_message[:50]}...")
         
         # ==== 1. INPUT GUARDRAILS ====
+        deadline.check("guardrails")
         input_check = self.guardrails.check_input(user_message)
         if not input_check.passed:
             logger.warning(f"Input blocked: {input_check.issues}")
-            return self._get_blocked_response()
+            return PreparedTurn(reply=self._get_blocked_response())
         
         # Use sanitized input
         safe_message = input_check.sanitized_text or user_message
@@ -147,79 +302,199 @@ class MarieAgentV2(BaseAgent):
         # Check if needs escalation
         if analysis.needs_human or self._should_escalate(safe_message):
             state.should_escalate = True
-            return self._get_escalation_response(analysis.sentiment)
+            return PreparedTurn(
+                analysis=analysis,
+                reply=self._get_escalation_response(analysis.sentiment)
+            )
+        
+        # Greetings, thanks and goodbyes are answered from templates
+        template_reply = self.templates.respond(safe_message, analysis)
+        if template_reply is not None:
+            self._remember(state, "user", safe_message)
+            self._remember(state, "assistant", template_reply)
+            return PreparedTurn(analysis=analysis, reply=template_reply)
+        
+        # Sessions over their token budget: template reply, or cheap model
+        budget = self.usage_meter.budget_status(session_id)
+        if budget == BudgetStatus.EXHAUSTED:
+            logger.warning(f"💸 Session {session_id} over its token budget, LLM skipped")
+            reply = self._get_budget_exhausted_response()
+            self._remember(state, "user", safe_message)
+            self._remember(state, "assistant", reply)
+            return PreparedTurn(analysis=analysis, reply=reply)
         
         # ==== 3. RAG KNOWLEDGE RETRIEVAL ====
-        rag_result = await self.rag.retrieve(safe_message, top_k=3)
+        # Optional stages are skipped when the request is short on time
+        rag_result = RAGResult(query=safe_message, documents=[], context="", source_count=0)
+        if deadline.has_budget(RAG_MIN_BUDGET_SECONDS):
+            try:
+                rag_result = await deadline.within(self.rag.retrieve(safe_message, top_k=3), "rag")
+            except DeadlineExceeded:
+                logger.warning("⏱️ RAG cut off by the request deadline")
+        else:
+            logger.warning("⏱️ Low time budget, skipping RAG")
         
         # ==== 4. TOOL USAGE ====
         tool_context = ""
-        if analysis.intent == Intent.ASKING_PRICE:
-            tool_context = await self._use_price_tool(safe_message)
+        if analysis.intent == Intent.ASKING_PRICE and deadline.has_budget(TOOL_MIN_BUDGET_SECONDS):
+            try:
+                tool_context = await deadline.within(self._use_price_tool(safe_message), "tools")
+            except DeadlineExceeded:
+                logger.warning("⏱️ Price tool cut off by the request deadline")
         
         # ==== 5. BUILD CONTEXT ====
         # Get conversation history
-        self.memory.add_message(session_id, "user", safe_message)
+        if state.record_history:
+            is_first_turn = not self.memory.get_messages(session_id, last_n=1)
+            self.memory.add_message(session_id, "user", safe_message)
+        else:
+            # Recorded by the caller already (fan-out branch)
+            is_first_turn = len(self.memory.get_messages(session_id, last_n=2)) <= 1
+        
+        # Semantic cache: only standalone first turns, since earlier
+        # turns can change what a short question means
+        semantic_key = None
+        if is_first_turn:
+            semantic_key = self._semantic_context_key(analysis, rag_result, tool_context)
+            cached = self.semantic_cache.lookup(semantic_key, safe_message)
+            if cached is not None:
+                self._remember(state, "assistant", cached)
+                return PreparedTurn(analysis=analysis, reply=cached)
+        
         history = self.memory.get_messages(session_id, last_n=6)
         
+        # Convert history to LLM format
+        llm_messages = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in history
+            if msg["role"] in ["user", "assistant"]
+        ]
+        
+        # Not enough time left for a useful answer
+        if not deadline.has_budget(LLM_MIN_BUDGET_SECONDS):
+            logger.warning("⏱️ Request deadline too close for the LLM, answering with fallback")
+            return PreparedTurn(analysis=analysis, reply=self._get_fallback_response(analysis.sentiment))
+        
+        # Model tier, output cap and temperature for this kind of turn
+        profile = self.profiles.select(analysis.intent, analysis.sentiment)
+        if budget == BudgetStatus.DEGRADED:
+            profile = self.profiles.economy()
+        
+        # Fit prompt, RAG documents and history in the input token budget
+        fixed_blocks = self._build_enhanced_prompt(
+            analysis=analysis,
+            rag_context="",
+            tool_context=tool_context
+        )
+        packed = self.context_packer.pack(
+            budget=input_budget(profile.model, profile.max_tokens, self.config.max_input_tokens),
+            fixed_texts=[block.text for block in fixed_blocks],
+            messages=llm_messages,
+            documents=rag_result.documents
+        )
+        
         # Build enhanced system prompt
         system_prompt = self._build_enhanced_prompt(
             analysis=analysis,
-            rag_context=rag_result.context,
+            rag_context=self.rag.format_context(packed.documents),
             tool_context=tool_context
         )
         
-        # ==== 6. LLM GENERATION ====
-        try:
-            # Convert history to LLM format
-            llm_messages = [
-                {"role": msg["role"], "content": msg["content"]}
-                for msg in history
-                if msg["role"] in ["user", "assistant"]
-            ]
-            
-            response = await self.invoke_llm(llm_messages, system_prompt)
-            
-            # ==== 7. OUTPUT GUARDRAILS ====
-            output_check = self.guardrails.check_output(response)
-            if output_check.issues:
-                logger.warning(f"Output issues: {output_check.issues}")
-                # Still return but log the issues
-            
-            # Store in memory
-            self.memory.add_message(session_id, "assistant", response)
-            
-            logger.info(f"MARIE v2 response: {response[:50]}...")
-            return response
-            
-        except Exception as e:
-            logger.error(f"MARIE v2 error: {e}")
-            return self._get_fallback_response(analysis.sentiment)
+        return PreparedTurn(
+            analysis=analysis,
+            system_prompt=system_prompt,
+            llm_messages=packed.messages,
+            question=safe_message,
+            semantic_key=semantic_key,
+            profile=profile
+        )
+    
+    def _semantic_context_key(self, analysis: AnalysisResult, rag_result: Any, tool_context: str) -> str:
+        """Fingerprint everything besides the question that shapes the answer"""
+        doc_ids = ",".join(sorted(doc.id for doc in rag_result.documents))
+        tool_hash = hashlib.sha256(tool_context.encode("utf-8")).hexdigest()[:12]
+        return self._semantic_key_prefix(analysis) + "|".join([doc_ids, tool_hash])
+    
+    def _semantic_key_prefix(self, analysis: AnalysisResult) -> str:
+        """Part of the context key known before RAG and tools run"""
+        return "|".join([
+            self.rag.kb.version,
+            analysis.intent.value,
+            analysis.sentiment.value,
+            analysis.language
+        ]) + "|"
+    
+    def _finalize_response(
+        self,
+        state: AgentState,
+        turn: PreparedTurn,
+        response: str,
+        generation_ms: float = 0.0
+    ) -> str:
+        """Run output guardrails and store the answer in memory"""
+        
+        # ==== 7. OUTPUT GUARDRAILS ====
+        output_check = self.guardrails.check_output(response)
+        if output_check.issues:
+            logger.warning(f"Output issues: {output_check.issues}")
+            # Still return but log the issues
+        elif turn.semantic_key:
+            self.semantic_cache.store(turn.semantic_key, turn.question, response, generation_ms)
+        
+        # Store in memory
+        self._remember(state, "assistant", response)
+        
+        logger.info(f"MARIE v2 response: {response[:50]}...")
+        return response
+    
+    def _withdraw_question(self, state: AgentState, turn: PreparedTurn) -> None:
+        """Forget the question of a shed turn: the client sends it again later"""
+        if state.record_history:
+            self.memory.remove_last(state.session_id, "user", turn.question)
+    
+    def _remember(self, state: AgentState, role: str, content: str) -> None:
+        """Add a message to the session history, unless the caller records the turn"""
+        if state.record_history:
+            self.memory.add_message(state.session_id, role, content)
+    
+    @staticmethod
+    def _output_tokens(usage: TokenUsage, response: str) -> int:
+        """Output tokens reported by the provider, estimated for cache hits"""
+        return usage.output_tokens or estimate_tokens(response)
     
     def _build_enhanced_prompt(
         self,
         analysis: Any,
         rag_context: str,
         tool_context: str
-    ) -> str:
-        """Build enhanced system prompt with context"""
+    ) -> List[SystemBlock]:
+        """
+        Build enhanced system prompt with context, most static part first
+        so the provider prompt cache can reuse the prefix:
+        persona prompt | RAG context | per-turn instructions
+        """
+        
+        blocks = [SystemBlock(MARIE_SYSTEM_PROMPT_V2, cache=True)]
         
-        prompt_parts = [MARIE_SYSTEM_PROMPT_V2]
+        # Add RAG context (identical for questions hitting the same documents)
+        if rag_context:
+            blocks.append(SystemBlock(f"\n📚 INFORMATIONS PERTINENTES:\n{rag_context}", cache=True))
+        
+        turn_parts = []
         
         # Add sentiment adaptation
         sentiment_instruction = self._get_sentiment_instruction(analysis.sentiment)
         if sentiment_instruction:
-            prompt_parts.append(f"\n⚠️ ADAPTATION REQUISE:\n{sentiment_instruction}")
-        
-        # Add RAG context
-        if rag_context:
-            prompt_parts.append(f"\n📚 INFORMATIONS PERTINENTES:\n{rag_context}")
+            turn_parts.append(f"\n⚠️ ADAPTATION REQUISE:\n{sentiment_instruction}")
         
         # Add tool context
         if tool_context:
-            prompt_parts.append(f"\n🔧 DONNÉES CALCULÉES:\n{tool_context}")
+            turn_parts.append(f"\n🔧 DONNÉES CALCULÉES:\n{tool_context}")
+        
+        if turn_parts:
+            blocks.append(SystemBlock("\n".join(turn_parts)))
         
-        return "\n".join(prompt_parts)
+        return blocks
     
     def _get_sentiment_instruction(self, sentiment: Sentiment) -> str:
         """Get instruction based on sentiment"""
@@ -307,6 +582,16 @@ class MarieAgentV2(BaseAgent):
                 "Puis-je réessayer de vous aider ?"
             )
     
+    def _get_budget_exhausted_response(self) -> str:
+        """Response when the session has used up its token budget"""
+        return (
+            "Merci pour tous vos échanges avec moi aujourd'hui ! 🙏\n\n"
+            "Pour aller plus loin, notre équipe prend le relais:\n"
+            "📧 Email: contact@webshop.fr\n"
+            "📞 Téléphone: +33 1 23 45 67 89\n\n"
+            "Un conseiller vous répondra sous 24h."
+        )
+    
     def _get_blocked_response(self) -> str:
         """Response when input is blocked"""
         return (
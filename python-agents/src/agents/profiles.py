@@ -0,0 +1,173 @@
+"""
+Generation Profiles
+Per-intent model tier, output cap and temperature, with latency telemetry
+"""
+
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import structlog
+
+from ..analysis import Intent, Sentiment
+
+logger = structlog.get_logger()
+
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000]
+TOKEN_BUCKETS = [16, 32, 64, 128, 256, 512, 1024, 2048]
+
+
+@dataclass
+class GenerationProfile:
+    """LLM settings for one class of turns"""
+    name: str
+    model: str
+    max_tokens: int
+    temperature: float
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus style): constant memory whatever
+    the traffic, percentiles estimated from the bucket bounds.
+    """
+    
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+    
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Upper bound of the bucket holding the percentile (None if +Inf or empty)"""
+        if not self.count:
+            return None
+        rank = percentile / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else None
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.bounds] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 1) if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class GenerationProfiles:
+    """
+    Maps classified intents to generation profiles.
+    
+    Short factual intents (prices, delays, small talk the templates
+    didn't catch) run on the fast model tier with small output caps;
+    complaints and frustrated customers always get the main model.
+    When disabled, every turn uses the default profile (the agent config).
+    Every generation is recorded per profile so the table can be tuned
+    against real latency and answer lengths.
+    """
+    
+    def __init__(
+        self,
+        profiles: Dict[str, GenerationProfile],
+        intent_profiles: Dict[Intent, str],
+        default_profile: str,
+        enabled: bool = True
+    ):
+        self.profiles = profiles
+        self.intent_profiles = intent_profiles
+        self.default_profile = default_profile
+        self.enabled = enabled
+        self._latency: Dict[str, Histogram] = {name: Histogram(LATENCY_BUCKETS_MS) for name in profiles}
+        self._tokens: Dict[str, Histogram] = {name: Histogram(TOKEN_BUCKETS) for name in profiles}
+    
+    def select(self, intent: Intent, sentiment: Sentiment) -> GenerationProfile:
+        """
+        Pick the profile for a turn.
+        
+        Args:
+            intent: Classified intent
+            sentiment: Detected sentiment (frustration overrides the intent)
+        """
+        if not self.enabled:
+            return self.profiles[self.default_profile]
+        if sentiment == Sentiment.FRUSTRATED and "careful" in self.profiles:
+            return self.profiles["careful"]
+        name = self.intent_profiles.get(intent, self.default_profile)
+        return self.profiles.get(name, self.profiles[self.default_profile])
+    
+    def economy(self) -> GenerationProfile:
+        """Cheapest profile, for sessions over their soft token budget"""
+        return self.profiles.get("economy", self.profiles[self.default_profile])
+    
+    def observe(self, profile: GenerationProfile, latency_ms: float, output_tokens: int) -> None:
+        """Record one generation"""
+        self._latency[profile.name].observe(latency_ms)
+        self._tokens[profile.name].observe(output_tokens)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-profile settings and histograms"""
+        return {
+            "enabled": self.enabled,
+            "profiles": {
+                name: {
+                    "model": profile.model,
+                    "max_tokens": profile.max_tokens,
+                    "temperature": profile.temperature,
+                    "latency_ms": self._latency[name].stats(),
+                    "output_tokens": self._tokens[name].stats()
+                }
+                for name, profile in self.profiles.items()
+            }
+        }
+
+
+def build_marie_profiles(main_model: str, main_max_tokens: int, main_temperature: float) -> GenerationProfiles:
+    """
+    MARIE's profile table.
+    
+    Args:
+        main_model: Model for open-ended and sensitive turns (AgentConfig.model)
+        main_max_tokens: Output cap for those turns (AgentConfig.max_tokens)
+        main_temperature: Temperature of the default profile (AgentConfig.temperature)
+    """
+    fast_model = os.getenv("MARIE_FAST_MODEL", "claude-3-5-haiku-20241022")
+    profiles = {
+        "default": GenerationProfile("default", main_model, main_max_tokens, main_temperature),
+        "smalltalk": GenerationProfile("smalltalk", fast_model, max_tokens=150, temperature=0.7),
+        "factual": GenerationProfile("factual", fast_model, max_tokens=300, temperature=0.3),
+        "standard": GenerationProfile("standard", main_model, max_tokens=450, temperature=0.6),
+        "careful": GenerationProfile("careful", main_model, max_tokens=main_max_tokens, temperature=0.5),
+        "economy": GenerationProfile("economy", fast_model, max_tokens=200, temperature=0.5)
+    }
+    intent_profiles = {
+        Intent.GREETING: "smalltalk",
+        Intent.THANKING: "smalltalk",
+        Intent.SAYING_GOODBYE: "smalltalk",
+        Intent.ASKING_PRICE: "factual",
+        Intent.ASKING_DELIVERY: "factual",
+        Intent.ASKING_FEATURES: "standard",
+        Intent.REQUESTING_QUOTE: "standard",
+        Intent.GENERAL_QUESTION: "standard",
+        Intent.COMPLAINING: "careful",
+        Intent.REQUESTING_HUMAN: "careful"
+    }
+    return GenerationProfiles(
+        profiles=profiles,
+        intent_profiles=intent_profiles,
+        default_profile="default",
+        enabled=os.getenv("MARIE_GENERATION_PROFILES", "true").lower() == "true"
+    )
@@ -0,0 +1,225 @@
+"""
+Response Templates
+Instant answers for trivial turns (greetings, thanks, goodbyes)
+"""
+
+import os
+import re
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+import structlog
+
+from ..analysis import get_text_analyzer, AnalysisResult, Intent, Sentiment
+
+logger = structlog.get_logger()
+
+
+# Intents that can be answered without the LLM
+FAST_PATH_INTENTS = {Intent.GREETING, Intent.THANKING, Intent.SAYING_GOODBYE}
+
+# Without an explicit template, these sentiments always go to the LLM
+# ("merci pour rien" must not get a cheerful canned answer)
+SENSITIVE_SENTIMENTS = {Sentiment.NEGATIVE, Sentiment.FRUSTRATED}
+
+# Negation or contrast turns "merci" into sarcasm or a hidden request
+RESERVATIONS = re.compile(r"\b(rien|pas|mais|sauf|quand même|not|but)\b")
+
+# Short English courtesy words the language detector doesn't know
+ENGLISH_MARKERS = re.compile(
+    r"\b(hello|hi|hey|thanks|thank you|thx|bye|goodbye|see you|good night)\b"
+)
+
+# intent -> language -> sentiment (or "default") -> variants
+DEFAULT_TEMPLATES: Dict[str, Dict[str, Dict[str, List[str]]]] = {
+    "greeting": {
+        "fr": {
+            "default": [
+                "Bonjour ! 😊 Je suis Marie, l'assistante de Web Shop. "
+                "Comment puis-je vous aider dans votre projet de site web ?",
+                "Bonjour et bienvenue chez Web Shop ! 👋 Vous avez un projet de site "
+                "vitrine, e-commerce ou sur-mesure ?"
+            ]
+        },
+        "en": {
+            "default": [
+                "Hello! 😊 I'm Marie, Web Shop's assistant. "
+                "How can I help with your website project?",
+                "Hi and welcome to Web Shop! 👋 Are you thinking of a showcase site, "
+                "an online store or a custom build?"
+            ]
+        }
+    },
+    "thanking": {
+        "fr": {
+            "default": [
+                "Avec plaisir ! 😊 Puis-je vous aider avec autre chose ?",
+                "Je vous en prie ! 😊 N'hésitez pas si vous avez d'autres questions."
+            ],
+            "positive": [
+                "Merci à vous, ravie d'avoir pu vous aider ! 😊 Autre chose pour votre projet ?"
+            ]
+        },
+        "en": {
+            "default": [
+                "You're welcome! 😊 Is there anything else I can help you with?"
+            ]
+        }
+    },
+    "saying_goodbye": {
+        "fr": {
+            "default": [
+                "Merci pour votre visite et à bientôt ! 👋 "
+                "N'hésitez pas à revenir si vous avez d'autres questions.",
+                "Au revoir et belle journée ! 👋 L'équipe Web Shop reste à votre disposition."
+            ]
+        },
+        "en": {
+            "default": [
+                "Thanks for stopping by, see you soon! 👋 "
+                "Feel free to come back if you have any other questions."
+            ]
+        }
+    }
+}
+
+
+class ResponseTemplates:
+    """
+    Template engine keyed by intent, language and sentiment.
+    
+    A turn is only answered from a template when it is short, is not a
+    question, and every intent it matches is a fast-path intent, so
+    "bonjour, quels sont vos tarifs ?" still goes through RAG and the LLM.
+    """
+    
+    def __init__(
+        self,
+        templates: Optional[Dict[str, Dict[str, Dict[str, List[str]]]]] = None,
+        enabled: bool = True,
+        max_words: int = 5
+    ):
+        self.templates = templates if templates is not None else DEFAULT_TEMPLATES
+        self.enabled = enabled
+        self.max_words = max_words
+        self.classifier = get_text_analyzer().intent_classifier
+        self._rotation: Dict[str, int] = defaultdict(int)
+        self._served_by_intent: Dict[str, int] = defaultdict(int)
+        self._counters: Dict[str, Any] = {
+            "turns": 0,
+            "served": 0,
+            "time_us": 0.0
+        }
+    
+    def respond(self, text: str, analysis: AnalysisResult) -> Optional[str]:
+        """
+        Answer a trivial turn from its template.
+        
+        Args:
+            text: Sanitized user message
+            analysis: Sentiment and intent analysis of the message
+        
+        Returns:
+            The templated reply, or None when the turn needs the LLM
+        """
+        started = time.perf_counter()
+        self._counters["turns"] += 1
+        
+        reply = self._match(text, analysis) if self.enabled else None
+        if reply is not None:
+            self._counters["served"] += 1
+            self._served_by_intent[analysis.intent.value] += 1
+        
+        self._counters["time_us"] += (time.perf_counter() - started) * 1_000_000
+        return reply
+    
+    def would_answer(self, text: str, analysis: AnalysisResult) -> bool:
+        """Whether `respond` would serve this turn (no counters touched)"""
+        return self.enabled and self._match(text, analysis) is not None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Share of turns served without the LLM"""
+        turns = self._counters["turns"]
+        return {
+            "enabled": self.enabled,
+            "turns": turns,
+            "served": self._counters["served"],
+            "served_ratio": round(self._counters["served"] / turns, 4) if turns else 0.0,
+            "avg_us": round(self._counters["time_us"] / turns, 1) if turns else 0.0,
+            "served_by_intent": dict(self._served_by_intent)
+        }
+    
+    def _match(self, text: str, analysis: AnalysisResult) -> Optional[str]:
+        if analysis.intent not in FAST_PATH_INTENTS:
+            return None
+        if "?" in text or len(text.split()) > self.max_words:
+            return None
+        if RESERVATIONS.search(text.lower()):
+            return None
+        
+        # Any other intent in the message means there's a real request in it
+        if not set(self.classifier.score_intents(text)) <= FAST_PATH_INTENTS:
+            return None
+        
+        by_language = self.templates.get(analysis.intent.value, {})
+        language = self._language(text, analysis)
+        by_sentiment = by_language.get(language) or by_language.get("fr") or {}
+        
+        variants = by_sentiment.get(analysis.sentiment.value)
+        if not variants and analysis.sentiment not in SENSITIVE_SENTIMENTS:
+            variants = by_sentiment.get("default")
+        if not variants:
+            return None
+        
+        key = f"{analysis.intent.value}:{language}:{analysis.sentiment.value}"
+        index = self._rotation[key] % len(variants)
+        self._rotation[key] += 1
+        return variants[index]
+    
+    @staticmethod
+    def _language(text: str, analysis: AnalysisResult) -> str:
+        if ENGLISH_MARKERS.search(text.lower()):
+            return "en"
+        return analysis.language
+
+
+def load_templates(path: str) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+    """
+    Default templates overridden by a JSON file with the same layout.
+    
+    Args:
+        path: JSON file path ({intent: {language: {sentiment|"default": [variants]}}})
+    """
+    templates = {
+        intent: {language: dict(by_sentiment) for language, by_sentiment in by_language.items()}
+        for intent, by_language in DEFAULT_TEMPLATES.items()
+    }
+    try:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load response templates from {path}: {e}")
+        return templates
+    
+    for intent, by_language in overrides.items():
+        for language, by_sentiment in by_language.items():
+            templates.setdefault(intent, {}).setdefault(language, {}).update(by_sentiment)
+    return templates
+
+
+# Singleton
+_templates: Optional[ResponseTemplates] = None
+
+
+def get_response_templates() -> ResponseTemplates:
+    """Get the response templates singleton"""
+    global _templates
+    if _templates is None:
+        path = os.getenv("MARIE_TEMPLATES_FILE", "")
+        _templates = ResponseTemplates(
+            templates=load_templates(path) if path else None,
+            enabled=os.getenv("MARIE_FAST_PATH", "true").lower() == "true",
+            max_words=int(os.getenv("MARIE_FAST_PATH_MAX_WORDS", "5"))
+        )
+    return _templates
@@ -4,7 +4,7 @@ Understand user emotions and intentions
 """
 
 import re
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import structlog
@@ -158,6 +158,24 @@ class IntentClassifier:
         Returns:
             Tuple of (Intent, confidence)
         """
+        intent_scores = self.score_intents(text)
+        
+        if not intent_scores:
+            return (Intent.GENERAL_QUESTION, 0.5)
+        
+        # Get highest scoring intent
+        best_intent = max(intent_scores.keys(), key=lambda k: intent_scores[k])
+        confidence = min(0.5 + intent_scores[best_intent] * 0.15, 0.95)
+        
+        return (best_intent, confidence)
+    
+    def score_intents(self, text: str) -> Dict[Intent, int]:
+        """
+        Count matching patterns for every intent.
+        
+        Returns:
+            Mapping of matched intents to their pattern hit count
+        """
         text_lower = text.lower()
         
         intent_scores = {}
@@ -170,14 +188,7 @@ class IntentClassifier:
             if score > 0:
                 intent_scores[intent] = score
         
-        if not intent_scores:
-            return (Intent.GENERAL_QUESTION, 0.5)
-        
-        # Get highest scoring intent
-        best_intent = max(intent_scores.keys(), key=lambda k: intent_scores[k])
-        confidence = min(0.5 + intent_scores[best_intent] * 0.15, 0.95)
-        
-        return (best_intent, confidence)
+        return intent_scores
 
 
 class TextAnalyzer:
@@ -0,0 +1,18 @@
+"""
+Jobs module
+"""
+
+from .backends import Job, JobStatus, JobBackend, InMemoryJobBackend, RedisJobBackend
+from .manager import JobManager, JobQueueFull, InvalidJob, get_job_manager
+
+__all__ = [
+    "Job",
+    "JobStatus",
+    "JobBackend",
+    "InMemoryJobBackend",
+    "RedisJobBackend",
+    "JobManager",
+    "JobQueueFull",
+    "InvalidJob",
+    "get_job_manager"
+]
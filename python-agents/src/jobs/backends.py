@@ -0,0 +1,231 @@
+"""
+Job Queue Backends
+Where background jobs wait and where their state lives
+"""
+
+import json
+import time
+import uuid
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """One agent action run in the background"""
+    agent_id: str
+    action: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    callback_url: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    callback_status: Optional[str] = None
+    attempts: int = 0  # Runs started, recovered ones included
+    
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["status"] = self.status.value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(**{**data, "status": JobStatus(data["status"])})
+
+
+class JobBackend(ABC):
+    """Queue of job IDs plus job state storage"""
+    
+    name: str = "base"
+    
+    @abstractmethod
+    async def enqueue(self, job: Job) -> None:
+        """Store a new job and queue it"""
+        pass
+    
+    @abstractmethod
+    async def dequeue(self, timeout: float) -> Optional[str]:
+        """Next job ID, or None if nothing arrived within the timeout"""
+        pass
+    
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        """Persist the job's current state"""
+        pass
+    
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Job by ID (None if unknown or expired)"""
+        pass
+    
+    @abstractmethod
+    async def queued(self) -> int:
+        """Number of jobs waiting for a worker"""
+        pass
+    
+    @abstractmethod
+    async def lease(self, job_id: str, expires_at: float) -> None:
+        """Mark a job as held by a live worker until `expires_at` (renewed by heartbeats)"""
+        pass
+    
+    @abstractmethod
+    async def release(self, job_id: str) -> None:
+        """Drop a job's lease once it is no longer running"""
+        pass
+    
+    @abstractmethod
+    async def reclaim(self, now: float) -> List[str]:
+        """
+        Take the jobs whose lease expired (their worker died).
+        
+        Each expired job is returned to exactly one caller, even with
+        several processes reclaiming at once.
+        """
+        pass
+
+
+class InMemoryJobBackend(JobBackend):
+    """
+    Process-local backend, for development and tests.
+    
+    Jobs are lost on restart and only this process's workers see them.
+    Finished jobs are dropped after `result_ttl_seconds`.
+    """
+    
+    name = "memory"
+    
+    def __init__(self, result_ttl_seconds: int = 86400):
+        self.result_ttl = result_ttl_seconds
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._jobs: Dict[str, Job] = {}
+        self._leases: Dict[str, float] = {}
+    
+    async def enqueue(self, job: Job) -> None:
+        self._evict_expired()
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job.id)
+    
+    async def dequeue(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    async def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+    
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+    
+    async def queued(self) -> int:
+        return self._queue.qsize()
+    
+    async def lease(self, job_id: str, expires_at: float) -> None:
+        self._leases[job_id] = expires_at
+    
+    async def release(self, job_id: str) -> None:
+        self._leases.pop(job_id, None)
+    
+    async def reclaim(self, now: float) -> List[str]:
+        expired = [job_id for job_id, expires_at in self._leases.items() if expires_at <= now]
+        for job_id in expired:
+            del self._leases[job_id]
+        return expired
+    
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class RedisJobBackend(JobBackend):
+    """
+    Redis backend, shared by every worker process.
+    
+    Job IDs wait in a list (LPUSH / BRPOP); each job is a JSON string
+    under its own key, expiring `result_ttl_seconds` after its last update.
+    Running jobs sit in a sorted set scored by lease expiry, so any
+    process can find the jobs of a worker that died.
+    """
+    
+    name = "redis"
+    
+    def __init__(self, redis_client: Any, prefix: str = "webshop:jobs:", result_ttl_seconds: int = 86400):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.queue_key = f"{prefix}queue"
+        self.leases_key = f"{prefix}running"
+        self.result_ttl = result_ttl_seconds
+    
+    async def enqueue(self, job: Job) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(self._key(job.id), self._dump(job), ex=self.result_ttl)
+        pipe.lpush(self.queue_key, job.id)
+        await pipe.execute()
+    
+    async def dequeue(self, timeout: float) -> Optional[str]:
+        # BRPOP takes whole seconds (0 would block forever)
+        item = await self.redis.brpop(self.queue_key, timeout=max(1, int(timeout)))
+        if item is None:
+            return None
+        job_id = item[1]
+        return job_id.decode() if isinstance(job_id, bytes) else job_id
+    
+    async def save(self, job: Job) -> None:
+        await self.redis.set(self._key(job.id), self._dump(job), ex=self.result_ttl)
+    
+    async def get(self, job_id: str) -> Optional[Job]:
+        data = await self.redis.get(self._key(job_id))
+        if data is None:
+            return None
+        return Job.from_dict(json.loads(data))
+    
+    async def queued(self) -> int:
+        return await self.redis.llen(self.queue_key)
+    
+    async def lease(self, job_id: str, expires_at: float) -> None:
+        await self.redis.zadd(self.leases_key, {job_id: expires_at})
+    
+    async def release(self, job_id: str) -> None:
+        await self.redis.zrem(self.leases_key, job_id)
+    
+    async def reclaim(self, now: float) -> List[str]:
+        expired = await self.redis.zrangebyscore(self.leases_key, "-inf", now)
+        reclaimed = []
+        for job_id in expired:
+            # ZREM succeeds for one process only: that one recovers the job
+            if await self.redis.zrem(self.leases_key, job_id):
+                reclaimed.append(job_id.decode() if isinstance(job_id, bytes) else job_id)
+        return reclaimed
+    
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}"
+    
+    @staticmethod
+    def _dump(job: Job) -> str:
+        return json.dumps(job.to_dict(), ensure_ascii=False, default=str)
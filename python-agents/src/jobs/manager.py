@@ -0,0 +1,360 @@
+"""
+Job Manager
+Bounded worker pool running agent actions outside the request cycle
+"""
+
+import os
+import time
+import socket
+import asyncio
+import ipaddress
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+import structlog
+
+from .backends import InMemoryJobBackend, Job, JobBackend, JobStatus, RedisJobBackend
+from ..memory import get_redis_client
+from ..orchestrator.deadline import DeadlineExceeded
+
+logger = structlog.get_logger()
+
+
+# (agent_id, action, params) -> JSON-serializable result
+JobExecutor = Callable[[str, str, Dict[str, Any]], Awaitable[Any]]
+
+# (agent_id, action) -> whether the executor can run it
+ActionValidator = Callable[[str, str], bool]
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the queue already holds its maximum of waiting jobs"""
+    
+    def __init__(self, queued: int, retry_after: float = 5.0):
+        super().__init__(f"Job queue full ({queued} jobs waiting)")
+        self.queued = queued
+        self.retry_after = retry_after
+
+
+class InvalidJob(ValueError):
+    """Raised when a job is refused at submission (unknown action, callback URL not allowed)"""
+    pass
+
+
+class JobManager:
+    """
+    Background jobs for long agent actions (quote PDFs, content
+    generation, email batches).
+    
+    The API only enqueues and returns a job ID; a fixed pool of worker
+    tasks runs the actions, so slow actions neither hold HTTP
+    connections nor pile up unbounded work on the event loop. Clients
+    poll the job, or get its final state POSTed to their callback URL.
+    
+    Callback URLs must be http(s). With `callback_allowed_hosts` set,
+    only those hosts are accepted (`*.example.com` matches subdomains);
+    otherwise the host must resolve to public addresses only, so a
+    client can't make the server POST to loopback, private or
+    link-local services.
+    
+    A running job holds a lease, renewed by its worker every third of
+    `lease_seconds`. When a worker process dies, its leases expire and
+    any process picks the jobs up again: they are re-queued until they
+    have been started `max_attempts` times, then marked failed.
+    """
+    
+    def __init__(
+        self,
+        backend: JobBackend,
+        executor: Optional[JobExecutor] = None,
+        workers: int = 4,
+        max_queued: int = 1000,
+        job_timeout_seconds: float = 300.0,
+        callback_allowed_hosts: Optional[List[str]] = None,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 1
+    ):
+        self.backend = backend
+        self.executor = executor
+        self.validator: Optional[ActionValidator] = None
+        self.workers = workers
+        self.max_queued = max_queued
+        self.job_timeout = job_timeout_seconds
+        self.callback_allowed_hosts = [host.lower() for host in callback_allowed_hosts or []]
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "rejected": 0,
+            "invalid": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "deadlines_exceeded": 0,
+            "recovered": 0,
+            "lost": 0,
+            "callbacks_failed": 0
+        }
+    
+    async def submit(
+        self,
+        agent_id: str,
+        action: str,
+        params: Optional[Dict[str, Any]] = None,
+        callback_url: Optional[str] = None
+    ) -> Job:
+        """
+        Queue an action.
+        
+        Raises:
+            InvalidJob: Unknown action, or callback URL not allowed
+            JobQueueFull: Too many jobs already waiting
+        """
+        try:
+            if self.validator is not None and not self.validator(agent_id, action):
+                raise InvalidJob(f"Agent {agent_id} has no action '{action}'")
+            if callback_url:
+                await self.check_callback_url(callback_url)
+        except InvalidJob:
+            self._counters["invalid"] += 1
+            raise
+        
+        queued = await self.backend.queued()
+        if queued >= self.max_queued:
+            self._counters["rejected"] += 1
+            raise JobQueueFull(queued)
+        
+        job = Job(agent_id=agent_id, action=action, params=params or {}, callback_url=callback_url)
+        await self.backend.enqueue(job)
+        self._counters["submitted"] += 1
+        logger.info(f"📥 Job {job.id} queued: {agent_id}.{action}")
+        return job
+    
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Job state (None if unknown or expired)"""
+        return await self.backend.get(job_id)
+    
+    async def check_callback_url(self, url: str) -> None:
+        """
+        Refuse callback URLs the server must not POST to.
+        
+        Raises:
+            InvalidJob: Not http(s), host not allowed, or resolving to a
+                non-public address
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        if parts.scheme not in ("http", "https") or not host:
+            raise InvalidJob("Callback URL must be an absolute http(s) URL")
+        
+        if self.callback_allowed_hosts:
+            if not any(_host_matches(host, allowed) for allowed in self.callback_allowed_hosts):
+                raise InvalidJob(f"Callback host {host} is not allowed")
+            return
+        
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except (socket.gaierror, ValueError) as e:
+            raise InvalidJob(f"Callback host {host} can't be resolved: {e}") from None
+        for *_, sockaddr in addresses:
+            address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+            if getattr(address, "ipv4_mapped", None):
+                address = address.ipv4_mapped
+            if not address.is_global or address.is_multicast:
+                raise InvalidJob(f"Callback host {host} resolves to a non-public address")
+    
+    def start(self) -> None:
+        """Start the worker pool, and the recovery of jobs whose worker died"""
+        if self._tasks:
+            return
+        if self.executor is None:
+            raise RuntimeError("JobManager needs an executor before starting")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+        logger.info(f"👷 {self.workers} job workers started ({self.backend.name} backend)")
+    
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running are marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def stats(self) -> Dict[str, Any]:
+        """Queue depth, busy workers and outcomes"""
+        try:
+            queued = await self.backend.queued()
+        except Exception:
+            queued = None
+        return {
+            **self._counters,
+            "backend": self.backend.name,
+            "workers": self.workers,
+            "running": self._running,
+            "queued": queued,
+            "max_queued": self.max_queued
+        }
+    
+    async def _worker(self, index: int) -> None:
+        while True:
+            try:
+                job_id = await self.backend.dequeue(timeout=1.0)
+                if job_id is None:
+                    continue
+                job = await self.backend.get(job_id)
+                if job is None or job.status != JobStatus.QUEUED:
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} error: {e}")
+                await asyncio.sleep(1.0)
+    
+    async def _reaper(self) -> None:
+        """Recover jobs whose lease expired, at startup and then periodically"""
+        while True:
+            try:
+                for job_id in await self.backend.reclaim(time.time()):
+                    await self._recover(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job lease recovery error: {e}")
+            await asyncio.sleep(self.lease_seconds / 3)
+    
+    async def _recover(self, job_id: str) -> None:
+        """Re-queue a job lost with its worker, or fail it once out of attempts"""
+        job = await self.backend.get(job_id)
+        if job is None or job.status != JobStatus.RUNNING:
+            return
+        if job.attempts < self.max_attempts:
+            logger.warning(f"♻️ Job {job.id} lost with its worker, re-queued (attempt {job.attempts + 1})")
+            job.status, job.started_at = JobStatus.QUEUED, None
+            await self.backend.enqueue(job)
+            self._counters["recovered"] += 1
+            return
+        
+        logger.error(f"Job {job.id} lost with its worker after {job.attempts} attempt(s)")
+        job.status, job.error = JobStatus.FAILED, "Worker stopped while running the job"
+        job.finished_at = time.time()
+        await self.backend.save(job)
+        self._counters["lost"] += 1
+        self._counters["failed"] += 1
+        if job.callback_url:
+            await self._notify(job)
+    
+    async def _heartbeat(self, job: Job) -> None:
+        """Keep the job's lease alive while it runs"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.backend.lease(job.id, time.time() + self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Lease renewal for job {job.id} failed: {e}")
+    
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        job.attempts += 1
+        await self.backend.save(job)
+        await self.backend.lease(job.id, time.time() + self.lease_seconds)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        
+        self._running += 1
+        try:
+            job.result = await asyncio.wait_for(
+                self.executor(job.agent_id, job.action, job.params), self.job_timeout
+            )
+            job.status = JobStatus.SUCCEEDED
+            self._counters["succeeded"] += 1
+        except DeadlineExceeded as e:
+            # A TimeoutError too: the action's own request budget ran out
+            job.status, job.error = JobStatus.FAILED, str(e)
+            self._counters["deadlines_exceeded"] += 1
+            self._counters["failed"] += 1
+        except asyncio.TimeoutError:
+            job.status, job.error = JobStatus.FAILED, f"Timed out after {self.job_timeout:.0f}s"
+            self._counters["timeouts"] += 1
+            self._counters["failed"] += 1
+        except asyncio.CancelledError:
+            job.status, job.error = JobStatus.FAILED, "Cancelled at shutdown"
+            self._counters["failed"] += 1
+            job.finished_at = time.time()
+            await self.backend.save(job)
+            await self.backend.release(job.id)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.agent_id}.{job.action}) failed: {e}")
+            job.status, job.error = JobStatus.FAILED, str(e)
+            self._counters["failed"] += 1
+        finally:
+            self._running -= 1
+            heartbeat.cancel()
+        
+        job.finished_at = time.time()
+        await self.backend.save(job)
+        await self.backend.release(job.id)
+        logger.info(
+            f"📤 Job {job.id} {job.status.value} in {(job.finished_at - job.started_at) * 1000:.0f}ms"
+        )
+        
+        if job.callback_url:
+            await self._notify(job)
+    
+    async def _notify(self, job: Job) -> None:
+        """POST the finished job to its callback URL (best effort, no retries)"""
+        from ..transport import get_http_transport
+        
+        try:
+            # Checked again: the host may resolve elsewhere than at submission
+            await self.check_callback_url(job.callback_url)
+            response = await get_http_transport().client("tools").post(
+                job.callback_url, json=job.to_dict(), follow_redirects=False
+            )
+            job.callback_status = str(response.status_code)
+        except Exception as e:
+            logger.warning(f"Callback for job {job.id} failed: {e}")
+            job.callback_status = f"error: {e}"
+            self._counters["callbacks_failed"] += 1
+        await self.backend.save(job)
+
+
+def _host_matches(host: str, allowed: str) -> bool:
+    """Exact host match, or any subdomain for a `*.` entry"""
+    if allowed.startswith("*."):
+        return host.endswith(allowed[1:])
+    return host == allowed
+
+
+def create_job_backend() -> JobBackend:
+    """Redis backend when REDIS_URL is set (JOBS_BACKEND=memory forces in-process)"""
+    result_ttl = int(os.getenv("JOBS_RESULT_TTL_SECONDS", "86400"))
+    redis_client = get_redis_client()
+    if os.getenv("JOBS_BACKEND", "auto").lower() != "memory" and redis_client is not None:
+        return RedisJobBackend(redis_client, result_ttl_seconds=result_ttl)
+    return InMemoryJobBackend(result_ttl_seconds=result_ttl)
+
+
+# Singleton
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """Get the job manager singleton"""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(
+            backend=create_job_backend(),
+            workers=int(os.getenv("JOBS_WORKERS", "4")),
+            max_queued=int(os.getenv("JOBS_MAX_QUEUED", "1000")),
+            job_timeout_seconds=float(os.getenv("JOBS_TIMEOUT_SECONDS", "300")),
+            callback_allowed_hosts=[
+                host.strip() for host in os.getenv("JOBS_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+            ],
+            lease_seconds=float(os.getenv("JOBS_LEASE_SECONDS", "60")),
+            max_attempts=int(os.getenv("JOBS_MAX_ATTEMPTS", "1"))
+        )
+    return _job_manager
@@ -3,5 +3,42 @@ LLM module
 """
 
 from .router import LLMRouter, get_llm_router
+from .cache import ResponseCache
+from .models import LLMResponse, TokenUsage, SystemBlock, SystemPrompt
+from .admission import AdmissionRejected
+from .providers import LLMProvider, ClaudeProvider, GeminiProvider, OpenAICompatibleProvider
+from .fake import FakeProvider, Cassette, LatencyDistribution
+from .singleflight import SingleFlight
+from .metering import BudgetStatus, UsageMeter, get_usage_meter
+from .context import (
+    ContextPacker,
+    PackedContext,
+    estimate_tokens,
+    get_context_packer
+)
 
-__all__ = ["LLMRouter", "get_llm_router"]
+__all__ = [
+    "LLMRouter",
+    "get_llm_router",
+    "ResponseCache",
+    "LLMResponse",
+    "TokenUsage",
+    "SystemBlock",
+    "SystemPrompt",
+    "AdmissionRejected",
+    "LLMProvider",
+    "ClaudeProvider",
+    "GeminiProvider",
+    "OpenAICompatibleProvider",
+    "FakeProvider",
+    "Cassette",
+    "LatencyDistribution",
+    "SingleFlight",
+    "BudgetStatus",
+    "UsageMeter",
+    "get_usage_meter",
+    "ContextPacker",
+    "PackedContext",
+    "estimate_tokens",
+    "get_context_packer"
+]
@@ -0,0 +1,205 @@
+"""
+Provider Admission Control
+Bound in-flight requests and tokens per minute for each LLM provider
+"""
+
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a provider can't take a request within its wait budget"""
+    
+    def __init__(self, provider: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"{provider} admission rejected: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate_per_minute`.
+    The level may go negative when a request turns out to cost more
+    than estimated; later requests then wait for the debt to refill.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self._updated_at = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+    
+    def available(self, amount: float) -> bool:
+        self._refill()
+        return self.level >= amount
+    
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+    
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+    
+    def seconds_until(self, amount: float) -> float:
+        self._refill()
+        missing = amount - self.level
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate_per_second
+
+
+@dataclass
+class AdmissionTicket:
+    """Handle for an admitted request, used to report real usage"""
+    estimated_tokens: int
+    actual_tokens: Optional[int] = None
+
+
+class ProviderAdmission:
+    """
+    Admission controller for one provider.
+    
+    A request must get a concurrency slot, then enough budget in the
+    requests/min and tokens/min buckets. Waiting is bounded both in
+    queue length (fast rejection when full) and in time.
+    """
+    
+    def __init__(
+        self,
+        provider: str,
+        max_concurrency: int = 16,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_queue: int = 64,
+        max_wait_seconds: float = 5.0
+    ):
+        self.provider = provider
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_concurrency = max_concurrency
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._max_queue = max_queue
+        self._max_wait = max_wait_seconds
+        self._waiting = 0
+        self._in_flight = 0
+        self._wait_ms: Deque[float] = deque(maxlen=500)
+        self._counters: Dict[str, int] = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "token_corrections": 0
+        }
+    
+    @asynccontextmanager
+    async def admit(self, estimated_tokens: int) -> AsyncIterator[AdmissionTicket]:
+        """
+        Wait for capacity, hold it for the duration of the call, then
+        correct the token bucket with the real usage set on the ticket.
+        
+        Raises:
+            AdmissionRejected: Queue full or wait budget exceeded
+        """
+        if self._tokens:
+            estimated_tokens = min(estimated_tokens, int(self._tokens.capacity))
+        
+        # Only requests that actually have to wait count against the queue
+        queued = self._semaphore.locked() or not self._budget_available(estimated_tokens)
+        if queued:
+            if self._waiting >= self._max_queue:
+                self._counters["rejected_queue_full"] += 1
+                raise AdmissionRejected(self.provider, "queue full", self._retry_after(estimated_tokens))
+            self._waiting += 1
+        
+        started = time.monotonic()
+        deadline = started + self._max_wait
+        try:
+            if self._semaphore.locked():
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=self._max_wait)
+                except asyncio.TimeoutError:
+                    self._counters["rejected_timeout"] += 1
+                    raise AdmissionRejected(self.provider, "concurrency wait timeout")
+            else:
+                await self._semaphore.acquire()
+            
+            try:
+                await self._wait_for_budget(estimated_tokens, deadline)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            if queued:
+                self._waiting -= 1
+        
+        self._wait_ms.append((time.monotonic() - started) * 1000)
+        self._counters["admitted"] += 1
+        self._in_flight += 1
+        
+        ticket = AdmissionTicket(estimated_tokens=estimated_tokens)
+        try:
+            yield ticket
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+            if self._tokens and ticket.actual_tokens is not None:
+                self._tokens.adjust(ticket.estimated_tokens - ticket.actual_tokens)
+                self._counters["token_corrections"] += 1
+    
+    async def _wait_for_budget(self, estimated_tokens: int, deadline: float) -> None:
+        """Sleep until both buckets can cover the request, or reject"""
+        while True:
+            if self._budget_available(estimated_tokens):
+                if self._requests:
+                    self._requests.take(1)
+                if self._tokens:
+                    self._tokens.take(estimated_tokens)
+                return
+            
+            delay = self._retry_after(estimated_tokens)
+            if time.monotonic() + delay > deadline:
+                self._counters["rejected_timeout"] += 1
+                raise AdmissionRejected(self.provider, "rate limit budget exhausted", delay)
+            await asyncio.sleep(min(delay, 0.25))
+    
+    def _budget_available(self, estimated_tokens: int) -> bool:
+        requests_ok = self._requests is None or self._requests.available(1)
+        tokens_ok = self._tokens is None or self._tokens.available(estimated_tokens)
+        return requests_ok and tokens_ok
+    
+    def _retry_after(self, estimated_tokens: int) -> float:
+        delays = [0.1]
+        if self._requests:
+            delays.append(self._requests.seconds_until(1))
+        if self._tokens:
+            delays.append(self._tokens.seconds_until(estimated_tokens))
+        return max(delays)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and bucket levels"""
+        waits = sorted(self._wait_ms)
+        return {
+            **self._counters,
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "max_concurrency": self._max_concurrency,
+            "wait_ms_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+            "wait_ms_p95": round(waits[int(0.95 * (len(waits) - 1))], 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1], 1) if waits else 0.0,
+            "requests_bucket": round(self._requests.level, 1) if self._requests else None,
+            "tokens_bucket": round(self._tokens.level, 1) if self._tokens else None
+        }
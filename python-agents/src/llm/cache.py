@@ -0,0 +1,177 @@
+"""
+LLM Response Cache
+Two-tier exact-match cache: in-process LRU in front of shared Redis
+"""
+
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+class ResponseCache:
+    """
+    Content-hashed cache for LLM completions.
+    
+    Keys are a hash of everything that determines the answer
+    (model, system prompt, messages, temperature, max_tokens) plus a
+    caller-supplied namespace, so a knowledge base or prompt change
+    naturally lands on new keys. The local tier is a bounded LRU with
+    TTL; the Redis tier is shared across workers and optional.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        redis_client=None,
+        redis_ttl_seconds: int = 3600,
+        max_temperature: float = 0.8
+    ):
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._redis = redis_client
+        self._redis_ttl = redis_ttl_seconds
+        self._max_temperature = max_temperature
+        self._prefix = "webshop:llmcache:"
+        self._counters: Dict[str, int] = {
+            "hits_local": 0,
+            "hits_redis": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "bypassed": 0,
+            "redis_errors": 0
+        }
+    
+    def make_key(
+        self,
+        namespace: str,
+        model: str,
+        system_prompt: Any,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Build the content hash for a request"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "system": system_prompt,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{namespace}:{digest}"
+    
+    def accepts(self, temperature: float) -> bool:
+        """Whether a request at this temperature may be served from cache"""
+        if temperature > self._max_temperature:
+            self._counters["bypassed"] += 1
+            return False
+        return True
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Look a key up in the local tier, then in Redis"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._counters["hits_local"] += 1
+                return value
+            del self._entries[key]
+            self._counters["expirations"] += 1
+        
+        if self._redis:
+            try:
+                value = await self._redis.get(self._prefix + key)
+            except Exception as e:
+                self._counters["redis_errors"] += 1
+                logger.warning(f"LLM cache Redis read failed: {e}")
+                value = None
+            if value is not None:
+                if isinstance(value, bytes):
+                    value = value.decode("utf-8")
+                self._store_local(key, value)
+                self._counters["hits_redis"] += 1
+                return value
+        
+        self._counters["misses"] += 1
+        return None
+    
+    async def set(self, key: str, value: str) -> None:
+        """Store a completion in both tiers"""
+        if not value:
+            return
+        
+        self._store_local(key, value)
+        self._counters["stores"] += 1
+        
+        if self._redis:
+            try:
+                await self._redis.setex(self._prefix + key, self._redis_ttl, value)
+            except Exception as e:
+                self._counters["redis_errors"] += 1
+                logger.warning(f"LLM cache Redis write failed: {e}")
+    
+    async def invalidate(self, namespace: Optional[str] = None) -> int:
+        """
+        Drop cached completions.
+        
+        Args:
+            namespace: Only drop keys in this namespace (all keys if None)
+        
+        Returns:
+            Number of local entries removed
+        """
+        if namespace is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            stale = [k for k in self._entries if k.startswith(f"{namespace}:")]
+            for key in stale:
+                del self._entries[key]
+            removed = len(stale)
+        
+        if self._redis:
+            pattern = f"{self._prefix}{namespace}:*" if namespace else f"{self._prefix}*"
+            try:
+                async for redis_key in self._redis.scan_iter(match=pattern):
+                    await self._redis.delete(redis_key)
+            except Exception as e:
+                self._counters["redis_errors"] += 1
+                logger.warning(f"LLM cache Redis invalidation failed: {e}")
+        
+        logger.info(f"LLM cache invalidated ({namespace or 'all'}): {removed} local entries")
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters and current size"""
+        lookups = self._counters["hits_local"] + self._counters["hits_redis"] + self._counters["misses"]
+        hits = self._counters["hits_local"] + self._counters["hits_redis"]
+        return {
+            **self._counters,
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "redis_enabled": self._redis is not None,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+    
+    def _store_local(self, key: str, value: str) -> None:
+        """Insert into the LRU tier, evicting the oldest entries"""
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
@@ -0,0 +1,241 @@
+"""
+Context Window Management
+Fast local token estimation and budgeted prompt packing
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, replace
+import structlog
+
+logger = structlog.get_logger()
+
+
+# Context windows (tokens) by model name prefix
+MODEL_CONTEXT_WINDOWS = {
+    "claude": 200_000,
+    "gemini": 1_048_576,
+    "local/": int(os.getenv("LOCAL_LLM_CONTEXT_WINDOW", "8192"))
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Fixed cost of wrapping a message or document in the prompt
+MESSAGE_OVERHEAD_TOKENS = 4
+DOCUMENT_OVERHEAD_TOKENS = 8
+
+# Don't keep truncated fragments smaller than this
+MIN_FRAGMENT_TOKENS = 32
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+    
+    Words cost one token per ~4 characters (long words split into
+    several BPE pieces), punctuation and emojis one token each. Close
+    enough for budgeting on French and English text.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        tokens += (len(piece) + 3) // 4 if piece[0].isalnum() or piece[0] == "_" else 1
+    return tokens
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to roughly `max_tokens`, keeping its beginning"""
+    total = estimate_tokens(text)
+    if total <= max_tokens:
+        return text
+    cut = max(0, int(len(text) * max_tokens / total) - 1)
+    truncated = text[:cut].rstrip() + "…"
+    while cut > 0 and estimate_tokens(truncated) > max_tokens:
+        cut = int(cut * 0.9)
+        truncated = text[:cut].rstrip() + "…"
+    return truncated
+
+
+def context_window(model: str) -> int:
+    """Context window size for a model name"""
+    for prefix, window in MODEL_CONTEXT_WINDOWS.items():
+        if model.startswith(prefix):
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def input_budget(model: str, max_output_tokens: int, max_input_tokens: int = 0) -> int:
+    """
+    Prompt token budget for a request.
+    
+    Args:
+        model: Model name
+        max_output_tokens: Tokens reserved for the answer
+        max_input_tokens: Configured cap (0 = whatever the window allows)
+    """
+    available = context_window(model) - max_output_tokens
+    if max_input_tokens > 0:
+        return min(max_input_tokens, available)
+    return available
+
+
+@dataclass
+class PackedContext:
+    """Prompt parts that fit in the budget"""
+    documents: List[Any]
+    messages: List[Dict[str, str]]
+    tokens: int
+    budget: int
+    dropped_messages: int = 0
+    dropped_documents: int = 0
+    truncated: List[str] = field(default_factory=list)
+
+
+class ContextPacker:
+    """
+    Fill a token budget by priority:
+    1. Fixed prompt parts (system prompt, per-turn instructions)
+    2. The current user message (truncated if it alone overflows)
+    3. RAG documents, highest score first
+    4. Conversation history, newest turn first
+    
+    Whatever doesn't fit is truncated (if a useful fragment remains)
+    or dropped, oldest turns and lowest-scored documents first.
+    """
+    
+    def __init__(self):
+        self._counters: Dict[str, int] = {
+            "packs": 0,
+            "tokens": 0,
+            "dropped_messages": 0,
+            "dropped_documents": 0,
+            "truncations": 0,
+            "over_budget": 0
+        }
+    
+    def pack(
+        self,
+        budget: int,
+        fixed_texts: List[str],
+        messages: List[Dict[str, str]],
+        documents: Optional[List[Any]] = None
+    ) -> PackedContext:
+        """
+        Select the prompt parts that fit in `budget` tokens.
+        
+        Args:
+            budget: Prompt token budget
+            fixed_texts: Prompt parts that are always sent
+            messages: Chronological history, ending with the current user message
+            documents: Retrieved documents (objects with `content` and `score`)
+        
+        Returns:
+            PackedContext with the kept documents (by score) and messages (chronological)
+        """
+        documents = documents or []
+        truncated: List[str] = []
+        used = sum(estimate_tokens(text) for text in fixed_texts)
+        
+        # Current user message always goes in
+        kept_messages: List[Dict[str, str]] = []
+        history = list(messages)
+        if history:
+            current = dict(history.pop())
+            cost = estimate_tokens(current["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if used + cost > budget:
+                room = max(MIN_FRAGMENT_TOKENS, budget - used - MESSAGE_OVERHEAD_TOKENS)
+                current["content"] = truncate_to_tokens(current["content"], room)
+                cost = estimate_tokens(current["content"]) + MESSAGE_OVERHEAD_TOKENS
+                truncated.append("current_message")
+            kept_messages.append(current)
+            used += cost
+        
+        # Documents by relevance
+        kept_documents = []
+        ranked = sorted(documents, key=lambda d: getattr(d, "score", 0.0), reverse=True)
+        for index, doc in enumerate(ranked):
+            cost = estimate_tokens(doc.content) + DOCUMENT_OVERHEAD_TOKENS
+            if used + cost <= budget:
+                kept_documents.append(doc)
+                used += cost
+                continue
+            room = budget - used - DOCUMENT_OVERHEAD_TOKENS
+            if room >= MIN_FRAGMENT_TOKENS:
+                kept_documents.append(self._truncated_copy(doc, room))
+                used += estimate_tokens(kept_documents[-1].content) + DOCUMENT_OVERHEAD_TOKENS
+                truncated.append(f"document:{getattr(doc, 'id', index)}")
+            break
+        dropped_documents = len(ranked) - len(kept_documents)
+        
+        # History, newest first
+        for msg in reversed(history):
+            cost = estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if used + cost <= budget:
+                kept_messages.append(msg)
+                used += cost
+                continue
+            room = budget - used - MESSAGE_OVERHEAD_TOKENS
+            if room >= MIN_FRAGMENT_TOKENS:
+                kept_messages.append({**msg, "content": truncate_to_tokens(msg["content"], room)})
+                used += estimate_tokens(kept_messages[-1]["content"]) + MESSAGE_OVERHEAD_TOKENS
+                truncated.append("history")
+            break
+        
+        kept_messages.reverse()
+        # Providers expect the conversation to open with a user turn
+        while len(kept_messages) > 1 and kept_messages[0]["role"] != "user":
+            used -= estimate_tokens(kept_messages[0]["content"]) + MESSAGE_OVERHEAD_TOKENS
+            kept_messages.pop(0)
+        dropped_messages = len(messages) - len(kept_messages)
+        
+        self._counters["packs"] += 1
+        self._counters["tokens"] += used
+        self._counters["dropped_messages"] += dropped_messages
+        self._counters["dropped_documents"] += dropped_documents
+        self._counters["truncations"] += len(truncated)
+        if used > budget:
+            self._counters["over_budget"] += 1
+        
+        if dropped_messages or dropped_documents or truncated:
+            logger.debug(
+                f"Context packed to {used}/{budget} tokens: dropped {dropped_messages} messages, "
+                f"{dropped_documents} documents, truncated {truncated}"
+            )
+        
+        return PackedContext(
+            documents=kept_documents,
+            messages=kept_messages,
+            tokens=used,
+            budget=budget,
+            dropped_messages=dropped_messages,
+            dropped_documents=dropped_documents,
+            truncated=truncated
+        )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Packing counters"""
+        packs = self._counters["packs"]
+        return {
+            **self._counters,
+            "avg_tokens": round(self._counters["tokens"] / packs, 1) if packs else 0.0
+        }
+    
+    @staticmethod
+    def _truncated_copy(doc: Any, max_tokens: int) -> Any:
+        """Copy of a document with its content cut to `max_tokens`"""
+        return replace(doc, content=truncate_to_tokens(doc.content, max_tokens))
+
+
+# Singleton
+_packer: Optional[ContextPacker] = None
+
+
+def get_context_packer() -> ContextPacker:
+    """Get the context packer singleton"""
+    global _packer
+    if _packer is None:
+        _packer = ContextPacker()
+    return _packer
@@ -0,0 +1,401 @@
+"""
+Fake LLM Provider
+Offline record/replay and synthetic responses for load testing
+"""
+
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import structlog
+
+from .context import estimate_tokens
+from .providers import LLMProvider
+from .models import LLMResponse, SystemPrompt, TokenUsage, system_prompt_text
+
+logger = structlog.get_logger()
+
+
+# Vocabulary for synthesized answers (no prices, so output guardrails stay quiet)
+SYNTHETIC_WORDS = [
+    "votre", "projet", "site", "web", "nous", "pouvons", "vous", "accompagner",
+    "avec", "une", "solution", "adaptée", "design", "moderne", "rapide",
+    "référencement", "contenu", "pages", "boutique", "équipe", "conseil",
+    "délai", "option", "maintenance", "mobile", "clients", "visibilité"
+]
+
+
+class FakeProviderError(RuntimeError):
+    """Injected provider failure"""
+    pass
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    Latency model in milliseconds, parsed from "kind:a[:b]":
+    - fixed:MS
+    - uniform:MIN:MAX
+    - normal:MEAN:STDDEV
+    - lognormal:MEDIAN:SIGMA (long tail, closest to real providers)
+    """
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+    
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        parts = spec.split(":")
+        kind = parts[0] or "fixed"
+        values = [float(v) for v in parts[1:]] + [0.0, 0.0]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        return cls(kind=kind, a=values[0], b=values[1])
+    
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(max(self.a, 1e-3)), self.b)
+        else:
+            value = self.a
+        return max(0.0, value)
+
+
+@dataclass
+class Recording:
+    """One recorded provider answer"""
+    key: str
+    text: str
+    chunks: List[str]
+    usage: Dict[str, int]
+    latency_ms: float = 0.0
+
+
+class Cassette:
+    """
+    Recorded answers stored as JSON lines, keyed by request fingerprint.
+    Appending keeps recording cheap and the file diffable.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._recordings: Dict[str, Recording] = {}
+        self._load()
+    
+    @staticmethod
+    def request_key(
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str
+    ) -> str:
+        """Fingerprint of a request (temperature and max_tokens excluded)"""
+        payload = json.dumps(
+            [model, system_prompt_text(system_prompt), messages],
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Recording]:
+        return self._recordings.get(key)
+    
+    def record(self, recording: Recording) -> None:
+        self._recordings[recording.key] = recording
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(recording), ensure_ascii=False) + "\n")
+    
+    def __len__(self) -> int:
+        return len(self._recordings)
+    
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    recording = Recording(**json.loads(line))
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Skipping bad cassette line in {self.path}: {e}")
+                    continue
+                self._recordings[recording.key] = recording
+        logger.info(f"📼 Loaded {len(self._recordings)} recordings from {self.path}")
+
+
+class FakeProvider(LLMProvider):
+    """
+    Local provider for load tests and offline development.
+    
+    Modes:
+    - synth: generate a deterministic answer per request
+    - replay: answer from a cassette, synthesizing on a miss
+    - record: forward to a real provider and append its answers to the cassette
+    
+    Synthesized and replayed answers follow a configurable latency
+    distribution (time to first token when streaming) and inter-token
+    delay, or replay the recorded latency. Errors and timeouts can be
+    injected at a fixed rate. Randomness is seeded per request fingerprint, so a run can be
+    reproduced regardless of how concurrent requests interleave.
+    """
+    
+    name = "fake"
+    accepts_any_model = True
+    
+    def __init__(
+        self,
+        mode: str = "synth",
+        cassette: Optional[Cassette] = None,
+        upstream: Optional[LLMProvider] = None,
+        latency: Optional[LatencyDistribution] = None,
+        inter_token_ms: float = 0.0,
+        output_tokens: int = 80,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_seconds: float = 30.0,
+        replay_latency: bool = False,
+        seed: int = 0,
+        upstream_model: Optional[Callable[[str], str]] = None
+    ):
+        super().__init__(default_model="fake")
+        if mode not in ("synth", "replay", "record"):
+            raise ValueError(f"Unknown fake provider mode: {mode}")
+        if mode in ("replay", "record") and cassette is None:
+            raise ValueError(f"Fake provider mode '{mode}' needs a cassette")
+        if mode == "record" and upstream is None:
+            raise ValueError("Fake provider mode 'record' needs an upstream provider")
+        
+        self.mode = mode
+        self.cassette = cassette
+        self.upstream = upstream
+        self.upstream_model = upstream_model or (lambda model: model)
+        self.latency = latency or LatencyDistribution()
+        self.inter_token_ms = inter_token_ms
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.replay_latency = replay_latency
+        self.seed = seed
+        self._occurrences: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {
+            "requests": 0,
+            "synthesized": 0,
+            "replayed": 0,
+            "replay_misses": 0,
+            "recorded": 0,
+            "injected_errors": 0,
+            "injected_timeouts": 0
+        }
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
+        """Answer from the cassette, the upstream provider or the synthesizer"""
+        key = Cassette.request_key(messages, system_prompt, model)
+        rng = self._rng(key)
+        
+        if self.mode == "record":
+            started = time.perf_counter()
+            response = await self.upstream.complete(
+                messages, system_prompt, self.upstream_model(model), temperature, max_tokens
+            )
+            latency_ms = (time.perf_counter() - started) * 1000
+            self._record(key, response.text, [response.text], response.usage, latency_ms)
+            return response
+        
+        await self._inject_faults(rng)
+        recording = self._answer(key, messages, system_prompt, max_tokens, rng)
+        await asyncio.sleep(self._latency_ms(recording, rng) / 1000)
+        
+        return LLMResponse(
+            text=recording.text,
+            provider=self.name,
+            model=model,
+            usage=TokenUsage(**recording.usage)
+        )
+    
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        usage: TokenUsage
+    ) -> AsyncIterator[str]:
+        """Stream an answer chunk by chunk with the configured delays"""
+        key = Cassette.request_key(messages, system_prompt, model)
+        rng = self._rng(key)
+        
+        if self.mode == "record":
+            chunks: List[str] = []
+            upstream_usage = TokenUsage()
+            async for chunk in self.upstream.stream(
+                messages, system_prompt, self.upstream_model(model), temperature, max_tokens, upstream_usage
+            ):
+                chunks.append(chunk)
+                yield chunk
+            usage.add(upstream_usage)
+            self._record(key, "".join(chunks), chunks, upstream_usage, None)
+            return
+        
+        await self._inject_faults(rng)
+        recording = self._answer(key, messages, system_prompt, max_tokens, rng)
+        await asyncio.sleep(self._latency_ms(recording, rng) / 1000)
+        
+        for index, chunk in enumerate(recording.chunks):
+            if index and self.inter_token_ms:
+                await asyncio.sleep(self.inter_token_ms / 1000)
+            yield chunk
+        
+        usage.add(TokenUsage(**recording.usage))
+    
+    @property
+    def preconnect_target(self) -> Optional[Tuple[str, Any]]:
+        return self.upstream.preconnect_target if self.upstream else None
+    
+    async def aclose(self) -> None:
+        if self.upstream:
+            await self.upstream.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Fake provider counters"""
+        return {
+            **super().stats(),
+            **self._counters,
+            "mode": self.mode,
+            "cassette_size": len(self.cassette) if self.cassette else 0
+        }
+    
+    def _rng(self, key: str) -> random.Random:
+        """Per-request random source: seed, fingerprint and repeat count"""
+        occurrence = self._occurrences.get(key, 0)
+        self._occurrences[key] = occurrence + 1
+        self._counters["requests"] += 1
+        return random.Random(f"{self.seed}:{key}:{occurrence}")
+    
+    async def _inject_faults(self, rng: random.Random) -> None:
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            self._counters["injected_timeouts"] += 1
+            await asyncio.sleep(self.timeout_seconds)
+            raise asyncio.TimeoutError("Injected fake provider timeout")
+        if roll < self.timeout_rate + self.error_rate:
+            self._counters["injected_errors"] += 1
+            raise FakeProviderError("Injected fake provider error")
+    
+    def _answer(
+        self,
+        key: str,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        max_tokens: int,
+        rng: random.Random
+    ) -> Recording:
+        if self.mode == "replay":
+            recording = self.cassette.get(key)
+            if recording:
+                self._counters["replayed"] += 1
+                return recording
+            self._counters["replay_misses"] += 1
+        
+        self._counters["synthesized"] += 1
+        return self._synthesize(key, messages, system_prompt, max_tokens, rng)
+    
+    def _synthesize(
+        self,
+        key: str,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        max_tokens: int,
+        rng: random.Random
+    ) -> Recording:
+        """Deterministic answer of roughly `output_tokens` tokens"""
+        target = max(1, min(self.output_tokens, max_tokens))
+        chunks = [f"Réponse simulée {key[:8]}."]
+        tokens = estimate_tokens(chunks[0])
+        while tokens < target:
+            word = rng.choice(SYNTHETIC_WORDS)
+            chunks.append(f" {word}")
+            tokens += estimate_tokens(word)
+        chunks.append(" 😊")
+        
+        prompt_tokens = estimate_tokens(system_prompt_text(system_prompt))
+        prompt_tokens += sum(estimate_tokens(msg.get("content", "")) for msg in messages)
+        return Recording(
+            key=key,
+            text="".join(chunks),
+            chunks=chunks,
+            usage=asdict(TokenUsage(input_tokens=prompt_tokens, output_tokens=tokens + 1))
+        )
+    
+    def _latency_ms(self, recording: Recording, rng: random.Random) -> float:
+        sampled = self.latency.sample(rng)
+        if self.replay_latency and recording.latency_ms:
+            return recording.latency_ms
+        return sampled
+    
+    def _record(
+        self,
+        key: str,
+        text: str,
+        chunks: List[str],
+        usage: TokenUsage,
+        latency_ms: Optional[float]
+    ) -> None:
+        self.cassette.record(Recording(
+            key=key,
+            text=text,
+            chunks=chunks,
+            usage=asdict(usage),
+            latency_ms=latency_ms or 0.0
+        ))
+        self._counters["recorded"] += 1
+
+
+def create_fake_provider(
+    mode: str,
+    upstream: Optional[LLMProvider] = None,
+    upstream_model: Optional[Callable[[str], str]] = None
+) -> FakeProvider:
+    """
+    Build the fake provider from LLM_FAKE_* settings.
+    
+    Args:
+        mode: synth, replay or record
+        upstream: Real provider to record from (record mode)
+        upstream_model: Maps a requested model to the one sent upstream
+    """
+    cassette_path = os.getenv("LLM_FAKE_CASSETTE", "")
+    return FakeProvider(
+        mode=mode,
+        cassette=Cassette(cassette_path) if cassette_path else None,
+        upstream=upstream,
+        latency=LatencyDistribution.parse(os.getenv("LLM_FAKE_LATENCY", "lognormal:800:0.4")),
+        inter_token_ms=float(os.getenv("LLM_FAKE_INTER_TOKEN_MS", "15")),
+        output_tokens=int(os.getenv("LLM_FAKE_OUTPUT_TOKENS", "80")),
+        error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", "0")),
+        timeout_rate=float(os.getenv("LLM_FAKE_TIMEOUT_RATE", "0")),
+        timeout_seconds=float(os.getenv("LLM_FAKE_TIMEOUT_SECONDS", "30")),
+        replay_latency=os.getenv("LLM_FAKE_REPLAY_LATENCY", "false").lower() == "true",
+        seed=int(os.getenv("LLM_FAKE_SEED", "0")),
+        upstream_model=upstream_model
+    )
@@ -0,0 +1,247 @@
+"""
+Usage Metering
+Per agent, session and day token accounting with session budgets
+"""
+
+import os
+import time
+import asyncio
+from collections import OrderedDict, defaultdict
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+import structlog
+
+from .models import LLMResponse, TokenUsage
+from ..memory import get_redis_client
+
+logger = structlog.get_logger()
+
+
+USAGE_FIELDS = (
+    "requests",
+    "input_tokens",
+    "output_tokens",
+    "cache_read_tokens",
+    "cache_creation_tokens",
+    "latency_ms"
+)
+
+
+class BudgetStatus(Enum):
+    OK = "ok"
+    DEGRADED = "degraded"  # Over the soft budget: cheap model
+    EXHAUSTED = "exhausted"  # Over the hard budget: no more LLM calls
+
+
+def _today() -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+class UsageMeter:
+    """
+    In-process usage accumulator.
+    
+    Recording is a few dict increments on the event loop thread, with
+    no locks and no I/O. A background task periodically swaps the
+    pending counters for an empty dict and adds them to Redis hashes
+    (HINCRBY, so several workers can flush into the same keys):
+        webshop:usage:{day}:agent:{agent}
+        webshop:usage:{day}:session:{session_id}
+    
+    Session totals for budgets are kept locally for the current day
+    (bounded LRU). With several workers each one enforces the budget on
+    the traffic it sees; sticky sessions keep that close to exact.
+    """
+    
+    def __init__(
+        self,
+        redis_client: Any = None,
+        flush_interval_seconds: float = 10.0,
+        retention_days: int = 35,
+        session_soft_budget: int = 0,
+        session_hard_budget: int = 0,
+        max_sessions: int = 50_000
+    ):
+        self.redis = redis_client
+        self.flush_interval = flush_interval_seconds
+        self.retention_seconds = retention_days * 86400
+        self.session_soft_budget = session_soft_budget
+        self.session_hard_budget = session_hard_budget
+        self.max_sessions = max_sessions
+        
+        self._day = _today()
+        self._pending: Dict[Tuple[str, str, str], Dict[str, float]] = {}  # (day, kind, id) -> counters
+        self._agents: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(USAGE_FIELDS, 0))
+        self._sessions: "OrderedDict[str, int]" = OrderedDict()  # session_id -> billable tokens today
+        self._flush_task: Optional[asyncio.Task] = None
+        self._counters: Dict[str, int] = {
+            "recorded": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "degraded_turns": 0,
+            "exhausted_turns": 0
+        }
+    
+    def record(
+        self,
+        agent: str,
+        session_id: Optional[str],
+        usage: TokenUsage,
+        latency_ms: Optional[float] = None
+    ) -> None:
+        """
+        Account one provider call.
+        
+        Args:
+            agent: Agent name (lowercase)
+            session_id: Conversation the call was made for, if any
+            usage: Token usage reported by the provider
+            latency_ms: Call latency
+        """
+        self._roll_day()
+        values = {
+            "requests": 1,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_read_tokens": usage.cache_read_tokens,
+            "cache_creation_tokens": usage.cache_creation_tokens,
+            "latency_ms": round(latency_ms or 0.0)
+        }
+        
+        self._add(self._agents[agent], values)
+        # Without Redis nothing would ever flush the pending counters
+        if self.redis is not None:
+            self._add(self._pending_for("agent", agent), values)
+        if session_id:
+            if self.redis is not None:
+                self._add(self._pending_for("session", session_id), values)
+            self._sessions[session_id] = self._sessions.get(session_id, 0) + self._billable(usage)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        
+        self._counters["recorded"] += 1
+    
+    def record_response(self, agent: str, session_id: Optional[str], response: LLMResponse) -> None:
+        """Account a completed call"""
+        self.record(agent, session_id, response.usage, response.latency_ms)
+    
+    def session_tokens(self, session_id: str) -> int:
+        """Billable tokens used by a session today"""
+        self._roll_day()
+        return self._sessions.get(session_id, 0)
+    
+    def budget_status(self, session_id: Optional[str]) -> BudgetStatus:
+        """Where a session stands against the configured budgets (0 = no budget)"""
+        if not session_id:
+            return BudgetStatus.OK
+        used = self.session_tokens(session_id)
+        if self.session_hard_budget and used >= self.session_hard_budget:
+            self._counters["exhausted_turns"] += 1
+            return BudgetStatus.EXHAUSTED
+        if self.session_soft_budget and used >= self.session_soft_budget:
+            self._counters["degraded_turns"] += 1
+            return BudgetStatus.DEGRADED
+        return BudgetStatus.OK
+    
+    def start(self) -> None:
+        """Start the periodic Redis flush"""
+        if self._flush_task is None and self.redis is not None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self) -> None:
+        """Stop the periodic flush and flush what's left"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+    
+    async def flush(self) -> None:
+        """Add pending counters to Redis"""
+        if not self._pending or self.redis is None:
+            return
+        # Swap first: records made while we await Redis go to the next batch
+        pending, self._pending = self._pending, {}
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for (day, kind, key), values in pending.items():
+                redis_key = f"webshop:usage:{day}:{kind}:{key}"
+                for field, value in values.items():
+                    if value:
+                        pipe.hincrby(redis_key, field, int(value))
+                pipe.expire(redis_key, self.retention_seconds)
+            await pipe.execute()
+            self._counters["flushes"] += 1
+        except Exception as e:
+            self._counters["flush_errors"] += 1
+            logger.warning(f"Usage flush to Redis failed, keeping counters for next flush: {e}")
+            for key, values in pending.items():
+                self._add(self._pending.setdefault(key, dict.fromkeys(USAGE_FIELDS, 0)), values)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Today's usage per agent, heaviest sessions and budget actions"""
+        self._roll_day()
+        top_sessions = sorted(self._sessions.items(), key=lambda item: item[1], reverse=True)[:10]
+        return {
+            **self._counters,
+            "day": self._day,
+            "agents": {agent: dict(values) for agent, values in self._agents.items()},
+            "sessions_tracked": len(self._sessions),
+            "top_sessions": dict(top_sessions),
+            "pending_keys": len(self._pending),
+            "session_soft_budget": self.session_soft_budget,
+            "session_hard_budget": self.session_hard_budget
+        }
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    def _pending_for(self, kind: str, key: str) -> Dict[str, float]:
+        pending_key = (self._day, kind, key)
+        counters = self._pending.get(pending_key)
+        if counters is None:
+            counters = self._pending[pending_key] = dict.fromkeys(USAGE_FIELDS, 0)
+        return counters
+    
+    def _roll_day(self) -> None:
+        """Reset daily totals at midnight UTC (pending counters keep their day)"""
+        today = _today()
+        if today != self._day:
+            self._day = today
+            self._agents.clear()
+            self._sessions.clear()
+    
+    @staticmethod
+    def _billable(usage: TokenUsage) -> int:
+        """Tokens counted against budgets (cache reads are ~10x cheaper, ignore them)"""
+        return usage.input_tokens + usage.cache_creation_tokens + usage.output_tokens
+    
+    @staticmethod
+    def _add(counters: Dict[str, float], values: Dict[str, float]) -> None:
+        for field, value in values.items():
+            counters[field] += value
+
+
+# Singleton
+_meter: Optional[UsageMeter] = None
+
+
+def get_usage_meter() -> UsageMeter:
+    """Get the usage meter singleton"""
+    global _meter
+    if _meter is None:
+        _meter = UsageMeter(
+            redis_client=get_redis_client(),
+            flush_interval_seconds=float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "10")),
+            retention_days=int(os.getenv("USAGE_RETENTION_DAYS", "35")),
+            session_soft_budget=int(os.getenv("SESSION_TOKEN_SOFT_BUDGET", "0")),
+            session_hard_budget=int(os.getenv("SESSION_TOKEN_HARD_BUDGET", "0"))
+        )
+    return _meter
@@ -0,0 +1,80 @@
+"""
+LLM Data Models
+Provider-independent request and response types
+"""
+
+from typing import Any, Dict, List, Optional, Union
+from dataclasses import dataclass, field
+
+
+@dataclass
+class SystemBlock:
+    """
+    One block of a structured system prompt.
+    
+    `cache=True` places a prompt-cache breakpoint after the block, so
+    providers that support prefix caching (Anthropic) can reuse
+    everything up to and including it across requests.
+    """
+    text: str
+    cache: bool = False
+
+
+# A system prompt is either plain text or ordered blocks (static first)
+SystemPrompt = Union[str, List[SystemBlock]]
+
+
+def system_prompt_text(system_prompt: SystemPrompt) -> str:
+    """Flatten a system prompt to plain text"""
+    if isinstance(system_prompt, str):
+        return system_prompt
+    return "\n".join(block.text for block in system_prompt if block.text)
+
+
+def system_prompt_payload(system_prompt: SystemPrompt) -> Union[str, List[Dict[str, Any]]]:
+    """Anthropic `system` parameter, with cache_control on breakpoint blocks"""
+    if isinstance(system_prompt, str):
+        return system_prompt
+    
+    blocks = []
+    for block in system_prompt:
+        if not block.text:
+            continue
+        payload: Dict[str, Any] = {"type": "text", "text": block.text}
+        if block.cache:
+            payload["cache_control"] = {"type": "ephemeral"}
+        blocks.append(payload)
+    return blocks
+
+
+@dataclass
+class TokenUsage:
+    """Token counts reported by a provider for one request"""
+    input_tokens: int = 0  # Uncached input tokens
+    output_tokens: int = 0
+    cache_read_tokens: int = 0  # Input tokens served from the provider prompt cache
+    cache_creation_tokens: int = 0  # Input tokens written to the provider prompt cache
+    
+    @property
+    def total_tokens(self) -> int:
+        return (
+            self.input_tokens + self.cache_read_tokens
+            + self.cache_creation_tokens + self.output_tokens
+        )
+    
+    def add(self, other: "TokenUsage") -> None:
+        """Accumulate another usage report into this one"""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cache_read_tokens += other.cache_read_tokens
+        self.cache_creation_tokens += other.cache_creation_tokens
+
+
+@dataclass
+class LLMResponse:
+    """A completed LLM call"""
+    text: str
+    provider: str
+    model: str
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    latency_ms: Optional[float] = None
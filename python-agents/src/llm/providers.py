@@ -0,0 +1,450 @@
+"""
+LLM Providers
+Common interface for the backends the router can send requests to
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import structlog
+import httpx
+import anthropic
+import google.generativeai as genai
+
+from .models import (
+    LLMResponse,
+    SystemPrompt,
+    TokenUsage,
+    system_prompt_payload,
+    system_prompt_text
+)
+
+logger = structlog.get_logger()
+
+
+class LLMProvider(ABC):
+    """
+    Base class for LLM providers.
+    
+    The router handles caching, admission, circuit breaking and
+    fallback; a provider only turns one request into one completion
+    (or one stream) and reports token usage.
+    """
+    
+    name: str = "provider"
+    # Sent the requested model even as a fallback (e.g. the fake provider,
+    # which keys its cassette on it)
+    accepts_any_model: bool = False
+    
+    def __init__(self, default_model: str):
+        self.default_model = default_model
+    
+    @abstractmethod
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
+        """
+        Run a chat completion.
+        
+        Args:
+            messages: Conversation history, ending with the user turn
+            system_prompt: System prompt, as text or blocks
+            model: Model name
+            temperature: Response creativity (0-1)
+            max_tokens: Maximum response length
+        
+        Returns:
+            LLMResponse with text and token usage
+        """
+        pass
+    
+    @abstractmethod
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        usage: TokenUsage
+    ) -> AsyncIterator[str]:
+        """Stream text deltas, adding the token usage to `usage` once done"""
+        pass
+    
+    @property
+    def preconnect_target(self) -> Optional[Tuple[str, Any]]:
+        """
+        HTTP endpoint to warm up at startup, with the client this provider
+        sends through (None when not over the shared transport)
+        """
+        return None
+    
+    async def aclose(self) -> None:
+        """Release network resources"""
+        pass
+    
+    def stats(self) -> Dict[str, Any]:
+        """Provider-specific metrics"""
+        return {"default_model": self.default_model}
+
+
+class ClaudeProvider(LLMProvider):
+    """Anthropic Messages API"""
+    
+    name = "claude"
+    
+    def __init__(
+        self,
+        api_key: str,
+        default_model: str = "claude-sonnet-4-20250514",
+        http_client: Optional[Any] = None
+    ):
+        """
+        Args:
+            api_key: Anthropic API key
+            default_model: Model used when Claude serves as a fallback
+            http_client: Shared anthropic.DefaultAsyncHttpxClient (owned by the transport layer)
+        """
+        super().__init__(default_model)
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+        self.client = anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client)
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
+        """Chat with Claude"""
+        
+        response = await self.client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt_payload(system_prompt),
+            messages=messages
+        )
+        
+        # Extract text from response
+        text = ""
+        for block in response.content:
+            if block.type == "text":
+                text = block.text
+                break
+        
+        return LLMResponse(
+            text=text,
+            provider=self.name,
+            model=model,
+            usage=self._usage(response.usage)
+        )
+    
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        usage: TokenUsage
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from Claude, filling `usage` once done"""
+        
+        async with self.client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt_payload(system_prompt),
+            messages=messages
+        ) as stream:
+            async for text in stream.text_stream:
+                if text:
+                    yield text
+            
+            final = await stream.get_final_message()
+            usage.add(self._usage(final.usage))
+    
+    @property
+    def preconnect_target(self) -> Optional[Tuple[str, Any]]:
+        if self._owns_http_client:
+            return None
+        return str(self.client.base_url), self._http_client
+    
+    async def aclose(self) -> None:
+        if self._owns_http_client:
+            await self.client.close()
+    
+    @staticmethod
+    def _usage(usage: Any) -> TokenUsage:
+        """Convert Anthropic usage to TokenUsage"""
+        if usage is None:
+            return TokenUsage()
+        return TokenUsage(
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+            cache_creation_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0
+        )
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini through google.generativeai.
+    
+    The SDK talks gRPC over its own channel, so it doesn't use the
+    shared HTTP transport.
+    """
+    
+    name = "gemini"
+    
+    def __init__(self, api_key: str, default_model: str = "gemini-2.0-flash"):
+        super().__init__(default_model)
+        genai.configure(api_key=api_key)
+        self._models: Dict[str, Any] = {}
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
+        """Chat with Gemini"""
+        
+        chat, last_msg = self._start_chat(model, messages, system_prompt)
+        
+        # Generate response
+        response = await chat.send_message_async(
+            last_msg,
+            generation_config={
+                "temperature": temperature,
+                "max_output_tokens": max_tokens
+            }
+        )
+        
+        return LLMResponse(
+            text=response.text,
+            provider=self.name,
+            model=model,
+            usage=self._usage(getattr(response, "usage_metadata", None))
+        )
+    
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        usage: TokenUsage
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from Gemini, filling `usage` once done"""
+        
+        chat, last_msg = self._start_chat(model, messages, system_prompt)
+        
+        response = await chat.send_message_async(
+            last_msg,
+            generation_config={
+                "temperature": temperature,
+                "max_output_tokens": max_tokens
+            },
+            stream=True
+        )
+        
+        metadata = None
+        async for chunk in response:
+            metadata = getattr(chunk, "usage_metadata", None) or metadata
+            if chunk.text:
+                yield chunk.text
+        
+        usage.add(self._usage(metadata))
+    
+    def _model(self, model: str) -> Any:
+        """GenerativeModel for a model name, created once"""
+        if model not in self._models:
+            self._models[model] = genai.GenerativeModel(model)
+        return self._models[model]
+    
+    def _start_chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt
+    ) -> Tuple[Any, str]:
+        """Open a Gemini chat session and return it with the last user turn"""
+        
+        # Convert messages to Gemini format
+        history = []
+        for msg in messages[:-1]:
+            role = "model" if msg["role"] == "assistant" else "user"
+            history.append({"role": role, "parts": [msg["content"]]})
+        
+        # Create chat
+        chat = self._model(model).start_chat(history=history)
+        
+        # Prepend system prompt to last message
+        last_msg = messages[-1]["content"]
+        system_text = system_prompt_text(system_prompt)
+        if system_text:
+            last_msg = f"{system_text}\n\n{last_msg}"
+        
+        return chat, last_msg
+    
+    @staticmethod
+    def _usage(metadata: Any) -> TokenUsage:
+        """Convert Gemini usage metadata to TokenUsage"""
+        if metadata is None:
+            return TokenUsage()
+        # The prompt count includes the cached tokens
+        cached = getattr(metadata, "cached_content_token_count", 0) or 0
+        return TokenUsage(
+            input_tokens=(getattr(metadata, "prompt_token_count", 0) or 0) - cached,
+            output_tokens=getattr(metadata, "candidates_token_count", 0) or 0,
+            cache_read_tokens=cached
+        )
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Any server exposing the OpenAI chat completions API (vLLM, llama.cpp,
+    Ollama, TGI...), typically a self-hosted model for cheap turns.
+    
+    Requests go through a pooled httpx client (the shared transport's
+    when given, whose "llm" pool limits then apply), so connections to
+    the server are kept alive and reused.
+    """
+    
+    name = "local"
+    
+    def __init__(
+        self,
+        base_url: str,
+        default_model: str,
+        api_key: Optional[str] = None,
+        timeout_seconds: float = 60.0,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        super().__init__(default_model)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout_seconds, connect=5.0)
+        self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._owns_http_client = http_client is None
+        self.client = http_client or httpx.AsyncClient(timeout=self.timeout)
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
+        """Chat with the OpenAI-compatible server"""
+        
+        response = await self.client.post(
+            f"{self.base_url}/chat/completions",
+            json=self._payload(messages, system_prompt, model, temperature, max_tokens),
+            headers=self._headers,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        choices = data.get("choices") or [{}]
+        text = (choices[0].get("message") or {}).get("content") or ""
+        
+        return LLMResponse(
+            text=text,
+            provider=self.name,
+            model=data.get("model", model),
+            usage=self._usage(data.get("usage"))
+        )
+    
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        usage: TokenUsage
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from server-sent events, filling `usage` once done"""
+        
+        payload = self._payload(messages, system_prompt, model, temperature, max_tokens)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        
+        async with self.client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            json=payload,
+            headers=self._headers,
+            timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                
+                event = json.loads(data)
+                if event.get("usage"):
+                    usage.add(self._usage(event["usage"]))
+                for choice in event.get("choices") or []:
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        yield text
+    
+    @property
+    def preconnect_target(self) -> Optional[Tuple[str, Any]]:
+        return self.base_url, self.client
+    
+    async def aclose(self) -> None:
+        if self._owns_http_client:
+            await self.client.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "base_url": self.base_url}
+    
+    @staticmethod
+    def _payload(
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        """Chat completions request body (system prompt as the first message)"""
+        system_text = system_prompt_text(system_prompt)
+        chat_messages = [{"role": "system", "content": system_text}] if system_text else []
+        chat_messages += [{"role": msg["role"], "content": msg["content"]} for msg in messages]
+        return {
+            "model": model,
+            "messages": chat_messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+    
+    @staticmethod
+    def _usage(usage: Optional[Dict[str, Any]]) -> TokenUsage:
+        """Convert OpenAI usage to TokenUsage"""
+        if not usage:
+            return TokenUsage()
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        return TokenUsage(
+            input_tokens=(usage.get("prompt_tokens") or 0) - cached,
+            output_tokens=usage.get("completion_tokens") or 0,
+            cache_read_tokens=cached
+        )
@@ -0,0 +1,163 @@
+"""
+Provider Resilience
+Circuit breakers and hedging statistics for LLM providers
+"""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+class BreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker driven by a rolling window of calls.
+    
+    Opens when the error rate or the share of slow calls in the window
+    crosses its threshold, rejects calls while open, then lets a few
+    probe calls through (half-open) after a cooldown to decide whether
+    to close again.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        error_rate_threshold: float = 0.5,
+        slow_call_ms: float = 20000.0,
+        slow_call_rate_threshold: float = 0.5,
+        min_calls: int = 5,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.state = BreakerState.CLOSED
+        self._error_rate_threshold = error_rate_threshold
+        self._slow_call_ms = slow_call_ms
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._min_calls = min_calls
+        self._window_seconds = window_seconds
+        self._open_seconds = open_seconds
+        self._half_open_max_calls = half_open_max_calls
+        self._calls: Deque[Tuple[float, bool, Optional[float]]] = deque()  # (time, ok, latency_ms)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._counters: Dict[str, int] = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0
+        }
+    
+    def allow(self) -> bool:
+        """Whether a call may be sent to this provider now"""
+        if self.state == BreakerState.OPEN:
+            if time.monotonic() - self._opened_at < self._open_seconds:
+                self._counters["rejected"] += 1
+                return False
+            self._transition(BreakerState.HALF_OPEN)
+        
+        if self.state == BreakerState.HALF_OPEN:
+            if self._probes_in_flight >= self._half_open_max_calls:
+                self._counters["rejected"] += 1
+                return False
+            self._probes_in_flight += 1
+        
+        return True
+    
+    def record_success(self, latency_ms: Optional[float] = None) -> None:
+        """
+        Record a successful call.
+        
+        Args:
+            latency_ms: Full call latency, or None when not comparable
+                        (e.g. streamed calls)
+        """
+        self._counters["successes"] += 1
+        if self.state == BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._calls.clear()
+            self._transition(BreakerState.CLOSED)
+        self._record(True, latency_ms)
+    
+    def record_failure(self) -> None:
+        """Record a failed call"""
+        self._counters["failures"] += 1
+        if self.state == BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._trip()
+            return
+        self._record(False, None)
+    
+    def record_cancelled(self) -> None:
+        """Release a call that was cancelled before it finished (e.g. a hedge loser)"""
+        if self.state == BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+    
+    def latency_percentile(self, percentile: float, min_samples: int = 20) -> Optional[float]:
+        """Latency percentile (ms) of successful calls in the window, if enough samples"""
+        self._expire()
+        latencies = sorted(lat for _, ok, lat in self._calls if ok and lat is not None)
+        if len(latencies) < min_samples:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and window statistics"""
+        self._expire()
+        total = len(self._calls)
+        errors = sum(1 for _, ok, _ in self._calls if not ok)
+        return {
+            **self._counters,
+            "state": self.state.value,
+            "window_calls": total,
+            "window_error_rate": round(errors / total, 4) if total else 0.0,
+            "p95_ms": self.latency_percentile(95, min_samples=1)
+        }
+    
+    def _record(self, ok: bool, latency_ms: Optional[float]) -> None:
+        self._calls.append((time.monotonic(), ok, latency_ms))
+        self._expire()
+        
+        if self.state != BreakerState.CLOSED or len(self._calls) < self._min_calls:
+            return
+        
+        total = len(self._calls)
+        errors = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+        slow = sum(
+            1 for _, call_ok, lat in self._calls
+            if call_ok and lat is not None and lat >= self._slow_call_ms
+        )
+        if errors / total >= self._error_rate_threshold:
+            logger.warning(f"Circuit {self.name} opening: error rate {errors}/{total}")
+            self._trip()
+        elif slow / total >= self._slow_call_rate_threshold:
+            logger.warning(f"Circuit {self.name} opening: slow calls {slow}/{total}")
+            self._trip()
+    
+    def _trip(self) -> None:
+        self._opened_at = time.monotonic()
+        self._counters["opened"] += 1
+        self._transition(BreakerState.OPEN)
+    
+    def _transition(self, state: BreakerState) -> None:
+        if state != self.state:
+            logger.info(f"Circuit {self.name}: {self.state.value} -> {state.value}")
+            self.state = state
+            if state != BreakerState.HALF_OPEN:
+                self._probes_in_flight = 0
+    
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self._window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
@@ -4,144 +4,675 @@ Routes requests to Claude (primary) or Gemini (fallback)
 """
 
 import os
-from typing import List, Dict, Optional, Any
+import time
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Any, Tuple
 import structlog
 import anthropic
-import google.generativeai as genai
+
+from .cache import ResponseCache
+from .resilience import CircuitBreaker
+from .singleflight import SingleFlight
+from .context import estimate_tokens
+from .admission import AdmissionRejected, ProviderAdmission
+from .providers import LLMProvider, ClaudeProvider, GeminiProvider, OpenAICompatibleProvider
+from .fake import create_fake_provider
+from .metering import get_usage_meter
+from .models import (
+    LLMResponse,
+    SystemPrompt,
+    TokenUsage,
+    system_prompt_payload,
+    system_prompt_text
+)
+from ..memory import get_redis_client
+from ..transport import get_http_transport
+from ..orchestrator.deadline import DeadlineExceeded, iterate_within, within
+from ..orchestrator.shedding import check_llm_call
 
 logger = structlog.get_logger()
 
 
+# Model name prefix -> provider (longest prefix wins). Prefixes ending
+# with "/" are namespaces stripped before the request is sent, so
+# "local/qwen2.5-7b-instruct" reaches the local server as "qwen2.5-7b-instruct".
+DEFAULT_MODEL_ROUTES = {
+    "claude": "claude",
+    "gemini": "gemini",
+    "local/": "local"
+}
+
+
 class LLMRouter:
     """
     Routes LLM requests to available providers.
     Claude is primary, Gemini is fallback.
+    
+    The requested model picks the first provider through the model
+    routes (e.g. an agent configured with "local/<model>" is served by
+    the self-hosted OpenAI-compatible server); the other providers stay
+    behind it as fallbacks, with their default model.
+    
+    Set LLM_FAKE_MODE (synth, replay, record) to swap the real providers
+    for the local fake provider, e.g. for load tests without API calls.
     """
     
     def __init__(self):
-        self.claude_client = None
-        self.gemini_model = None
+        self.providers: Dict[str, LLMProvider] = {}  # In fallback order
         self._init_providers()
+        self.routes = self._load_routes()
+        self.meter = get_usage_meter()
+        self.cache = ResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "300")),
+            redis_client=get_redis_client(),
+            redis_ttl_seconds=int(os.getenv("LLM_CACHE_REDIS_TTL_SECONDS", "3600")),
+            max_temperature=float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.8"))
+        )
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(
+                name,
+                error_rate_threshold=float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5")),
+                slow_call_ms=float(os.getenv("LLM_BREAKER_SLOW_CALL_MS", "20000")),
+                min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", "5")),
+                window_seconds=float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "60")),
+                open_seconds=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+            )
+            for name in self.providers
+        }
+        self.admission: Dict[str, ProviderAdmission] = {
+            name: ProviderAdmission(
+                name,
+                max_concurrency=int(os.getenv(f"LLM_{name.upper()}_MAX_CONCURRENCY", "16")),
+                requests_per_minute=float(os.getenv(f"LLM_{name.upper()}_REQUESTS_PER_MINUTE", "0")),
+                tokens_per_minute=float(os.getenv(f"LLM_{name.upper()}_TOKENS_PER_MINUTE", "0")),
+                max_queue=int(os.getenv("LLM_ADMISSION_MAX_QUEUE", "64")),
+                max_wait_seconds=float(os.getenv("LLM_ADMISSION_MAX_WAIT_SECONDS", "5"))
+            )
+            for name in self.providers
+        }
+        self.coalescing_enabled = os.getenv("LLM_COALESCE", "true").lower() == "true"
+        self._single_flight = SingleFlight()
+        self.hedging_enabled = os.getenv("LLM_HEDGING", "false").lower() == "true"
+        self.hedge_default_delay_ms = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_MS", "4000"))
+        self._hedge_stats: Dict[str, int] = {
+            "fired": 0,
+            "primary_wins": 0,
+            "hedge_wins": 0,
+            "both_failed": 0
+        }
+        self._prompt_cache_stats: Dict[str, int] = {
+            "requests": 0,
+            "requests_with_cache_hit": 0,
+            "input_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_creation_tokens": 0
+        }
     
     def _init_providers(self) -> None:
         """Initialize available LLM providers"""
+        transport = get_http_transport()
         
         # Claude (Anthropic)
         anthropic_key = os.getenv("ANTHROPIC_API_KEY")
         if anthropic_key:
-            self.claude_client = anthropic.AsyncAnthropic(api_key=anthropic_key)
+            self.providers["claude"] = ClaudeProvider(
+                api_key=anthropic_key,
+                http_client=transport.client("llm", anthropic.DefaultAsyncHttpxClient)
+            )
             logger.info("✅ Claude client initialized")
         
         # Gemini (Google)
         google_key = os.getenv("GOOGLE_AI_API_KEY")
         if google_key:
-            genai.configure(api_key=google_key)
-            self.gemini_model = genai.GenerativeModel('gemini-2.0-flash')
+            self.providers["gemini"] = GeminiProvider(api_key=google_key)
             logger.info("✅ Gemini client initialized")
         
-        if not self.claude_client and not self.gemini_model:
+        # Self-hosted model behind an OpenAI-compatible API
+        local_url = os.getenv("LOCAL_LLM_BASE_URL")
+        if local_url:
+            self.providers["local"] = OpenAICompatibleProvider(
+                base_url=local_url,
+                default_model=os.getenv("LOCAL_LLM_MODEL", "llama-3.1-8b-instruct"),
+                api_key=os.getenv("LOCAL_LLM_API_KEY") or None,
+                timeout_seconds=float(os.getenv("LOCAL_LLM_TIMEOUT_SECONDS", "60")),
+                http_client=transport.client("llm")
+            )
+            logger.info(f"✅ Local LLM client initialized ({local_url})")
+        
+        # Fake provider replaces the real ones (records from the first one)
+        fake_mode = os.getenv("LLM_FAKE_MODE", "")
+        if fake_mode:
+            real = self.providers
+            upstream_name, upstream = next(iter(real.items()), (None, None))
+            
+            def upstream_model(model: str) -> str:
+                """Model the real routing would send the upstream provider"""
+                routed = self._route(model, real)
+                return next(routed_model for name, _, routed_model in routed if name == upstream_name)
+            
+            self.providers = {"fake": create_fake_provider(fake_mode, upstream, upstream_model)}
+            logger.info(f"🧪 Fake LLM provider initialized (mode={fake_mode})")
+        
+        if not self.providers:
             logger.warning("⚠️ No LLM providers configured!")
     
+    def _load_routes(self) -> Dict[str, str]:
+        """Default model routes plus LLM_MODEL_ROUTES ("prefix=provider,...")"""
+        routes = dict(DEFAULT_MODEL_ROUTES)
+        for item in os.getenv("LLM_MODEL_ROUTES", "").split(","):
+            prefix, _, provider = item.partition("=")
+            if prefix.strip() and provider.strip():
+                routes[prefix.strip()] = provider.strip()
+        return routes
+    
+    def preconnect_targets(self) -> List[Tuple[str, Any]]:
+        """Provider endpoints served by the shared HTTP transport, with their clients"""
+        targets = [provider.preconnect_target for provider in self.providers.values()]
+        return [target for target in targets if target]
+    
+    async def aclose(self) -> None:
+        """Close provider clients"""
+        for provider in self.providers.values():
+            await provider.aclose()
+    
     async def chat(
         self,
         messages: List[Dict[str, str]],
-        system_prompt: str = "",
+        system_prompt: SystemPrompt = "",
         model: str = "claude-sonnet-4-20250514",
         temperature: float = 0.7,
-        max_tokens: int = 2048
+        max_tokens: int = 2048,
+        cache: bool = False,
+        cache_namespace: str = "default",
+        agent: str = "",
+        session_id: Optional[str] = None
     ) -> str:
         """
         Send a chat completion request.
         
+        Same as `complete`, returning only the text.
+        
+        Returns:
+            Model response text
+        """
+        response = await self.complete(
+            messages, system_prompt, model, temperature, max_tokens,
+            cache, cache_namespace, agent, session_id
+        )
+        return response.text
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt = "",
+        model: str = "claude-sonnet-4-20250514",
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        cache: bool = False,
+        cache_namespace: str = "default",
+        agent: str = "",
+        session_id: Optional[str] = None
+    ) -> LLMResponse:
+        """
+        Send a chat completion request.
+        
+        Concurrent identical requests (same fingerprint) share a single
+        provider call when coalescing is enabled (LLM_COALESCE). That
+        call is metered once, for the caller who started it.
+        
         Args:
             messages: Conversation history
-            system_prompt: System prompt for the model
+            system_prompt: System prompt, as text or blocks with cache breakpoints
             model: Model name
             temperature: Response creativity (0-1)
             max_tokens: Maximum response length
+            cache: Serve identical requests from the response cache
+            cache_namespace: Cache partition (e.g. agent + knowledge base version)
+            agent: Agent name, for usage metering
+            session_id: Conversation, for usage metering and budgets
             
         Returns:
-            Model response text
+            LLMResponse with text, provider, token usage and latency
+            (provider "cache" and zero usage on a response cache hit)
+        """
+        cache_key = self._cache_key(
+            cache, cache_namespace, messages, system_prompt, model, temperature, max_tokens
+        )
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return LLMResponse(text=cached, provider="cache", model=model, latency_ms=0.0)
+        # Requests admitted under load on the promise of a cached answer stop here
+        check_llm_call()
+        
+        async def complete() -> LLMResponse:
+            response = await self._chat_with_fallback(
+                messages, system_prompt, model, temperature, max_tokens
+            )
+            self.meter.record_response(agent or "unknown", session_id, response)
+            if cache_key:
+                await self.cache.set(cache_key, response.text)
+            return response
+        
+        if not self.coalescing_enabled:
+            return await complete()
+        
+        fingerprint = cache_key or self.cache.make_key(
+            cache_namespace, model, system_prompt_payload(system_prompt),
+            messages, temperature, max_tokens
+        )
+        # Each caller waits within its own deadline; the shared call is
+        # cancelled only once every caller has given up
+        return await within(self._single_flight.do(fingerprint, complete), "llm")
+    
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt = "",
+        model: str = "claude-sonnet-4-20250514",
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        cache: bool = False,
+        cache_namespace: str = "default",
+        agent: str = "",
+        session_id: Optional[str] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion as text deltas.
+        
+        A cache hit is yielded as a single chunk; a streamed answer is
+        stored in the cache and metered once it has completed.
+        
+        Args:
+            messages: Conversation history
+            system_prompt: System prompt, as text or blocks with cache breakpoints
+            model: Model name
+            temperature: Response creativity (0-1)
+            max_tokens: Maximum response length
+            cache: Serve identical requests from the response cache
+            cache_namespace: Cache partition (e.g. agent + knowledge base version)
+            agent: Agent name, for usage metering
+            session_id: Conversation, for usage metering and budgets
+            usage: Filled with the provider's token usage once the stream is done
+            
+        Yields:
+            Text chunks as they are produced by the model
+        """
+        cache_key = self._cache_key(
+            cache, cache_namespace, messages, system_prompt, model, temperature, max_tokens
+        )
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        check_llm_call()
+        
+        chunks: List[str] = []
+        stream_usage = TokenUsage()
+        started = time.perf_counter()
+        async for chunk in self._stream_with_fallback(
+            messages, system_prompt, model, temperature, max_tokens, stream_usage
+        ):
+            chunks.append(chunk)
+            yield chunk
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.meter.record(agent or "unknown", session_id, stream_usage, elapsed_ms)
+        if usage is not None:
+            usage.add(stream_usage)
+        
+        if cache_key:
+            await self.cache.set(cache_key, "".join(chunks))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Router metrics"""
+        hedges = self._hedge_stats["primary_wins"] + self._hedge_stats["hedge_wins"]
+        return {
+            "providers": {name: provider.stats() for name, provider in self.providers.items()},
+            "routes": self.routes,
+            "cache": self.cache.stats(),
+            "breakers": {name: breaker.stats() for name, breaker in self.breakers.items()},
+            "admission": {name: admission.stats() for name, admission in self.admission.items()},
+            "prompt_cache": self._prompt_cache_stats_view(),
+            "coalescing": {**self._single_flight.stats(), "enabled": self.coalescing_enabled},
+            "hedging": {
+                **self._hedge_stats,
+                "enabled": self.hedging_enabled,
+                "hedge_win_rate": round(self._hedge_stats["hedge_wins"] / hedges, 4) if hedges else 0.0
+            }
+        }
+    
+    def _prompt_cache_stats_view(self) -> Dict[str, Any]:
+        stats = self._prompt_cache_stats
+        prompt_tokens = stats["input_tokens"] + stats["cache_read_tokens"] + stats["cache_creation_tokens"]
+        return {
+            **stats,
+            "cached_input_ratio": round(stats["cache_read_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+        }
+    
+    def _cache_key(
+        self,
+        cache: bool,
+        cache_namespace: str,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Cache key for a request, or None when it must not be cached"""
+        if not cache or not self.cache.accepts(temperature):
+            return None
+        return self.cache.make_key(
+            cache_namespace, model, system_prompt_payload(system_prompt),
+            messages, temperature, max_tokens
+        )
+    
+    async def _chat_with_fallback(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
         """
+        Complete with the first provider, falling back to the next ones.
         
-        # Try Claude first
-        if self.claude_client:
+        Providers whose circuit is open are skipped. With hedging on, a
+        request to the second provider is fired if the first hasn't
+        answered by its p95 latency and the first success wins; if both
+        fail, the remaining providers are tried in order.
+        """
+        providers = [
+            (name, self._complete_call(provider, messages, system_prompt, provider_model, temperature, max_tokens))
+            for name, provider, provider_model in self._route(model)
+        ]
+        estimated_tokens = self._estimate_tokens(messages, system_prompt, max_tokens)
+        
+        rejection: Optional[AdmissionRejected] = None
+        if self.hedging_enabled and len(providers) >= 2:
+            primary_name = providers[0][0]
+            if self.breakers[primary_name].allow():
+                try:
+                    return await self._chat_hedged(providers[0], providers[1], estimated_tokens)
+                except AdmissionRejected as e:
+                    logger.warning(str(e))
+                    rejection = e
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Hedged providers failed: {e}")
+                providers = providers[2:]
+            else:
+                logger.warning(f"{primary_name.capitalize()} circuit open, skipping")
+                providers = providers[1:]
+        
+        for name, call in providers:
+            if not self.breakers[name].allow():
+                logger.warning(f"{name.capitalize()} circuit open, skipping")
+                continue
             try:
-                return await self._chat_claude(
-                    messages, system_prompt, model, temperature, max_tokens
-                )
+                return await self._call_provider(name, call, estimated_tokens)
+            except AdmissionRejected as e:
+                logger.warning(str(e))
+                rejection = e
+            except DeadlineExceeded:
+                # No time left to try another provider
+                raise
             except Exception as e:
-                logger.warning(f"Claude failed, trying Gemini: {e}")
+                logger.warning(f"{name.capitalize()} failed: {e}")
         
-        # Fallback to Gemini
-        if self.gemini_model:
-            try:
-                return await self._chat_gemini(
-                    messages, system_prompt, temperature, max_tokens
+        if rejection:
+            raise rejection
+        raise RuntimeError("No LLM provider available")
+    
+    async def _chat_hedged(
+        self,
+        primary: Tuple[str, Callable[[], Awaitable[LLMResponse]]],
+        secondary: Tuple[str, Callable[[], Awaitable[LLMResponse]]],
+        estimated_tokens: int
+    ) -> LLMResponse:
+        """Race the primary provider against a delayed secondary request (primary already admitted)"""
+        primary_name, primary_call = primary
+        secondary_name, secondary_call = secondary
+        delay_ms = self.breakers[primary_name].latency_percentile(95) or self.hedge_default_delay_ms
+        first = asyncio.create_task(self._call_provider(primary_name, primary_call, estimated_tokens))
+        tasks = [first]
+        
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay_ms / 1000)
+            
+            if first in done:
+                if first.exception() is None:
+                    return first.result()
+                logger.warning(
+                    f"{primary_name.capitalize()} failed, trying {secondary_name.capitalize()}: "
+                    f"{first.exception()}"
                 )
+                if not self.breakers[secondary_name].allow():
+                    raise RuntimeError("No LLM provider available")
+                return await self._call_provider(secondary_name, secondary_call, estimated_tokens)
+            
+            if not self.breakers[secondary_name].allow():
+                return await first
+            
+            self._hedge_stats["fired"] += 1
+            logger.info(
+                f"{primary_name.capitalize()} slower than {delay_ms:.0f}ms, "
+                f"hedging with {secondary_name.capitalize()}"
+            )
+            second = asyncio.create_task(self._call_provider(secondary_name, secondary_call, estimated_tokens))
+            tasks.append(second)
+            
+            pending = set(tasks)
+            errors = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._hedge_stats["primary_wins" if task is first else "hedge_wins"] += 1
+                        return task.result()
+                    errors.append(task.exception())
+            
+            self._hedge_stats["both_failed"] += 1
+            raise RuntimeError(f"All hedged providers failed: {errors}")
+        finally:
+            # Cancel the loser (or everything, if the caller went away)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _call_provider(
+        self,
+        name: str,
+        call: Callable[[], Awaitable[LLMResponse]],
+        estimated_tokens: int
+    ) -> LLMResponse:
+        """
+        Run a provider call behind its admission controller and feed
+        the outcome to its circuit breaker. The call is cancelled when
+        the request deadline runs out.
+        """
+        breaker = self.breakers[name]
+        try:
+            async with self.admission[name].admit(estimated_tokens) as ticket:
+                started = time.perf_counter()
+                try:
+                    response = await within(call(), "llm")
+                except DeadlineExceeded:
+                    raise
+                except Exception:
+                    breaker.record_failure()
+                    raise
+                response.latency_ms = (time.perf_counter() - started) * 1000
+                ticket.actual_tokens = self._rate_limited_tokens(response.usage)
+        except (asyncio.CancelledError, AdmissionRejected, DeadlineExceeded):
+            # Never reached the provider (or abandoned): not a provider failure
+            breaker.record_cancelled()
+            raise
+        
+        breaker.record_success(response.latency_ms)
+        self._record_usage(name, response.usage, response.latency_ms)
+        return response
+    
+    async def _stream_with_fallback(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        total_usage: TokenUsage
+    ) -> AsyncIterator[str]:
+        """
+        Stream from the first provider, falling back to the next ones.
+        
+        Falls back only if a provider fails before producing any text:
+        once tokens have been sent to the caller, a mid-stream failure
+        is re-raised since the two answers can't be spliced. The usage
+        of the provider that completed is added to `total_usage`.
+        """
+        providers = [
+            (name, self._stream_call(provider, messages, system_prompt, provider_model, temperature, max_tokens))
+            for name, provider, provider_model in self._route(model)
+        ]
+        estimated_tokens = self._estimate_tokens(messages, system_prompt, max_tokens)
+        
+        rejection: Optional[AdmissionRejected] = None
+        for name, open_stream in providers:
+            breaker = self.breakers[name]
+            if not breaker.allow():
+                logger.warning(f"{name.capitalize()} circuit open, skipping")
+                continue
+            
+            started = False
+            usage = TokenUsage()
+            try:
+                async with self.admission[name].admit(estimated_tokens) as ticket:
+                    stream_started = time.perf_counter()
+                    async for chunk in iterate_within(open_stream(usage), "llm"):
+                        started = True
+                        yield chunk
+                    ticket.actual_tokens = self._rate_limited_tokens(usage)
+            except AdmissionRejected as e:
+                breaker.record_cancelled()
+                logger.warning(str(e))
+                rejection = e
+                continue
+            except (asyncio.CancelledError, GeneratorExit, DeadlineExceeded):
+                breaker.record_cancelled()
+                raise
             except Exception as e:
-                logger.error(f"Gemini failed: {e}")
+                breaker.record_failure()
+                if started:
+                    logger.error(f"{name.capitalize()} stream interrupted: {e}")
+                    raise
+                logger.warning(f"{name.capitalize()} stream failed, trying next provider: {e}")
+                continue
+            
+            # Streamed latency isn't comparable to full completions
+            breaker.record_success()
+            self._record_usage(name, usage, (time.perf_counter() - stream_started) * 1000)
+            total_usage.add(usage)
+            return
         
+        if rejection:
+            raise rejection
         raise RuntimeError("No LLM provider available")
     
-    async def _chat_claude(
+    def _route(
         self,
+        model: str,
+        providers: Optional[Dict[str, LLMProvider]] = None
+    ) -> List[Tuple[str, LLMProvider, str]]:
+        """
+        Providers to try for a model, in order, with the model name each
+        one should be sent.
+        
+        The provider owning the longest matching route prefix goes first
+        with the requested model; every other provider follows in
+        fallback order with its default model (or the requested one, for
+        providers that accept any model).
+        """
+        providers = self.providers if providers is None else providers
+        target: Optional[str] = None
+        provider_model = model
+        matched = ""
+        for prefix, name in self.routes.items():
+            if model.startswith(prefix) and len(prefix) > len(matched) and name in providers:
+                matched, target = prefix, name
+        if target and matched.endswith("/"):
+            provider_model = model[len(matched):] or providers[target].default_model
+        
+        routed = []
+        if target:
+            routed.append((target, providers[target], provider_model))
+        else:
+            logger.debug(f"No provider route for model {model}, using fallback order")
+        for name, provider in providers.items():
+            if name != target:
+                fallback_model = model if provider.accepts_any_model else provider.default_model
+                routed.append((name, provider, fallback_model))
+        return routed
+    
+    def _complete_call(
+        self,
+        provider: LLMProvider,
         messages: List[Dict[str, str]],
-        system_prompt: str,
+        system_prompt: SystemPrompt,
         model: str,
         temperature: float,
         max_tokens: int
-    ) -> str:
-        """Chat with Claude"""
-        
-        response = await self.claude_client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            system=system_prompt,
-            messages=messages
-        )
-        
-        # Extract text from response
-        for block in response.content:
-            if block.type == "text":
-                return block.text
-        
-        return ""
+    ) -> Callable[[], Awaitable[LLMResponse]]:
+        """Bind a completion request to a provider"""
+        return lambda: provider.complete(messages, system_prompt, model, temperature, max_tokens)
     
-    async def _chat_gemini(
+    def _stream_call(
         self,
+        provider: LLMProvider,
         messages: List[Dict[str, str]],
-        system_prompt: str,
+        system_prompt: SystemPrompt,
+        model: str,
         temperature: float,
         max_tokens: int
-    ) -> str:
-        """Chat with Gemini"""
-        
-        # Convert messages to Gemini format
-        history = []
-        for msg in messages[:-1]:
-            role = "model" if msg["role"] == "assistant" else "user"
-            history.append({"role": role, "parts": [msg["content"]]})
-        
-        # Create chat
-        chat = self.gemini_model.start_chat(history=history)
-        
-        # Prepend system prompt to last message
-        last_msg = messages[-1]["content"]
-        if system_prompt:
-            last_msg = f"{system_prompt}\n\n{last_msg}"
-        
-        # Generate response
-        response = await chat.send_message_async(
-            last_msg,
-            generation_config={
-                "temperature": temperature,
-                "max_output_tokens": max_tokens
-            }
-        )
+    ) -> Callable[[TokenUsage], AsyncIterator[str]]:
+        """Bind a streaming request to a provider"""
+        return lambda usage: provider.stream(messages, system_prompt, model, temperature, max_tokens, usage)
+    
+    def _rate_limited_tokens(self, usage: TokenUsage) -> Optional[int]:
+        """Tokens that count toward provider rate limits (cache reads don't)"""
+        tokens = usage.total_tokens - usage.cache_read_tokens
+        return tokens or None
+    
+    def _record_usage(self, provider: str, usage: TokenUsage, latency_ms: Optional[float]) -> None:
+        """Report per-request usage, including prompt-cache savings"""
+        self._prompt_cache_stats["requests"] += 1
+        self._prompt_cache_stats["input_tokens"] += usage.input_tokens
+        self._prompt_cache_stats["cache_read_tokens"] += usage.cache_read_tokens
+        self._prompt_cache_stats["cache_creation_tokens"] += usage.cache_creation_tokens
+        if usage.cache_read_tokens:
+            self._prompt_cache_stats["requests_with_cache_hit"] += 1
         
-        return response.text
+        logger.info(
+            f"LLM usage ({provider}): input={usage.input_tokens} "
+            f"cache_read={usage.cache_read_tokens} cache_write={usage.cache_creation_tokens} "
+            f"output={usage.output_tokens} latency={latency_ms or 0:.0f}ms"
+        )
+    
+    def _estimate_tokens(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        max_tokens: int
+    ) -> int:
+        """Pre-call token estimate: prompt tokens plus the full output cap"""
+        prompt = estimate_tokens(system_prompt_text(system_prompt))
+        prompt += sum(estimate_tokens(str(msg.get("content", ""))) for msg in messages)
+        return prompt + max_tokens
 
 
 # Singleton
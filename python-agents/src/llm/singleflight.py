@@ -0,0 +1,89 @@
+"""
+Single-Flight Request Coalescing
+Concurrent identical LLM requests share one provider call
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+import structlog
+
+from ..orchestrator.deadline import detached_context
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+@dataclass(eq=False)
+class _Flight:
+    """One shared in-flight call and the number of callers awaiting it"""
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls by key.
+    
+    The first caller for a key starts the work as its own task; callers
+    arriving while it runs await the same task. Each caller awaits
+    through `asyncio.shield`, so one caller being cancelled (e.g. a
+    client disconnect) doesn't cancel the others. The shared task is
+    only cancelled once every caller has gone away.
+    
+    The shared task runs without the first caller's request deadline:
+    callers enforce their own deadlines around `do`, so a caller with a
+    short budget gives up alone instead of failing every other caller.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._counters: Dict[str, int] = {
+            "calls": 0,
+            "coalesced": 0,
+            "abandoned": 0
+        }
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` once for all concurrent callers with the same key.
+        
+        Args:
+            key: Request fingerprint
+            fn: Coroutine factory performing the actual call
+        
+        Returns:
+            The shared result (exceptions are shared too)
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.create_task(fn(), context=detached_context()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._forget(key, flight))
+            self._counters["calls"] += 1
+        else:
+            self._counters["coalesced"] += 1
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last interested caller left: stop paying for the call
+                self._counters["abandoned"] += 1
+                flight.task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters"""
+        total = self._counters["calls"] + self._counters["coalesced"]
+        return {
+            **self._counters,
+            "in_flight": len(self._flights),
+            "coalesced_ratio": round(self._counters["coalesced"] / total, 4) if total else 0.0
+        }
+    
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
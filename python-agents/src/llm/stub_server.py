@@ -0,0 +1,115 @@
+"""
+OpenAI-Compatible Stub Server
+Local chat completions endpoint backed by the fake provider
+
+Run with:
+    uvicorn src.llm.stub_server:app --port 8090
+then point the agents at it:
+    LOCAL_LLM_BASE_URL=http://localhost:8090/v1
+"""
+
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from .fake import create_fake_provider
+from .models import TokenUsage
+
+app = FastAPI(title="WebShop-AI LLM stub", version="0.1.0")
+
+# Latency, errors and timeouts follow the LLM_FAKE_* settings
+provider = create_fake_provider("synth")
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str
+    messages: List[Dict[str, Any]]
+    temperature: float = 0.7
+    max_tokens: int = 512
+    stream: bool = False
+    stream_options: Optional[Dict[str, Any]] = None
+
+
+def _split(request: ChatCompletionRequest) -> Tuple[str, List[Dict[str, str]]]:
+    """System prompt and conversation, as the provider interface expects"""
+    system = "\n".join(m["content"] for m in request.messages if m.get("role") == "system")
+    messages = [
+        {"role": m["role"], "content": m["content"]}
+        for m in request.messages
+        if m.get("role") in ("user", "assistant")
+    ]
+    return system, messages
+
+
+def _usage(usage: TokenUsage) -> Dict[str, int]:
+    return {
+        "prompt_tokens": usage.input_tokens,
+        "completion_tokens": usage.output_tokens,
+        "total_tokens": usage.input_tokens + usage.output_tokens
+    }
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": provider.default_model, "object": "model"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: ChatCompletionRequest):
+    system, messages = _split(request)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    
+    if not request.stream:
+        response = await provider.complete(
+            messages, system, request.model, request.temperature, request.max_tokens
+        )
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": request.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": response.text},
+                "finish_reason": "stop"
+            }],
+            "usage": _usage(response.usage)
+        }
+    
+    async def events() -> AsyncIterator[str]:
+        usage = TokenUsage()
+        async for chunk in provider.stream(
+            messages, system, request.model, request.temperature, request.max_tokens, usage
+        ):
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": request.model,
+                "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        
+        if (request.stream_options or {}).get("include_usage"):
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": request.model,
+                "choices": [],
+                "usage": _usage(usage)
+            }
+            yield f"data: {json.dumps(event)}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats():
+    return provider.stats()
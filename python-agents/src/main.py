@@ -4,15 +4,28 @@ FastAPI server that exposes agent endpoints
 """
 
 import os
+import json
+import math
+import time
+import uuid
+import asyncio
 from contextlib import asynccontextmanager
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
 import structlog
 from dotenv import load_dotenv
 
+from .orchestrator.scheduler import SessionBusy
+from .orchestrator.deadline import DeadlineExceeded
+from .orchestrator.shedding import LoadShed
+from .jobs.manager import InvalidJob, JobQueueFull
+
 # Load environment
 load_dotenv()
 
@@ -26,12 +39,22 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+# How often a waiting handler checks whether its client is still there
+DISCONNECT_POLL_SECONDS = 0.5
+
+# WebSocket conversations
+WS_HEARTBEAT_SECONDS = float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+WS_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "300"))
+WS_MAX_PIPELINED_TURNS = int(os.getenv("WS_MAX_PIPELINED_TURNS", "8"))
+WS_RECENT_MESSAGES = int(os.getenv("WS_RECENT_MESSAGES", "20"))
+
 
 # Request/Response models
 class ChatRequest(BaseModel):
     message: str
     session_id: str
     language: Optional[str] = "fr"
+    timeout_seconds: Optional[float] = Field(default=None, gt=0)  # Capped at ORCHESTRATOR_REQUEST_TIMEOUT_SECONDS
 
 
 class ChatResponse(BaseModel):
@@ -41,9 +64,25 @@ class ChatResponse(BaseModel):
     session_id: str
 
 
+class FanoutChatRequest(ChatRequest):
+    agents: List[str]
+    branch_timeout: Optional[float] = Field(default=None, gt=0)
+
+
+class FanoutChatResponse(ChatResponse):
+    should_escalate: bool
+    branches: List[dict]
+
+
+class ChatBatchRequest(BaseModel):
+    requests: List[ChatRequest]
+    concurrency: Optional[int] = None  # Capped at BATCH_MAX_CONCURRENCY
+
+
 class InvokeRequest(BaseModel):
     action: str
     params: dict = {}
+    callback_url: Optional[str] = None
 
 
 @asynccontextmanager
@@ -63,12 +102,44 @@ async def lifespan(app: FastAPI):
     orchestrator.registry.register("marie", marie)
     
     logger.info("✅ All agents registered")
+    
+    # Background workers for long agent actions
+    from .jobs import get_job_manager
+    
+    jobs = get_job_manager()
+    jobs.executor = orchestrator.run_action
+    jobs.validator = orchestrator.supports_action
+    jobs.start()
+    
+    # Build LLM clients now and warm up connection pools, so the first
+    # customer doesn't pay for client setup, DNS and TLS
+    from .llm import get_llm_router, get_usage_meter
+    from .tools import WebSearchTool
+    from .transport import get_http_transport
+    
+    router = get_llm_router()
+    transport = get_http_transport()
+    meter = get_usage_meter()
+    meter.start()
+    if os.getenv("HTTP_PRECONNECT", "true").lower() == "true":
+        await transport.preconnect(
+            router.preconnect_targets() + [(WebSearchTool().base_url, transport.client("tools"))]
+        )
+    
+    # Measure event loop lag once startup work is done
+    orchestrator.shedder.start()
+    
     logger.info("🚀 WebShop-AI Agent Server ready!")
     
     yield
     
     # Shutdown
     logger.info("👋 Shutting down...")
+    await orchestrator.shedder.stop()
+    await jobs.stop()
+    await meter.stop()
+    await router.aclose()
+    await transport.aclose()
 
 
 # Create FastAPI app
@@ -89,6 +160,48 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(SessionBusy)
+async def session_busy_handler(request: Request, exc: SessionBusy):
+    """Too many turns queued on one session: ask the client to slow down"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+
+@app.exception_handler(LoadShed)
+async def load_shed_handler(request: Request, exc: LoadShed):
+    """Server saturated: 429 (only cheap requests accepted) or 503 (none)"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc), "load": exc.level.value},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    """The request ran out of time"""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.exception_handler(JobQueueFull)
+async def job_queue_full_handler(request: Request, exc: JobQueueFull):
+    """Background job backlog is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+
+@app.exception_handler(InvalidJob)
+async def invalid_job_handler(request: Request, exc: InvalidJob):
+    """Job refused at submission: unknown action or callback URL not allowed"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 # Routes
 @app.get("/")
 async def root():
@@ -104,12 +217,65 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check"""
-    return {"status": "healthy"}
+    """Health check, with the load level for the gateway"""
+    from .orchestrator import get_orchestrator
+    from .server import worker_info
+    
+    return {
+        "status": "healthy",
+        "load": get_orchestrator().shedder.level().value,
+        "worker": worker_info()["index"]
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for the agent server"""
+    from .llm import get_llm_router, get_context_packer, get_usage_meter
+    from .memory import get_semantic_cache
+    from .agents import get_response_templates, get_marie_agent
+    from .transport import get_http_transport
+    from .orchestrator import get_orchestrator
+    from .jobs import get_job_manager
+    from .server import worker_info
+    
+    # Each worker process answers with its own numbers
+    return {
+        "worker": worker_info(),
+        "orchestrator": get_orchestrator().stats(),
+        "llm": get_llm_router().stats(),
+        "usage": get_usage_meter().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "fast_path": get_response_templates().stats(),
+        "generation_profiles": {"marie": get_marie_agent().profiles.stats()},
+        "context": get_context_packer().stats(),
+        "http": get_http_transport().stats(),
+        "jobs": await get_job_manager().stats()
+    }
+
+
+async def _unless_disconnected(http_request: Request, work: Awaitable[Any]) -> Any:
+    """
+    Await request work, cancelling it (LLM calls included) if the
+    client goes away first.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                logger.info(f"Client disconnected, cancelling {http_request.url.path}")
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
 
 
 @app.post("/agents/{agent_id}/chat", response_model=ChatResponse)
-async def agent_chat(agent_id: str, request: ChatRequest):
+async def agent_chat(agent_id: str, request: ChatRequest, http_request: Request):
     """
     Chat with a specific agent.
     
@@ -121,12 +287,17 @@ async def agent_chat(agent_id: str, request: ChatRequest):
     
     orchestrator = get_orchestrator()
     
-    result = await orchestrator.invoke(
-        agent_id=agent_id,
-        message=request.message,
-        session_id=request.session_id,
-        context={"language": request.language}
-    )
+    with orchestrator.shedder.admit(
+        lambda: orchestrator.is_low_cost(agent_id, request.message),
+        lambda: orchestrator.may_answer_from_cache(agent_id, request.message)
+    ):
+        result = await _unless_disconnected(http_request, orchestrator.invoke(
+            agent_id=agent_id,
+            message=request.message,
+            session_id=request.session_id,
+            context={"language": request.language},
+            timeout_seconds=request.timeout_seconds
+        ))
     
     if result.get("success"):
         return ChatResponse(
@@ -142,14 +313,394 @@ async def agent_chat(agent_id: str, request: ChatRequest):
         )
 
 
-@app.post("/agents/{agent_id}/invoke")
+def _sse_event(payload: dict) -> str:
+    """Encode a payload as a Server-Sent Events message"""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@app.post("/agents/{agent_id}/chat/stream")
+async def agent_chat_stream(agent_id: str, request: ChatRequest):
+    """
+    Chat with a specific agent, streaming the answer as Server-Sent Events.
+    
+    Emits one `token` event per text chunk, then a final `done` event
+    carrying the full message (or an `error` event if the agent fails).
+    A client disconnect closes the stream, which cancels the LLM call.
+    
+    Args:
+        agent_id: Agent ID (marie, john, hugo, lucas, emma, noah)
+        request: Chat request with message and session_id
+    """
+    from .orchestrator import get_orchestrator
+    
+    orchestrator = get_orchestrator()
+    
+    # Shed before the 200 and the stream start; the slot is held until the stream ends
+    ticket = orchestrator.shedder.acquire(
+        lambda: orchestrator.is_low_cost(agent_id, request.message),
+        lambda: orchestrator.may_answer_from_cache(agent_id, request.message)
+    )
+    released = False
+    
+    def release() -> None:
+        # From the stream's end, or the response's background task if the
+        # client left before the stream even started
+        nonlocal released
+        if not released:
+            released = True
+            orchestrator.shedder.release(ticket)
+    
+    async def event_stream() -> AsyncIterator[str]:
+        chunks = []
+        try:
+            async for chunk in orchestrator.invoke_stream(
+                agent_id=agent_id,
+                message=request.message,
+                session_id=request.session_id,
+                context={"language": request.language},
+                timeout_seconds=request.timeout_seconds
+            ):
+                chunks.append(chunk)
+                yield _sse_event({"type": "token", "content": chunk})
+        except LoadShed as e:
+            yield _sse_event({"type": "error", "error": str(e), "retry_after": e.retry_after})
+            return
+        except Exception as e:
+            logger.error(f"Error streaming agent {agent_id}: {e}")
+            yield _sse_event({"type": "error", "error": str(e)})
+            return
+        finally:
+            release()
+        
+        yield _sse_event({
+            "type": "done",
+            "message": "".join(chunks),
+            "agent": agent_id.upper(),
+            "session_id": request.session_id
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release)
+    )
+
+
+@dataclass
+class ChatConnection:
+    """Hot state of one WebSocket conversation, kept for the connection's lifetime"""
+    session_id: str
+    language: str = "fr"
+    turns: int = 0
+    analysis: dict = field(default_factory=dict)  # Short-term memory after the last turn
+    running: bool = False
+    last_seen: float = field(default_factory=time.monotonic)  # Any frame, pongs included
+    last_active: float = field(default_factory=time.monotonic)  # Last turn sent or answered
+    
+    def snapshot(self, history: List[dict]) -> dict:
+        return {
+            "type": "state",
+            "session_id": self.session_id,
+            "turns": self.turns,
+            "history": history,
+            "analysis": self.analysis
+        }
+
+
+@app.websocket("/agents/{agent_id}/ws")
+async def agent_chat_ws(
+    websocket: WebSocket,
+    agent_id: str,
+    session_id: Optional[str] = None,
+    language: str = "fr"
+):
+    """
+    Converse with an agent over one WebSocket.
+    
+    Client frames (JSON):
+    - `{"type": "message", "message": ..., "id"?: ..., "timeout_seconds"?: ...}`
+      queues a turn; turns may be sent before earlier ones are answered
+      and run in order
+    - `{"type": "ping"}` / `{"type": "pong"}`: heartbeat
+    - `{"type": "state"}`: recent history and last analysis
+    
+    Server frames: `ready`, then per turn `token`* and `done` (or
+    `error`), all tagged with the turn `id`; `ping` every
+    WS_HEARTBEAT_SECONDS. Binary frames get an `error`. The connection
+    closes when the client misses heartbeats, stays idle for
+    WS_IDLE_TIMEOUT_SECONDS, or can no longer be written to.
+    
+    The connection holds the session: its memories stay hot in this
+    worker between turns (the agent reads its history from there), and
+    are checkpointed at every turn boundary.
+    """
+    from .orchestrator import get_orchestrator
+    from .memory import get_conversation_memory, get_short_term_memory
+    
+    orchestrator = get_orchestrator()
+    if not orchestrator.registry.get(agent_id):
+        await websocket.close(code=1008, reason=f"Agent {agent_id} not found")
+        return
+    
+    await websocket.accept()
+    conn = ChatConnection(session_id=session_id or uuid.uuid4().hex, language=language)
+    conversation = get_conversation_memory()
+    short_memory = get_short_term_memory()
+    pending: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=WS_MAX_PIPELINED_TURNS)
+    send_lock = asyncio.Lock()
+    
+    async def send(payload: dict) -> None:
+        async with send_lock:
+            await websocket.send_text(json.dumps(payload, ensure_ascii=False))
+    
+    async def run_turns() -> None:
+        # Only returns by raising: a failed send means the client is gone
+        while True:
+            turn = await pending.get()
+            conn.running = True
+            chunks = []
+            started = time.perf_counter()
+            try:
+                with orchestrator.shedder.admit(
+                    lambda: orchestrator.is_low_cost(agent_id, turn["message"]),
+                    lambda: orchestrator.may_answer_from_cache(agent_id, turn["message"])
+                ):
+                    async for chunk in orchestrator.invoke_stream(
+                        agent_id=agent_id,
+                        message=turn["message"],
+                        session_id=conn.session_id,
+                        context={"language": conn.language},
+                        timeout_seconds=turn.get("timeout_seconds"),
+                        reload_session=conn.turns == 0
+                    ):
+                        chunks.append(chunk)
+                        await send({"type": "token", "id": turn["id"], "content": chunk})
+            except (SessionBusy, DeadlineExceeded, LoadShed) as e:
+                await send({
+                    "type": "error",
+                    "id": turn["id"],
+                    "error": str(e),
+                    "retry_after": getattr(e, "retry_after", None)
+                })
+                continue
+            except Exception as e:
+                logger.error(f"Error in WebSocket turn for agent {agent_id}: {e}")
+                await send({"type": "error", "id": turn["id"], "error": str(e)})
+                continue
+            finally:
+                conn.running = False
+                conn.last_active = time.monotonic()
+            
+            message = "".join(chunks)
+            conn.turns += 1
+            conn.analysis = {memory.key: memory.value for memory in short_memory.get_all(conn.session_id)}
+            await send({
+                "type": "done",
+                "id": turn["id"],
+                "message": message,
+                "agent": agent_id.upper(),
+                "session_id": conn.session_id,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+    
+    runner = asyncio.create_task(run_turns())
+    receiving: Optional[asyncio.Task] = None
+    next_id = 0
+    try:
+        await send({"type": "ready", "session_id": conn.session_id})
+        while True:
+            if receiving is None:
+                receiving = asyncio.ensure_future(websocket.receive())
+            done, _ = await asyncio.wait(
+                {receiving, runner}, timeout=WS_HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            if runner in done:
+                # Pending turns can't be answered any more: close instead of hanging
+                logger.warning(f"WebSocket send failed for session {conn.session_id}: {runner.exception()}")
+                await _close_quietly(websocket, 1011, "Send failed")
+                break
+            if not done:
+                now = time.monotonic()
+                busy = conn.running or not pending.empty()
+                if now - conn.last_seen > WS_HEARTBEAT_SECONDS * 3:
+                    await websocket.close(code=1001, reason="Heartbeat timeout")
+                    break
+                if not busy and now - conn.last_active > WS_IDLE_TIMEOUT_SECONDS:
+                    await websocket.close(code=1000, reason="Idle timeout")
+                    break
+                await send({"type": "ping"})
+                continue
+            
+            received, receiving = receiving.result(), None
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            conn.last_seen = time.monotonic()
+            raw = received.get("text")
+            if raw is None:
+                await send({"type": "error", "error": "Binary frames are not supported, send JSON text frames"})
+                continue
+            try:
+                frame = json.loads(raw)
+                kind = frame.get("type", "message")
+            except (ValueError, AttributeError):
+                await send({"type": "error", "error": "Frames must be JSON objects"})
+                continue
+            
+            if kind == "ping":
+                await send({"type": "pong"})
+            elif kind == "state":
+                history = [
+                    {"role": message["role"], "content": message["content"]}
+                    for message in conversation.get_messages(conn.session_id, last_n=WS_RECENT_MESSAGES)
+                ]
+                await send(conn.snapshot(history))
+            elif kind == "message":
+                next_id += 1
+                turn_id = frame.get("id", next_id)
+                if not isinstance(frame.get("message"), str) or not frame["message"]:
+                    await send({"type": "error", "id": turn_id, "error": "A non-empty message is required"})
+                    continue
+                try:
+                    pending.put_nowait({
+                        "id": turn_id,
+                        "message": frame["message"],
+                        "timeout_seconds": frame.get("timeout_seconds")
+                    })
+                    conn.last_active = conn.last_seen
+                except asyncio.QueueFull:
+                    await send({
+                        "type": "error",
+                        "id": turn_id,
+                        "error": f"Too many turns pending ({WS_MAX_PIPELINED_TURNS})"
+                    })
+            elif kind != "pong":
+                await send({"type": "error", "error": f"Unknown frame type: {kind}"})
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket closed for session {conn.session_id} after {conn.turns} turns")
+    finally:
+        # Cancels the running turn (and its LLM stream); every finished
+        # turn is already checkpointed
+        for task in (receiving, runner):
+            if task is not None:
+                task.cancel()
+        await asyncio.wait([task for task in (receiving, runner) if task is not None])
+
+
+async def _close_quietly(websocket: WebSocket, code: int, reason: str) -> None:
+    """Close a WebSocket that may already be broken"""
+    try:
+        await websocket.close(code=code, reason=reason)
+    except Exception:
+        pass
+
+
+@app.post("/agents/{agent_id}/chat/batch")
+async def agent_chat_batch(agent_id: str, request: ChatBatchRequest):
+    """
+    Run many messages through an agent in one round-trip.
+    
+    Streams NDJSON: one `result` line per message as soon as it
+    completes (`index` is its position in `requests`), then a final
+    `summary` line. Messages of the same session run in list order,
+    other sessions concurrently, up to `concurrency` at a time.
+    Closing the connection cancels the rest of the batch.
+    
+    Args:
+        agent_id: Agent ID (marie, john, hugo, lucas, emma, noah)
+        request: Chat requests, and how many to run at once
+    """
+    from .orchestrator import BatchItem, get_orchestrator
+    
+    orchestrator = get_orchestrator()
+    if not orchestrator.registry.get(agent_id):
+        raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="At least one request is required")
+    if len(request.requests) > orchestrator.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {orchestrator.batch_max_items} requests per batch"
+        )
+    
+    items = [
+        BatchItem(
+            message=chat.message,
+            session_id=chat.session_id,
+            context={"language": chat.language},
+            timeout_seconds=chat.timeout_seconds
+        )
+        for chat in request.requests
+    ]
+    
+    async def lines() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        succeeded = 0
+        async for result in orchestrator.invoke_batch(agent_id, items, request.concurrency):
+            succeeded += bool(result.get("success"))
+            yield json.dumps({"type": "result", **result}, ensure_ascii=False) + "\n"
+        yield json.dumps({
+            "type": "summary",
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }) + "\n"
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/chat/fanout", response_model=FanoutChatResponse)
+async def fanout_chat(request: FanoutChatRequest, http_request: Request):
+    """
+    Ask several agents the same question in one round-trip.
+    
+    The agents run concurrently, each with its own time limit, and
+    their answers are merged; `branches` reports how each one did.
+    """
+    from .orchestrator import get_orchestrator
+    
+    if not request.agents:
+        raise HTTPException(status_code=400, detail="At least one agent is required")
+    
+    orchestrator = get_orchestrator()
+    
+    # Several LLM calls: never low-cost
+    with orchestrator.shedder.admit(lambda: False):
+        result = await _unless_disconnected(http_request, orchestrator.invoke_fanout(
+            agent_ids=request.agents,
+            message=request.message,
+            session_id=request.session_id,
+            context={"language": request.language},
+            branch_timeout=request.branch_timeout,
+            timeout_seconds=request.timeout_seconds
+        ))
+    
+    if result.get("success"):
+        return FanoutChatResponse(**result)
+    else:
+        raise HTTPException(
+            status_code=500,
+            detail=result.get("error") or result.get("message", "Unknown error")
+        )
+
+
+@app.post("/agents/{agent_id}/invoke", status_code=202)
 async def invoke_agent(agent_id: str, request: InvokeRequest):
     """
     Invoke an agent with a specific action.
     
-    For advanced use cases beyond simple chat.
+    For advanced use cases beyond simple chat. Actions can take
+    minutes, so they run as background jobs: poll `status_url`, or
+    pass `callback_url` to get the finished job POSTed back. Unknown
+    actions and callback URLs the server may not call get a 400.
     """
     from .orchestrator import get_orchestrator
+    from .jobs import get_job_manager
     
     orchestrator = get_orchestrator()
     agent = orchestrator.registry.get(agent_id)
@@ -157,15 +708,36 @@ async def invoke_agent(agent_id: str, request: InvokeRequest):
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
     
-    # TODO: Implement action handling per agent
+    job = await get_job_manager().submit(
+        agent_id=agent_id,
+        action=request.action,
+        params=request.params,
+        callback_url=request.callback_url
+    )
+    
     return {
         "success": True,
         "agent": agent_id,
         "action": request.action,
-        "result": "Action executed"
+        "job_id": job.id,
+        "status": job.status.value,
+        "status_url": f"/jobs/{job.id}"
     }
 
 
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status of a background job, with its result or error once finished"""
+    from .jobs import get_job_manager
+    
+    job = await get_job_manager().get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return job.to_dict()
+
+
 @app.get("/agents")
 async def list_agents():
     """List all available agents"""
@@ -201,6 +773,7 @@ async def agent_status(agent_id: str):
 
 # Entry point for uvicorn
 def main():
+    """Development server with auto-reload (production: python -m src.server)"""
     import uvicorn
     
     host = os.getenv("HOST", "0.0.0.0")
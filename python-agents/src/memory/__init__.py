@@ -9,8 +9,11 @@ from .memory_system import (
     ConversationMemory,
     get_short_term_memory,
     get_long_term_memory,
-    get_conversation_memory
+    get_conversation_memory,
+    get_redis_client
 )
+from .semantic_cache import SemanticCache, get_semantic_cache
+from .checkpoint import SessionCheckpointer, get_session_checkpointer
 
 __all__ = [
     "Memory",
@@ -19,5 +22,10 @@ __all__ = [
     "ConversationMemory",
     "get_short_term_memory",
     "get_long_term_memory",
-    "get_conversation_memory"
+    "get_conversation_memory",
+    "get_redis_client",
+    "SemanticCache",
+    "get_semantic_cache",
+    "SessionCheckpointer",
+    "get_session_checkpointer"
 ]
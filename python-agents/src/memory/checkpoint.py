@@ -0,0 +1,356 @@
+"""
+Session Checkpointing
+Conversation state persisted to Redis so any worker can serve any session
+"""
+
+import os
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+from redis.exceptions import WatchError
+
+from .memory_system import (
+    ConversationMemory,
+    ShortTermMemory,
+    get_conversation_memory,
+    get_redis_client,
+    get_short_term_memory
+)
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class _Checkpoint:
+    """What this process last read from or wrote to Redis for a session"""
+    version: int = 0
+    message_count: int = 0
+    last_message_at: str = ""  # Timestamp of the newest message
+    summary: Optional[str] = None
+    short_term: Dict[str, str] = field(default_factory=dict)  # key -> JSON
+    state: Dict[str, Any] = field(default_factory=dict)
+    stale: bool = False  # Last write failed: rewrite the whole session next time
+
+
+class SessionCheckpointer:
+    """
+    Checkpoints each session after every turn.
+    
+    A session is stored under `{prefix}{session_id}:` as:
+    - `messages`: list of conversation messages (JSON), appended to
+    - `summary`: summary of the messages dropped from the list
+    - `short_term`: hash of short-term memories (JSON)
+    - `state`: the agent state of the last turn (agent, escalation, context)
+    - `version`: incremented on every checkpoint
+    
+    Writes are deltas: only the messages and short-term memories that
+    changed during the turn are sent, in one transaction. The
+    process-local memories act as a read-through cache: before a turn
+    only `version` is read, and the session is reloaded when another
+    worker checkpointed it since. Sessions not used for a while are
+    dropped from the cache (and from the local memories), never from
+    Redis, where they expire after `ttl_seconds` of inactivity.
+    
+    Sessions don't need sticky routing: a write only applies if
+    `version` is still the one this worker last read (WATCH). When
+    another worker checkpointed the session in between, its turns are
+    reloaded, this turn's messages and short-term changes replayed on
+    top, and the write retried, up to `max_conflict_retries` times.
+    
+    Without Redis, every call is a no-op and sessions stay process-local.
+    """
+    
+    def __init__(
+        self,
+        redis_client: Any,
+        conversation: ConversationMemory,
+        short_term: ShortTermMemory,
+        prefix: str = "webshop:session:",
+        ttl_seconds: int = 7 * 86400,
+        max_cached_sessions: int = 10000,
+        max_conflict_retries: int = 3
+    ):
+        self.redis = redis_client
+        self.conversation = conversation
+        self.short_term = short_term
+        self.prefix = prefix
+        self.ttl = ttl_seconds
+        self.max_cached = max_cached_sessions
+        self.max_conflict_retries = max_conflict_retries
+        self._cache: "OrderedDict[str, _Checkpoint]" = OrderedDict()
+        self._counters: Dict[str, int] = {
+            "cache_hits": 0,
+            "loads": 0,
+            "saves": 0,
+            "messages_written": 0,
+            "history_rewrites": 0,
+            "conflicts": 0,
+            "conflicts_unresolved": 0,
+            "evictions": 0,
+            "errors": 0
+        }
+    
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+    
+    async def load(self, session_id: str) -> Dict[str, Any]:
+        """
+        Bring the local memories of a session up to date before a turn.
+        
+        Never raises: when Redis is unreachable the turn runs on the
+        local copy, if any.
+        
+        Returns:
+            Agent state saved by the session's last turn (empty if none)
+        """
+        if not self.enabled or not session_id:
+            return {}
+        
+        checkpoint = self._cache.get(session_id)
+        try:
+            version = int(await self.redis.get(self._key(session_id, "version")) or 0)
+            if checkpoint is not None and checkpoint.version == version:
+                self._cache.move_to_end(session_id)
+                self._counters["cache_hits"] += 1
+                return checkpoint.state
+            checkpoint = await self._fetch(session_id, version)
+        except Exception as e:
+            logger.warning(f"Session {session_id} checkpoint load failed: {e}")
+            self._counters["errors"] += 1
+            return checkpoint.state if checkpoint else {}
+        
+        self._remember(session_id, checkpoint)
+        self._counters["loads"] += 1
+        return checkpoint.state
+    
+    async def save(self, session_id: str, state: Dict[str, Any]) -> None:
+        """
+        Checkpoint a session after its turn, writing only what changed.
+        
+        Never raises: a failed write leaves the session to be rewritten
+        in full by the next successful one.
+        
+        Args:
+            session_id: Conversation session ID
+            state: JSON-serializable agent state of the turn
+        """
+        if not self.enabled or not session_id:
+            return
+        
+        state = {**state, "updated_at": time.time()}
+        previous = self._cache.get(session_id) or _Checkpoint()
+        for attempt in range(self.max_conflict_retries + 1):
+            try:
+                if attempt:
+                    previous = await self._rebase(session_id, previous)
+                checkpoint, written = await self._write(session_id, state, previous)
+            except WatchError:
+                # Another worker checkpointed this session since we read it
+                logger.info(f"Session {session_id} was checkpointed concurrently, replaying the turn")
+                self._counters["conflicts"] += 1
+                continue
+            except Exception as e:
+                logger.warning(f"Session {session_id} checkpoint save failed: {e}")
+                self._counters["errors"] += 1
+                # Keep serving the local copy, and rewrite it in full next time
+                self._remember(session_id, replace(previous, stale=True))
+                return
+            
+            self._remember(session_id, checkpoint)
+            self._counters["saves"] += 1
+            self._counters["messages_written"] += written
+            return
+        
+        # Still losing the race: this turn isn't in Redis, and the
+        # local copy is reloaded before the next one
+        logger.warning(f"Session {session_id} checkpoint dropped after {self.max_conflict_retries} conflicts")
+        self._counters["conflicts_unresolved"] += 1
+        self._remember(session_id, replace(previous, version=-1))
+    
+    async def _write(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        previous: _Checkpoint
+    ) -> Tuple[_Checkpoint, int]:
+        """
+        Write the session's changes since `previous`, if nobody else did since.
+        
+        Returns:
+            The new checkpoint, and the number of messages written
+            
+        Raises:
+            WatchError: The session's version is no longer `previous.version`
+        """
+        messages, summary = self.conversation.export(session_id)
+        short_term = {
+            key: json.dumps(memory, ensure_ascii=False, default=str)
+            for key, memory in self.short_term.export(session_id).items()
+        }
+        messages_key = self._key(session_id, "messages")
+        short_term_key = self._key(session_id, "short_term")
+        version_key = self._key(session_id, "version")
+        
+        async with self.redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(version_key)
+            if int(await pipe.get(version_key) or 0) != previous.version:
+                raise WatchError(f"Session {session_id} changed since version {previous.version}")
+            pipe.multi()
+            
+            rewrite = (
+                previous.stale
+                # The memory only ever appends, until it summarizes and drops old messages
+                or summary != previous.summary
+                or len(messages) < previous.message_count
+            )
+            if rewrite:
+                pipe.delete(messages_key)
+                new_messages = messages
+                self._counters["history_rewrites"] += 1
+            else:
+                new_messages = messages[previous.message_count:]
+            if new_messages:
+                pipe.rpush(messages_key, *[json.dumps(m, ensure_ascii=False) for m in new_messages])
+            if summary != previous.summary or previous.stale:
+                if summary:
+                    pipe.set(self._key(session_id, "summary"), summary)
+                else:
+                    pipe.delete(self._key(session_id, "summary"))
+            
+            known = previous.short_term
+            if previous.stale:
+                pipe.delete(short_term_key)
+                known = {}
+            changed = {key: value for key, value in short_term.items() if known.get(key) != value}
+            removed = [key for key in known if key not in short_term]
+            if changed:
+                pipe.hset(short_term_key, mapping=changed)
+            if removed:
+                pipe.hdel(short_term_key, *removed)
+            
+            pipe.set(self._key(session_id, "state"), json.dumps(state, ensure_ascii=False, default=str))
+            pipe.incr(version_key)
+            for suffix in ("messages", "summary", "short_term", "state", "version"):
+                pipe.expire(self._key(session_id, suffix), self.ttl)
+            results = await pipe.execute()
+        
+        return _Checkpoint(
+            version=results[-6],  # INCR, before the five EXPIREs
+            message_count=len(messages),
+            last_message_at=_last_timestamp(messages),
+            summary=summary,
+            short_term=short_term,
+            state=state
+        ), len(new_messages)
+    
+    async def _rebase(self, session_id: str, previous: _Checkpoint) -> _Checkpoint:
+        """
+        Reload a session another worker checkpointed, replaying this turn on top.
+        
+        The turn's changes are what the local memories gained since
+        `previous`: messages newer than its newest one, and short-term
+        memories added, changed or removed.
+        
+        Returns:
+            Checkpoint of the reloaded session, to write the turn against
+        """
+        messages, _ = self.conversation.export(session_id)
+        turn_messages = [m for m in messages if m.get("timestamp", "") > previous.last_message_at]
+        short_term = {
+            key: json.dumps(memory, ensure_ascii=False, default=str)
+            for key, memory in self.short_term.export(session_id).items()
+        }
+        changed = {key: value for key, value in short_term.items() if previous.short_term.get(key) != value}
+        removed = [key for key in previous.short_term if key not in short_term]
+        
+        version = int(await self.redis.get(self._key(session_id, "version")) or 0)
+        remote = await self._fetch(session_id, version)
+        remote_messages, summary = self.conversation.export(session_id)
+        self.conversation.restore(session_id, remote_messages + turn_messages, summary)
+        merged = {**remote.short_term, **changed}
+        for key in removed:
+            merged.pop(key, None)
+        self.short_term.restore(session_id, {key: json.loads(value) for key, value in merged.items()})
+        return remote
+    
+    def is_cached(self, session_id: str) -> bool:
+        """Whether the local copy of the session can be used without `load`"""
+        checkpoint = self._cache.get(session_id)
+        # -1: another worker wrote the session since
+        return not self.enabled or (checkpoint is not None and checkpoint.version != -1)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache hits, Redis round trips and write volume"""
+        return {
+            **self._counters,
+            "enabled": self.enabled,
+            "cached_sessions": len(self._cache),
+            "max_cached_sessions": self.max_cached
+        }
+    
+    async def _fetch(self, session_id: str, version: int) -> _Checkpoint:
+        """Read a whole session from Redis into the local memories"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.lrange(self._key(session_id, "messages"), 0, -1)
+        pipe.get(self._key(session_id, "summary"))
+        pipe.hgetall(self._key(session_id, "short_term"))
+        pipe.get(self._key(session_id, "state"))
+        raw_messages, summary, raw_short_term, raw_state = await pipe.execute()
+        
+        messages = [json.loads(m) for m in raw_messages]
+        summary = summary.decode() if isinstance(summary, bytes) else summary
+        short_term = {
+            (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+            for key, value in raw_short_term.items()
+        }
+        
+        self.conversation.restore(session_id, messages, summary)
+        self.short_term.restore(session_id, {key: json.loads(value) for key, value in short_term.items()})
+        return _Checkpoint(
+            version=version,
+            message_count=len(messages),
+            last_message_at=_last_timestamp(messages),
+            summary=summary,
+            short_term=short_term,
+            state=json.loads(raw_state) if raw_state else {}
+        )
+    
+    def _remember(self, session_id: str, checkpoint: _Checkpoint) -> None:
+        """Track a cached session, evicting the least recently used ones"""
+        self._cache[session_id] = checkpoint
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.max_cached:
+            evicted, _ = self._cache.popitem(last=False)
+            self.conversation.clear(evicted)
+            self.short_term.clear(evicted)
+            self._counters["evictions"] += 1
+    
+    def _key(self, session_id: str, suffix: str) -> str:
+        return f"{self.prefix}{session_id}:{suffix}"
+
+
+def _last_timestamp(messages: List[Dict[str, Any]]) -> str:
+    return max((message.get("timestamp", "") for message in messages), default="")
+
+
+# Singleton
+_checkpointer: Optional[SessionCheckpointer] = None
+
+
+def get_session_checkpointer() -> SessionCheckpointer:
+    """Get the session checkpointer (disabled without REDIS_URL or with SESSION_CHECKPOINT=false)"""
+    global _checkpointer
+    if _checkpointer is None:
+        enabled = os.getenv("SESSION_CHECKPOINT", "true").lower() == "true"
+        _checkpointer = SessionCheckpointer(
+            redis_client=get_redis_client() if enabled else None,
+            conversation=get_conversation_memory(),
+            short_term=get_short_term_memory(),
+            ttl_seconds=int(os.getenv("SESSION_TTL_SECONDS", str(7 * 86400))),
+            max_cached_sessions=int(os.getenv("SESSION_CACHE_MAX_SESSIONS", "10000"))
+        )
+    return _checkpointer
@@ -3,9 +3,10 @@ Advanced Memory System
 Short-term, Long-term, and Semantic memory for agents
 """
 
+import os
 import json
 import hashlib
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 import structlog
@@ -80,6 +81,17 @@ class ShortTermMemory:
         if session_id in self._storage:
             del self._storage[session_id]
     
+    def export(self, session_id: str) -> Dict[str, Dict]:
+        """Serializable copy of a session's memories (key -> memory dict)"""
+        return {key: memory.to_dict() for key, memory in self._storage.get(session_id, {}).items()}
+    
+    def restore(self, session_id: str, memories: Dict[str, Dict]) -> None:
+        """Replace a session's memories with an exported copy"""
+        if memories:
+            self._storage[session_id] = {key: Memory.from_dict(data) for key, data in memories.items()}
+        else:
+            self.clear(session_id)
+    
     def _prune(self, session_id: str) -> None:
         """Remove least important memories when over capacity"""
         memories = self._storage.get(session_id, {})
@@ -230,6 +242,14 @@ class ConversationMemory:
         
         return messages
     
+    def remove_last(self, session_id: str, role: str, content: str) -> bool:
+        """Take back the last message, if it is this one"""
+        messages = self._conversations.get(session_id)
+        if not messages or (messages[-1]["role"], messages[-1]["content"]) != (role, content):
+            return False
+        messages.pop()
+        return True
+    
     def _summarize_old_messages(self, session_id: str) -> None:
         """Summarize old messages to save context space"""
         messages = self._conversations[session_id]
@@ -258,14 +278,45 @@ class ConversationMemory:
             del self._conversations[session_id]
         if session_id in self._summaries:
             del self._summaries[session_id]
+    
+    def export(self, session_id: str) -> Tuple[List[Dict], Optional[str]]:
+        """A session's messages (oldest first) and summary of older ones"""
+        return list(self._conversations.get(session_id, [])), self._summaries.get(session_id)
+    
+    def restore(self, session_id: str, messages: List[Dict], summary: Optional[str]) -> None:
+        """Replace a session's history with an exported copy"""
+        self.clear(session_id)
+        if messages:
+            self._conversations[session_id] = list(messages)
+        if summary:
+            self._summaries[session_id] = summary
 
 
 # Singleton instances
+_redis_client = None
 _short_term: Optional[ShortTermMemory] = None
 _long_term: Optional[LongTermMemory] = None
 _conversation: Optional[ConversationMemory] = None
 
 
+def get_redis_client():
+    """
+    Shared async Redis client built from REDIS_URL (None if unset).
+    
+    Replies are decoded to str: every user stores text (JSON, counters,
+    IDs), and keys come back as str for callers that parse them.
+    """
+    global _redis_client
+    if _redis_client is None:
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            return None
+        import redis.asyncio as aioredis
+        _redis_client = aioredis.from_url(redis_url, decode_responses=True)
+        logger.info("✅ Redis client initialized")
+    return _redis_client
+
+
 def get_short_term_memory() -> ShortTermMemory:
     global _short_term
     if _short_term is None:
@@ -276,7 +327,7 @@ def get_short_term_memory() -> ShortTermMemory:
 def get_long_term_memory() -> LongTermMemory:
     global _long_term
     if _long_term is None:
-        _long_term = LongTermMemory()
+        _long_term = LongTermMemory(get_redis_client())
     return _long_term
 
 
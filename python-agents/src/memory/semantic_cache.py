@@ -0,0 +1,305 @@
+"""
+Semantic Answer Cache
+Reuse answers for paraphrased questions in the same context
+"""
+
+import os
+import re
+import math
+import time
+import heapq
+import itertools
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+import structlog
+
+logger = structlog.get_logger()
+
+
+# Words that carry no meaning for matching questions
+STOPWORDS = {
+    "le", "la", "les", "un", "une", "des", "du", "de", "d", "l", "c", "j",
+    "est", "ce", "ca", "cela", "et", "ou", "a", "au", "aux", "en", "pour",
+    "je", "tu", "il", "elle", "on", "nous", "vous", "me", "moi", "mon", "ma",
+    "mes", "votre", "vos", "quel", "quelle", "quels", "quelles", "qu", "que",
+    "quoi", "svp", "stp", "bonjour", "salut", "merci", "please",
+    "the", "an", "is", "are", "of", "for", "to", "i", "you", "what"
+}
+
+# Collapse common paraphrases onto one token
+SYNONYMS = {
+    "combien": "prix", "tarif": "prix", "tarifs": "prix", "cout": "prix",
+    "coute": "prix", "couter": "prix", "price": "prix", "cost": "prix",
+    "delais": "delai", "duree": "delai", "temps": "delai",
+    "sites": "site", "website": "site", "boutique": "ecommerce",
+    "e-commerce": "ecommerce"
+}
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def embed(text: str) -> Dict[str, float]:
+    """
+    Lightweight lexical embedding: normalized word + character-trigram
+    features as a sparse unit vector.
+    In production, swap for a sentence-embedding model.
+    """
+    words = re.findall(r"[a-z0-9-]+", _fold(text))
+    tokens = [SYNONYMS.get(w, w) for w in words if w not in STOPWORDS]
+    
+    features: Dict[str, float] = {}
+    for token in tokens:
+        features[f"w:{token}"] = features.get(f"w:{token}", 0.0) + 1.0
+        padded = f"#{token}#"
+        for i in range(len(padded) - 2):
+            gram = f"c:{padded[i:i + 3]}"
+            features[gram] = features.get(gram, 0.0) + 0.3
+    
+    norm = math.sqrt(sum(v * v for v in features.values()))
+    if norm == 0:
+        return {}
+    return {k: v / norm for k, v in features.items()}
+
+
+def cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    """Cosine similarity of two unit sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+@dataclass(eq=False)
+class SemanticEntry:
+    """A cached answer and the question it was produced for"""
+    question: str
+    vector: Dict[str, float]
+    answer: str
+    generation_ms: float
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+
+class SemanticCache:
+    """
+    In-memory vector store of past answers.
+    
+    Entries are bucketed by a context key (intent, RAG document set,
+    sentiment...) so only answers produced under the same context are
+    compared, then matched by cosine similarity on the question.
+    
+    Eviction is O(1) for LRU (entries kept in recency order) and
+    O(log n) for LFU (a heap of use counts, whose outdated records are
+    skipped when popped and compacted when they pile up).
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        max_entries: int = 2000,
+        ttl_seconds: float = 3600.0,
+        eviction: str = "lru"
+    ):
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+        self._buckets: Dict[str, List[SemanticEntry]] = {}
+        # Every entry and its context key, least recently used first
+        self._entries: "OrderedDict[SemanticEntry, str]" = OrderedDict()
+        # LFU: (hits, last_used, tie-breaker, entry), pushed again on every hit
+        self._heap: List[Tuple[int, float, int, SemanticEntry]] = []
+        self._sequence = itertools.count()
+        self.threshold = threshold
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._eviction = eviction
+        self._counters: Dict[str, Any] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "avoided_llm_calls": 0,
+            "saved_latency_ms": 0.0
+        }
+    
+    def lookup(self, context_key: str, question: str) -> Optional[str]:
+        """
+        Find a stored answer for a similar question in the same context.
+        
+        Args:
+            context_key: Fingerprint of everything besides the question
+            question: Sanitized user message
+        
+        Returns:
+            The cached answer, or None
+        """
+        bucket = self._buckets.get(context_key)
+        if not bucket:
+            self._counters["misses"] += 1
+            return None
+        
+        now = time.monotonic()
+        vector = embed(question)
+        best: Optional[SemanticEntry] = None
+        best_score = 0.0
+        
+        for entry in list(bucket):
+            if now - entry.created_at > self._ttl:
+                self._remove(context_key, entry)
+                continue
+            score = cosine(vector, entry.vector)
+            if score > best_score:
+                best, best_score = entry, score
+        
+        if best is None or best_score < self.threshold:
+            self._counters["misses"] += 1
+            return None
+        
+        best.hits += 1
+        best.last_used = now
+        self._touch(best)
+        self._counters["hits"] += 1
+        self._counters["avoided_llm_calls"] += 1
+        self._counters["saved_latency_ms"] += best.generation_ms
+        logger.info(f"Semantic cache hit ({best_score:.2f}): '{question[:40]}' ~ '{best.question[:40]}'")
+        return best.answer
+    
+    def may_contain(self, key_prefix: str, question: str) -> bool:
+        """
+        Cheap probe: whether a context key starting with `key_prefix`
+        holds an answer for a similar question.
+        
+        Counts nothing and leaves eviction order alone (load shedding
+        calls it before deciding to serve a request at all).
+        """
+        vector = embed(question)
+        if not vector:
+            return False
+        now = time.monotonic()
+        for context_key, bucket in self._buckets.items():
+            if not context_key.startswith(key_prefix):
+                continue
+            for entry in bucket:
+                if now - entry.created_at <= self._ttl and cosine(vector, entry.vector) >= self.threshold:
+                    return True
+        return False
+    
+    def store(
+        self,
+        context_key: str,
+        question: str,
+        answer: str,
+        generation_ms: float = 0.0
+    ) -> None:
+        """Remember an answer for future paraphrases"""
+        vector = embed(question)
+        if not vector or not answer:
+            return
+        
+        entry = SemanticEntry(
+            question=question,
+            vector=vector,
+            answer=answer,
+            generation_ms=generation_ms
+        )
+        # Make room first, so the new entry is never the one evicted
+        while self._entries and len(self._entries) >= self._max_entries:
+            self._evict_one()
+        
+        self._buckets.setdefault(context_key, []).append(entry)
+        self._entries[entry] = context_key
+        self._touch(entry)
+        self._counters["stores"] += 1
+    
+    def invalidate(self, key_prefix: str) -> int:
+        """
+        Drop the answers of every context key starting with `key_prefix`.
+        
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for context_key in [key for key in self._buckets if key.startswith(key_prefix)]:
+            for entry in list(self._buckets[context_key]):
+                self._remove(context_key, entry)
+                removed += 1
+        return removed
+    
+    def clear(self) -> None:
+        """Drop every cached answer"""
+        self._buckets.clear()
+        self._entries.clear()
+        self._heap.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters and current size"""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "saved_latency_ms": round(self._counters["saved_latency_ms"], 1),
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "threshold": self.threshold,
+            "eviction": self._eviction,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0
+        }
+    
+    def _touch(self, entry: SemanticEntry) -> None:
+        """Record a store or a hit for the eviction policy"""
+        if self._eviction == "lfu":
+            heapq.heappush(self._heap, (entry.hits, entry.last_used, next(self._sequence), entry))
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                # Drop records of removed entries and of older use counts
+                self._heap = [
+                    record for record in self._heap
+                    if record[3] in self._entries and record[:2] == (record[3].hits, record[3].last_used)
+                ]
+                heapq.heapify(self._heap)
+        else:
+            self._entries.move_to_end(entry)
+    
+    def _evict_one(self) -> None:
+        """Evict the least recently (LRU) or least frequently (LFU) used entry"""
+        victim: Optional[SemanticEntry] = None
+        if self._eviction == "lfu":
+            while self._heap:
+                hits, last_used, _, entry = heapq.heappop(self._heap)
+                if entry in self._entries and (hits, last_used) == (entry.hits, entry.last_used):
+                    victim = entry
+                    break
+        if victim is None and self._entries:
+            victim = next(iter(self._entries))
+        
+        if victim is not None:
+            self._remove(self._entries[victim], victim)
+            self._counters["evictions"] += 1
+    
+    def _remove(self, context_key: str, entry: SemanticEntry) -> None:
+        bucket = self._buckets.get(context_key, [])
+        if entry in bucket:
+            bucket.remove(entry)
+            del self._entries[entry]
+        if not bucket:
+            self._buckets.pop(context_key, None)
+
+
+# Singleton
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get the semantic cache singleton"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000")),
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600")),
+            eviction=os.getenv("SEMANTIC_CACHE_EVICTION", "lru")
+        )
+    return _semantic_cache
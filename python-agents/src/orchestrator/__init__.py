@@ -2,12 +2,25 @@
 Orchestrator module
 """
 
-from .engine import Orchestrator, AgentRegistry, get_orchestrator, AgentState, AgentStatus
+from .engine import Orchestrator, AgentRegistry, get_orchestrator, AgentState, AgentStatus, BranchResult, BatchItem
+from .scheduler import SessionScheduler, SessionBusy
+from .deadline import DeadlineExceeded, request_deadline
+from .shedding import LoadShedder, LoadShed, LoadLevel, ShedTicket
 
 __all__ = [
     "Orchestrator",
     "AgentRegistry", 
     "get_orchestrator",
     "AgentState",
-    "AgentStatus"
+    "AgentStatus",
+    "BranchResult",
+    "BatchItem",
+    "SessionScheduler",
+    "SessionBusy",
+    "DeadlineExceeded",
+    "request_deadline",
+    "LoadShedder",
+    "LoadShed",
+    "LoadLevel",
+    "ShedTicket"
 ]
@@ -0,0 +1,131 @@
+"""
+Request Deadlines
+Time budget of the current request, visible to every pipeline stage
+"""
+
+import time
+import asyncio
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Absolute deadline (time.monotonic()) of the request being served.
+# Context variables follow the request into every task it spawns.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when the request's time budget runs out during a stage"""
+    
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Give the code inside a time budget.
+    
+    Nested budgets can only shorten the deadline, never extend it.
+    `None` or a non-positive value keeps the current deadline.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    current = _deadline.get()
+    target = time.monotonic() + seconds
+    token = _deadline.set(target if current is None else min(current, target))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def detached_context() -> Context:
+    """
+    Copy of the current context without a deadline, for work shared by
+    several requests: each one enforces its own deadline while waiting
+    on it, so the first one's can't cut it short for the others.
+    """
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget (None when there's no deadline)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def has_budget(seconds: float) -> bool:
+    """Whether at least `seconds` are left (always true without a deadline)"""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def check(stage: str) -> None:
+    """
+    Raise if the budget is already spent.
+    
+    Raises:
+        DeadlineExceeded: No time left
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(stage)
+
+
+async def within(awaitable: Awaitable[T], stage: str) -> T:
+    """
+    Await something, cancelling it when the budget runs out.
+    
+    Runs in the caller's task (no wrapper task), so it is safe around
+    streams and SDK calls that hold task-bound resources.
+    
+    Raises:
+        DeadlineExceeded: The budget ran out before it finished
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        # Don't leave the coroutine un-awaited
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(stage)
+    timeout = asyncio.timeout(left)
+    try:
+        async with timeout:
+            return await awaitable
+    except TimeoutError:
+        if timeout.expired():
+            raise DeadlineExceeded(stage) from None
+        raise
+
+
+async def iterate_within(iterator: AsyncIterator[T], stage: str) -> AsyncIterator[T]:
+    """
+    Re-yield an async iterator, giving up when the budget runs out
+    between two items (e.g. a stream that stalls).
+    
+    Raises:
+        DeadlineExceeded: The budget ran out while waiting for the next item
+    """
+    source = iterator.__aiter__()
+    try:
+        while True:
+            try:
+                item = await within(source.__anext__(), stage)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -3,18 +3,34 @@ Agent Orchestrator Engine
 Central coordinator for all AI agents using LangGraph
 """
 
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Dict, Any, Optional, List, MutableMapping, Set, Tuple
+from collections import ChainMap
+from dataclasses import dataclass, field, replace
 from enum import Enum
+import os
+import time
 import asyncio
 import structlog
 
 from langgraph.graph import StateGraph, END
 from pydantic import BaseModel
 
+from .scheduler import SessionBusy, create_session_scheduler
+from .deadline import DeadlineExceeded, remaining, request_deadline
+from .shedding import LoadShed, create_load_shedder
+from ..guardrails import get_guardrails
+from ..memory import get_conversation_memory, get_session_checkpointer
+
 logger = structlog.get_logger()
 
 
+# How linear workflows run: "direct" calls the agent, "graph" goes through LangGraph
+EXECUTION_MODES = ("direct", "graph")
+
+# Stages degrade on their own at the deadline; the hard stop comes this much later
+DEADLINE_GRACE_SECONDS = 1.0
+
+
 class AgentStatus(Enum):
     IDLE = "idle"
     RUNNING = "running"
@@ -22,17 +38,63 @@ class AgentStatus(Enum):
     DISABLED = "disabled"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentState:
-    """State passed between agents in the graph"""
-    messages: List[Dict[str, Any]] = field(default_factory=list)
+    """
+    State passed between agents in the graph.
+    
+    Built for many concurrent requests: slotted, and copy-on-write
+    where states are forked. `messages` is an immutable tuple (replace
+    it, don't append to it); a `fork` layers its own `context` and
+    `metadata` over the parent's, so its writes stay its own and
+    nothing is copied.
+    
+    Agents record the turn in the session's conversation memory only
+    when `record_history` is set; fan-out branches read the history but
+    leave the recording to the fan-out itself, so a turn is stored once.
+    """
+    messages: Tuple[Dict[str, Any], ...] = ()
     current_agent: str = ""
     session_id: str = ""
     user_input: str = ""
-    context: Dict[str, Any] = field(default_factory=dict)
+    context: MutableMapping[str, Any] = field(default_factory=dict)
     response: str = ""
     should_escalate: bool = False
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: MutableMapping[str, Any] = field(default_factory=dict)
+    record_history: bool = True
+    
+    def fork(self, **changes: Any) -> "AgentState":
+        """New state reading through to this one's messages, context and metadata"""
+        return replace(
+            self,
+            context=_overlay(self.context),
+            metadata=_overlay(self.metadata),
+            **changes
+        )
+
+
+def _overlay(mapping: MutableMapping[str, Any]) -> ChainMap:
+    """Writable layer over a mapping: reads fall through, writes stay in the layer"""
+    return mapping.new_child() if isinstance(mapping, ChainMap) else ChainMap({}, mapping)
+
+
+@dataclass
+class BranchResult:
+    """Outcome of one agent in a fan-out"""
+    agent_id: str
+    response: str = ""
+    status: str = "ok"  # ok | timeout | error | unavailable
+    latency_ms: float = 0.0
+    should_escalate: bool = False
+
+
+@dataclass
+class BatchItem:
+    """One message of a batch"""
+    message: str
+    session_id: str
+    context: Optional[Dict[str, Any]] = None
+    timeout_seconds: Optional[float] = None
 
 
 class AgentRegistry:
@@ -74,13 +136,55 @@ class Orchestrator:
     """
     Main orchestrator that coordinates all agents.
     Uses LangGraph for workflow management.
+    
+    Workflows registered as linear (router -> one agent -> response)
+    are dispatched straight to the agent in "direct" mode, skipping
+    LangGraph's per-step state copies and channel merges; multi-step
+    workflows always run through their compiled graph.
+    
+    Turns of the same session run one at a time, in arrival order;
+    different sessions run concurrently. With Redis, each session is
+    checkpointed after every turn and reloaded by whichever worker
+    serves its next one; the context of a turn carries over to the
+    next, overridden key by key by the context the client sends.
+    
+    Every request gets a deadline (see `deadline`), waiting for its
+    session included, that pipeline stages check to skip optional work
+    or answer with a fallback when time runs short.
     """
     
-    def __init__(self):
+    def __init__(self, execution_mode: Optional[str] = None):
         self.registry = AgentRegistry()
-        self.workflows: Dict[str, StateGraph] = {}
+        self.workflows: Dict[str, Any] = {}
+        self.linear_workflows: Set[str] = set()
+        
+        mode = (execution_mode or os.getenv("ORCHESTRATOR_MODE", "direct")).lower()
+        if mode not in EXECUTION_MODES:
+            logger.warning(f"Unknown orchestrator mode {mode!r}, using direct dispatch")
+            mode = "direct"
+        self.execution_mode = mode
+        self._dispatches: Dict[str, int] = {"direct": 0, "graph": 0}
+        self.scheduler = create_session_scheduler()
+        self.shedder = create_load_shedder()
+        self.checkpointer = get_session_checkpointer()
+        self.conversation = get_conversation_memory()
+        self.branch_timeout = float(os.getenv("ORCHESTRATOR_BRANCH_TIMEOUT_SECONDS", "20"))
+        self.request_timeout = float(os.getenv("ORCHESTRATOR_REQUEST_TIMEOUT_SECONDS", "30"))
+        self.batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.batch_max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+        self.batch_max_items = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+        self._deadline_stats: Dict[str, int] = {"exceeded": 0}
+        self._batch_stats: Dict[str, int] = {"requests": 0, "items": 0, "shed_waits": 0}
+        self._fanout_stats: Dict[str, int] = {
+            "requests": 0,
+            "branches": 0,
+            "timeouts": 0,
+            "errors": 0
+        }
+        
         self._setup_default_workflow()
-        logger.info("🎭 Orchestrator initialized")
+        self._setup_fanout_workflow()
+        logger.info(f"🎭 Orchestrator initialized ({self.execution_mode} mode)")
     
     def _setup_default_workflow(self) -> None:
         """Setup the default agent workflow graph"""
@@ -124,11 +228,27 @@ class Orchestrator:
         workflow.add_edge("response", END)
         
         self.workflows["default"] = workflow.compile()
+        
+        # Every path is router -> one agent -> response
+        self.linear_workflows.add("default")
+    
+    def _setup_fanout_workflow(self) -> None:
+        """Setup the workflow running several agents concurrently"""
+        workflow = StateGraph(AgentState)
+        
+        workflow.add_node("fan_out", self._fan_out)
+        workflow.add_node("merge", self._merge_branches)
+        
+        workflow.set_entry_point("fan_out")
+        workflow.add_edge("fan_out", "merge")
+        workflow.add_edge("merge", END)
+        
+        self.workflows["fanout"] = workflow.compile()
     
-    async def _route_request(self, state: AgentState) -> AgentState:
+    async def _route_request(self, state: AgentState) -> Dict[str, Any]:
         """Route incoming request to appropriate agent"""
         logger.info(f"Routing request for session: {state.session_id}")
-        return state
+        return {}
     
     def _determine_agent(self, state: AgentState) -> str:
         """Determine which agent should handle the request"""
@@ -141,77 +261,135 @@ class Orchestrator:
         # Default to Marie for support
         return "marie"
     
-    async def _invoke_support(self, state: AgentState) -> AgentState:
+    async def _invoke_support(self, state: AgentState) -> Dict[str, Any]:
         """Invoke MARIE support agent"""
-        agent = self.registry.get("marie")
-        if agent:
-            response = await agent.process(state)
-            state.response = response
-        else:
-            state.response = "Agent MARIE non disponible"
-        return state
+        return await self._agent_node("marie", state)
     
-    async def _invoke_content(self, state: AgentState) -> AgentState:
+    async def _invoke_content(self, state: AgentState) -> Dict[str, Any]:
         """Invoke HUGO content agent"""
-        agent = self.registry.get("hugo")
-        if agent:
-            response = await agent.process(state)
-            state.response = response
-        else:
-            state.response = "Agent HUGO non disponible"
-        return state
+        return await self._agent_node("hugo", state)
     
-    async def _invoke_quote(self, state: AgentState) -> AgentState:
+    async def _invoke_quote(self, state: AgentState) -> Dict[str, Any]:
         """Invoke LUCAS quote agent"""
-        agent = self.registry.get("lucas")
-        if agent:
-            response = await agent.process(state)
-            state.response = response
-        else:
-            state.response = "Agent LUCAS non disponible"
-        return state
+        return await self._agent_node("lucas", state)
     
-    async def _invoke_email(self, state: AgentState) -> AgentState:
+    async def _invoke_email(self, state: AgentState) -> Dict[str, Any]:
         """Invoke EMMA email agent"""
-        agent = self.registry.get("emma")
-        if agent:
-            response = await agent.process(state)
-            state.response = response
-        else:
-            state.response = "Agent EMMA non disponible"
-        return state
+        return await self._agent_node("emma", state)
     
-    async def _invoke_analytics(self, state: AgentState) -> AgentState:
+    async def _invoke_analytics(self, state: AgentState) -> Dict[str, Any]:
         """Invoke NOAH analytics agent"""
-        agent = self.registry.get("noah")
-        if agent:
-            response = await agent.process(state)
-            state.response = response
-        else:
-            state.response = "Agent NOAH non disponible"
-        return state
+        return await self._agent_node("noah", state)
     
-    async def _invoke_social(self, state: AgentState) -> AgentState:
+    async def _invoke_social(self, state: AgentState) -> Dict[str, Any]:
         """Invoke JOHN social media agent"""
-        agent = self.registry.get("john")
+        return await self._agent_node("john", state)
+    
+    async def _agent_node(self, agent_key: str, state: AgentState) -> Dict[str, Any]:
+        """Graph node running an agent, writing back only what agents change"""
+        state = await self._run_agent(agent_key, state)
+        return {
+            "response": state.response,
+            "should_escalate": state.should_escalate,
+            "context": state.context
+        }
+    
+    async def _run_agent(self, agent_key: str, state: AgentState) -> AgentState:
+        """Run a registered agent on the state"""
+        agent = self.registry.get(agent_key)
         if agent:
-            response = await agent.process(state)
-            state.response = response
+            state.response = await agent.process(state)
         else:
-            state.response = "Agent JOHN non disponible"
+            state.response = f"Agent {agent_key.upper()} non disponible"
         return state
     
-    async def _format_response(self, state: AgentState) -> AgentState:
+    async def _fan_out(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Run every requested agent concurrently.
+        
+        Each branch works on its own fork of the incoming state, so
+        agents can't see or overwrite each other's changes, and is cut
+        off after the branch timeout: latency is that of the slowest
+        branch, not the sum.
+        """
+        agent_ids = state.metadata.get("fanout_agents", [])
+        timeout = state.metadata.get("branch_timeout", self.branch_timeout)
+        left = remaining()
+        if left is not None:
+            timeout = min(timeout, left)
+        branches = await asyncio.gather(*[
+            self._run_branch(agent_id, self._branch_state(state, agent_id), timeout)
+            for agent_id in agent_ids
+        ])
+        state.metadata["branches"] = branches
+        return {
+            "metadata": state.metadata,
+            "should_escalate": any(branch.should_escalate for branch in branches)
+        }
+    
+    async def _run_branch(self, agent_id: str, state: AgentState, timeout: float) -> BranchResult:
+        """Run one fan-out branch, never raising"""
+        agent = self.registry.get(agent_id)
+        if not agent:
+            return BranchResult(agent_id, status="unavailable")
+        
+        self._fanout_stats["branches"] += 1
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(agent.process(state), timeout)
+            status = "ok"
+        except asyncio.TimeoutError:
+            logger.warning(f"Fan-out branch {agent_id} timed out after {timeout}s")
+            self._fanout_stats["timeouts"] += 1
+            response, status = "", "timeout"
+        except Exception as e:
+            logger.error(f"Fan-out branch {agent_id} failed: {e}")
+            self._fanout_stats["errors"] += 1
+            response, status = "", "error"
+        
+        return BranchResult(
+            agent_id=agent_id,
+            response=response,
+            status=status,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            should_escalate=state.should_escalate
+        )
+    
+    @staticmethod
+    def _branch_state(state: AgentState, agent_id: str) -> AgentState:
+        """Copy-on-write view of the state for one branch, reading history without writing it"""
+        return state.fork(current_agent=agent_id, record_history=False)
+    
+    async def _merge_branches(self, state: AgentState) -> Dict[str, Any]:
+        """Combine the branches' answers, in the order the agents were requested"""
+        answered = [branch for branch in state.metadata.get("branches", []) if branch.response]
+        if not answered:
+            response = "Désolée, aucun de nos agents n'a pu répondre pour le moment."
+        elif len(answered) == 1:
+            response = answered[0].response
+        else:
+            response = "\n\n".join(
+                f"**{self._agent_name(branch.agent_id)}**\n{branch.response}" for branch in answered
+            )
+        return {"response": response}
+    
+    def _agent_name(self, agent_id: str) -> str:
+        agent = self.registry.get(agent_id)
+        return agent.name if agent else agent_id.upper()
+    
+    async def _format_response(self, state: AgentState) -> Dict[str, Any]:
         """Format the final response"""
         logger.info(f"Formatting response from {state.current_agent}")
-        return state
+        return {}
     
     async def invoke(
         self,
         agent_id: str,
         message: str,
         session_id: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        workflow: str = "default",
+        timeout_seconds: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Invoke an agent with a message.
@@ -221,28 +399,64 @@ class Orchestrator:
             message: User message
             session_id: Conversation session ID
             context: Additional context
+            workflow: Workflow to run the request through
+            timeout_seconds: Time budget (capped at ORCHESTRATOR_REQUEST_TIMEOUT_SECONDS)
             
         Returns:
             Agent response
+            
+        Raises:
+            SessionBusy: Too many turns already queued for this session
+            DeadlineExceeded: The request ran out of time
+            LoadShed: Admitted under load for a cached answer, but the
+                answer needed the LLM
         """
-        state = AgentState(
-            user_input=message,
-            session_id=session_id,
-            current_agent=agent_id,
-            context=context or {}
-        )
+        async def turn() -> Dict[str, Any]:
+            async with self.scheduler.turn(session_id):
+                state = AgentState(
+                    user_input=message,
+                    session_id=session_id,
+                    current_agent=agent_id,
+                    context=context or {}
+                )
+                await self._load_session(state)
+                result = await self._invoke(state, workflow)
+                await self._save_session(state)
+                return result
         
+        return await self._within_budget(turn(), timeout_seconds)
+    
+    async def _invoke(self, state: AgentState, workflow: str) -> Dict[str, Any]:
+        agent_id, session_id = state.current_agent, state.session_id
         try:
+            if self._dispatches_directly(workflow):
+                self._dispatches["direct"] += 1
+                state = await self._run_agent(self._determine_agent(state), state)
+                return {
+                    "success": True,
+                    "message": state.response,
+                    "agent": agent_id.upper(),
+                    "session_id": session_id
+                }
+            
             # Run through the workflow
-            workflow = self.workflows.get("default")
-            if workflow:
-                result = await workflow.ainvoke(state)
+            graph = self.workflows.get(workflow)
+            if graph:
+                self._dispatches["graph"] += 1
+                result = await graph.ainvoke(state)
+                # The compiled graph returns its channel values as a dict;
+                # the context goes back on the state to be checkpointed
+                state.response = result["response"]
+                state.should_escalate = result["should_escalate"]
+                state.context = result["context"]
                 return {
                     "success": True,
-                    "message": result.response,
+                    "message": state.response,
                     "agent": agent_id.upper(),
                     "session_id": session_id
                 }
+        except (DeadlineExceeded, LoadShed):
+            raise
         except Exception as e:
             logger.error(f"Error invoking agent {agent_id}: {e}")
             return {
@@ -253,8 +467,340 @@ class Orchestrator:
         
         return {
             "success": False,
-            "error": "Unknown error"
+            "error": f"Unknown workflow: {workflow}"
+        }
+    
+    async def invoke_fanout(
+        self,
+        agent_ids: List[str],
+        message: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None,
+        branch_timeout: Optional[float] = None,
+        timeout_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Ask several agents the same message concurrently and merge their answers.
+        
+        Args:
+            agent_ids: Agents to run (marie, hugo, lucas, etc.), duplicates ignored
+            message: User message
+            session_id: Conversation session ID
+            context: Additional context
+            branch_timeout: Per-agent time limit in seconds
+                (default ORCHESTRATOR_BRANCH_TIMEOUT_SECONDS)
+            timeout_seconds: Time budget of the whole request
+            
+        Returns:
+            Merged response with the outcome of each branch
+            
+        Raises:
+            SessionBusy: Too many turns already queued for this session
+            DeadlineExceeded: The request ran out of time
+            LoadShed: Admitted under load for a cached answer, but the
+                answer needed the LLM
+        """
+        agent_ids = list(dict.fromkeys(agent_id.lower() for agent_id in agent_ids))
+        state = AgentState(
+            user_input=message,
+            session_id=session_id,
+            current_agent="fanout",
+            context=context or {},
+            metadata={
+                "fanout_agents": agent_ids,
+                "branch_timeout": branch_timeout or self.branch_timeout
+            }
+        )
+        
+        self._fanout_stats["requests"] += 1
+        
+        async def turn() -> Dict[str, Any]:
+            async with self.scheduler.turn(session_id):
+                await self._load_session(state)
+                # Recorded once here, before the branches read the history
+                recorded = self._record_user_message(session_id, message)
+                result = await self.workflows["fanout"].ainvoke(state)
+                state.should_escalate = result["should_escalate"]
+                if recorded and any(branch.response for branch in result["metadata"].get("branches", [])):
+                    self.conversation.add_message(session_id, "assistant", result["response"])
+                await self._save_session(state)
+                return result
+        
+        try:
+            result = await self._within_budget(turn(), timeout_seconds)
+        except (SessionBusy, DeadlineExceeded, LoadShed):
+            raise
+        except Exception as e:
+            logger.error(f"Error in fan-out to {agent_ids}: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "agent": "FANOUT"
+            }
+        
+        branches = result["metadata"].get("branches", [])
+        return {
+            "success": any(branch.status == "ok" for branch in branches),
+            "message": result["response"],
+            "agent": "+".join(agent_id.upper() for agent_id in agent_ids),
+            "session_id": session_id,
+            "should_escalate": result["should_escalate"],
+            "branches": [
+                {
+                    "agent": branch.agent_id.upper(),
+                    "status": branch.status,
+                    "latency_ms": round(branch.latency_ms, 1)
+                }
+                for branch in branches
+            ]
+        }
+    
+    def _record_user_message(self, session_id: str, message: str) -> bool:
+        """Add a user message to the session history, PII masked as agents do; False if refused"""
+        input_check = get_guardrails().check_input(message)
+        if not input_check.passed:
+            return False
+        self.conversation.add_message(session_id, "user", input_check.sanitized_text or message)
+        return True
+    
+    async def invoke_batch(
+        self,
+        agent_id: str,
+        items: List[BatchItem],
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run many messages through `invoke`, yielding results as they complete.
+        
+        Messages of the same session run one after another, in list
+        order; sessions run concurrently, at most `concurrency` at a
+        time. Each message goes through the load shedder, waiting out
+        Retry-After when shed, so a batch slows down under load instead
+        of failing.
+        
+        Args:
+            agent_id: The agent to invoke (marie, hugo, lucas, etc.)
+            items: Messages to run
+            concurrency: Messages in flight at once (default BATCH_CONCURRENCY,
+                capped at BATCH_MAX_CONCURRENCY)
+            
+        Yields:
+            One result per message, with its `index` in `items` and its latency
+        """
+        concurrency = min(concurrency or self.batch_concurrency, self.batch_max_concurrency)
+        self._batch_stats["requests"] += 1
+        
+        # Each session is a queue of message indexes, handed whole to one worker
+        sessions: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            sessions.setdefault(item.session_id, []).append(index)
+        pending: "asyncio.Queue[List[int]]" = asyncio.Queue()
+        for indexes in sessions.values():
+            pending.put_nowait(indexes)
+        results: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        
+        async def worker() -> None:
+            while not pending.empty():
+                for index in pending.get_nowait():
+                    results.put_nowait(await self._invoke_batch_item(agent_id, index, items[index]))
+        
+        workers = [asyncio.create_task(worker()) for _ in range(min(max(1, concurrency), len(sessions)))]
+        try:
+            for _ in range(len(items)):
+                yield await results.get()
+        finally:
+            # The consumer may stop early (client gone): don't leave work running
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def _invoke_batch_item(self, agent_id: str, index: int, item: BatchItem) -> Dict[str, Any]:
+        """Run one batch message, never raising"""
+        self._batch_stats["items"] += 1
+        started = time.perf_counter()
+        try:
+            while True:
+                try:
+                    ticket = self.shedder.acquire(
+                        lambda: self.is_low_cost(agent_id, item.message),
+                        lambda: self.may_answer_from_cache(agent_id, item.message)
+                    )
+                    try:
+                        result = await self.invoke(
+                            agent_id,
+                            item.message,
+                            item.session_id,
+                            item.context,
+                            timeout_seconds=item.timeout_seconds
+                        )
+                        break
+                    finally:
+                        self.shedder.release(ticket)
+                except LoadShed as e:
+                    # Shed at admission, or at the LLM call after a cache miss
+                    self._batch_stats["shed_waits"] += 1
+                    await asyncio.sleep(e.retry_after)
+        except Exception as e:
+            logger.error(f"Batch item {index} for {agent_id} failed: {e}")
+            result = {"success": False, "error": str(e) or type(e).__name__, "agent": agent_id.upper()}
+        
+        return {
+            "index": index,
+            "session_id": item.session_id,
+            **result,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1)
         }
+    
+    def is_low_cost(self, agent_id: str, message: str) -> bool:
+        """Whether the agent will answer without an LLM call (for load shedding)"""
+        agent = self.registry.get(self._determine_agent(AgentState(current_agent=agent_id)))
+        return bool(agent) and agent.is_low_cost(message)
+    
+    def may_answer_from_cache(self, agent_id: str, message: str) -> bool:
+        """Whether the agent might answer from a cache (for load shedding)"""
+        agent = self.registry.get(self._determine_agent(AgentState(current_agent=agent_id)))
+        return bool(agent) and agent.may_answer_from_cache(message)
+    
+    def supports_action(self, agent_id: str, action: str) -> bool:
+        """Whether `run_action` can run an action (checked when a job is submitted)"""
+        agent = self.registry.get(agent_id)
+        if not agent:
+            return False
+        return action == "chat" or action in getattr(agent, "actions", ())
+    
+    async def run_action(self, agent_id: str, action: str, params: Dict[str, Any]) -> Any:
+        """
+        Execute an agent action for the job queue.
+        
+        "chat" goes through `invoke` (params: message, session_id,
+        context); other actions are handled by the agent itself.
+        """
+        agent = self.registry.get(agent_id)
+        if not agent:
+            raise ValueError(f"Agent {agent_id} not found")
+        if action == "chat":
+            return await self.invoke(
+                agent_id,
+                params["message"],
+                params.get("session_id", ""),
+                params.get("context")
+            )
+        return await agent.run_action(action, params)
+    
+    async def invoke_stream(
+        self,
+        agent_id: str,
+        message: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None,
+        timeout_seconds: Optional[float] = None,
+        reload_session: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Invoke an agent and stream its response.
+        
+        The default workflow is a straight router -> agent -> response
+        line, so streaming always dispatches to the agent directly (in
+        either mode) instead of going through the compiled graph, which
+        only yields whole states.
+        
+        Args:
+            agent_id: The agent to invoke (marie, hugo, lucas, etc.)
+            message: User message
+            session_id: Conversation session ID
+            context: Additional context
+            timeout_seconds: Time budget (capped at ORCHESTRATOR_REQUEST_TIMEOUT_SECONDS)
+            reload_session: Check for a newer checkpoint of the session first.
+                Callers holding the session across turns (a WebSocket
+                connection) skip it: the local copy is used unless evicted
+            
+        Yields:
+            Response text chunks
+        """
+        state = AgentState(
+            user_input=message,
+            session_id=session_id,
+            current_agent=agent_id,
+            context=context or {}
+        )
+        
+        agent_key = self._determine_agent(state)
+        agent = self.registry.get(agent_key)
+        if not agent:
+            yield f"Agent {agent_key.upper()} non disponible"
+            return
+        
+        # The session stays held until the stream is consumed or closed;
+        # stages see the deadline, and the LLM stream stops when it passes
+        with request_deadline(self._budget(timeout_seconds)):
+            async with self.scheduler.turn(session_id):
+                if reload_session or not self.checkpointer.is_cached(session_id):
+                    await self._load_session(state)
+                self._dispatches["direct"] += 1
+                async for chunk in agent.process_stream(state):
+                    yield chunk
+                await self._save_session(state)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Execution mode and requests dispatched per path"""
+        return {
+            "execution_mode": self.execution_mode,
+            "linear_workflows": sorted(self.linear_workflows),
+            "dispatches": dict(self._dispatches),
+            "fanout": {**self._fanout_stats, "branch_timeout_seconds": self.branch_timeout},
+            "sessions": self.scheduler.stats(),
+            "checkpoints": self.checkpointer.stats(),
+            "deadlines": {**self._deadline_stats, "request_timeout_seconds": self.request_timeout},
+            "batches": {**self._batch_stats, "max_concurrency": self.batch_max_concurrency},
+            "load": self.shedder.stats()
+        }
+    
+    async def _load_session(self, state: AgentState) -> None:
+        """Bring the session's memories up to date, carrying its context over"""
+        saved = await self.checkpointer.load(state.session_id)
+        if saved.get("context"):
+            state.context = {**saved["context"], **state.context}
+    
+    async def _save_session(self, state: AgentState) -> None:
+        """Checkpoint the session after its turn"""
+        await self.checkpointer.save(state.session_id, {
+            "agent": state.current_agent,
+            "should_escalate": state.should_escalate,
+            "context": dict(state.context)
+        })
+    
+    def _budget(self, timeout_seconds: Optional[float]) -> float:
+        """Request time budget: the caller's, capped at the server's"""
+        # A missing or non-positive budget means the server default
+        if timeout_seconds is None or timeout_seconds <= 0:
+            return self.request_timeout
+        if self.request_timeout > 0:
+            return min(timeout_seconds, self.request_timeout)
+        return timeout_seconds
+    
+    async def _within_budget(self, coro: Awaitable[Any], timeout_seconds: Optional[float]) -> Any:
+        """
+        Run a request under its deadline.
+        
+        Stages see the deadline and degrade on their own; the hard stop,
+        slightly later, only catches work that ignores it.
+        """
+        budget = self._budget(timeout_seconds)
+        with request_deadline(budget):
+            if budget <= 0:
+                return await coro
+            hard_stop = asyncio.timeout(budget + DEADLINE_GRACE_SECONDS)
+            try:
+                async with hard_stop:
+                    return await coro
+            except TimeoutError:
+                if not hard_stop.expired():
+                    raise
+                self._deadline_stats["exceeded"] += 1
+                raise DeadlineExceeded("orchestrator") from None
+    
+    def _dispatches_directly(self, workflow: str) -> bool:
+        return self.execution_mode == "direct" and workflow in self.linear_workflows
 
 
 # Global orchestrator instance
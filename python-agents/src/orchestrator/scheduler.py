@@ -0,0 +1,112 @@
+"""
+Session Scheduler
+Serialize turns within a session, run different sessions concurrently
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict
+import structlog
+
+logger = structlog.get_logger()
+
+
+class SessionBusy(RuntimeError):
+    """Raised when a session already has too many turns waiting"""
+    
+    def __init__(self, session_id: str, queued: int, retry_after: float = 1.0):
+        super().__init__(f"Session {session_id} has {queued} turns in progress")
+        self.session_id = session_id
+        self.queued = queued
+        self.retry_after = retry_after
+
+
+class _SessionSlot:
+    """Lock and turn count of one active session"""
+    __slots__ = ("lock", "turns")
+    
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.turns = 0  # Running + waiting
+
+
+class SessionScheduler:
+    """
+    Keyed scheduler: one FIFO lock per session.
+    
+    A turn holds its session's lock from memory read to memory write,
+    so two quick messages can't build prompts from half-updated
+    history. Sessions never wait on each other. A slot exists only
+    while its session has turns running or waiting, then it's dropped,
+    so memory follows active sessions rather than every session seen.
+    All of this runs on the event loop thread, so a plain dict of
+    slots needs no further locking.
+    """
+    
+    def __init__(self, max_turns_per_session: int = 3, enabled: bool = True):
+        self.max_turns_per_session = max_turns_per_session
+        self.enabled = enabled
+        self._slots: Dict[str, _SessionSlot] = {}
+        self._wait_ms: Deque[float] = deque(maxlen=500)
+        self._counters: Dict[str, int] = {
+            "turns": 0,
+            "waited": 0,
+            "rejected": 0
+        }
+    
+    @asynccontextmanager
+    async def turn(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Hold the session for the duration of one turn.
+        
+        Raises:
+            SessionBusy: The session already has its maximum of turns running or waiting
+        """
+        if not self.enabled or not session_id:
+            yield
+            return
+        
+        slot = self._slots.get(session_id)
+        if slot is None:
+            slot = self._slots[session_id] = _SessionSlot()
+        if slot.turns >= self.max_turns_per_session:
+            self._counters["rejected"] += 1
+            raise SessionBusy(session_id, slot.turns)
+        
+        slot.turns += 1
+        self._counters["turns"] += 1
+        try:
+            if slot.lock.locked():
+                self._counters["waited"] += 1
+            started = time.monotonic()
+            async with slot.lock:
+                self._wait_ms.append((time.monotonic() - started) * 1000)
+                yield
+        finally:
+            slot.turns -= 1
+            if slot.turns == 0:
+                del self._slots[session_id]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Active sessions, queued turns and wait times"""
+        waits = sorted(self._wait_ms)
+        return {
+            **self._counters,
+            "enabled": self.enabled,
+            "max_turns_per_session": self.max_turns_per_session,
+            "active_sessions": len(self._slots),
+            "queued_turns": sum(max(0, slot.turns - 1) for slot in self._slots.values()),
+            "wait_ms_p50": round(waits[len(waits) // 2], 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1], 1) if waits else 0.0
+        }
+
+
+def create_session_scheduler() -> SessionScheduler:
+    """Session scheduler configured from the environment"""
+    return SessionScheduler(
+        max_turns_per_session=int(os.getenv("SESSION_MAX_QUEUED_TURNS", "3")),
+        enabled=os.getenv("SESSION_SERIALIZE_TURNS", "true").lower() == "true"
+    )
@@ -0,0 +1,253 @@
+"""
+Load Shedding
+Reject work early when the server is saturated, cheap requests last
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+
+class LoadLevel(Enum):
+    NORMAL = "normal"
+    ELEVATED = "elevated"  # Past the soft watermarks: only low-cost requests
+    OVERLOADED = "overloaded"  # Past the hard watermarks: nothing new
+
+
+class LoadShed(RuntimeError):
+    """Raised when a request is rejected to protect the server"""
+    
+    def __init__(self, level: LoadLevel, status_code: int, retry_after: float):
+        super().__init__(f"Server {level.value}, request shed")
+        self.level = level
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class ShedTicket:
+    """
+    Admission of one request, handed back to `release`.
+    
+    Tasks spawned by the request see the same ticket (through the
+    context), so a flag cleared in one of them is seen by `release`.
+    """
+    shedder: "LoadShedder"
+    cache_only: bool = False  # Admitted under pressure, as long as no LLM call is needed
+
+
+# Ticket of the request being served
+_ticket: ContextVar[Optional[ShedTicket]] = ContextVar("shed_ticket", default=None)
+
+
+class LoadShedder:
+    """
+    Admission layer in front of the orchestrator.
+    
+    Load is measured two ways: requests in flight, and event loop lag
+    (how late a periodic timer fires, which grows when CPU-bound work
+    or too many tasks starve the loop). Past the soft watermarks only
+    low-cost requests get through and the rest get 429; past the hard
+    watermarks everything new gets 503. Both carry Retry-After, so
+    clients and the gateway back off before latency explodes for
+    everyone already being served.
+    
+    Under the soft watermarks, requests the agent can tell are cheap
+    (template answers) are admitted outright. The others get a quick
+    cache probe: on a miss they are shed at once, otherwise they are
+    admitted "cache-only": they run up to their LLM call, so the
+    caches get their chance, and are shed there (`check_llm_call`)
+    if the probe was wrong and the pressure hasn't eased.
+    """
+    
+    def __init__(
+        self,
+        soft_in_flight: int = 64,
+        hard_in_flight: int = 128,
+        soft_lag_ms: float = 100.0,
+        hard_lag_ms: float = 500.0,
+        retry_after_seconds: float = 2.0,
+        lag_interval_seconds: float = 0.1,
+        enabled: bool = True
+    ):
+        self.soft_in_flight = soft_in_flight
+        self.hard_in_flight = hard_in_flight
+        self.soft_lag_ms = soft_lag_ms
+        self.hard_lag_ms = hard_lag_ms
+        self.retry_after = retry_after_seconds
+        self.lag_interval = lag_interval_seconds
+        self.enabled = enabled
+        
+        self.in_flight = 0
+        self._lag_samples: Deque[float] = deque(maxlen=10)  # ~1s of samples
+        self._monitor: Optional[asyncio.Task] = None
+        self._counters: Dict[str, int] = {
+            "admitted": 0,
+            "admitted_low_cost": 0,
+            "admitted_cache_only": 0,
+            "served_cache_only": 0,
+            "shed_429": 0,
+            "shed_503": 0
+        }
+    
+    @property
+    def lag_ms(self) -> float:
+        """Worst event loop lag over the last second"""
+        return max(self._lag_samples, default=0.0)
+    
+    def level(self) -> LoadLevel:
+        """Current load level"""
+        lag_ms = self.lag_ms
+        if self.in_flight >= self.hard_in_flight or lag_ms >= self.hard_lag_ms:
+            return LoadLevel.OVERLOADED
+        if self.in_flight >= self.soft_in_flight or lag_ms >= self.soft_lag_ms:
+            return LoadLevel.ELEVATED
+        return LoadLevel.NORMAL
+    
+    def acquire(
+        self,
+        is_low_cost: Callable[[], bool],
+        may_be_cached: Optional[Callable[[], bool]] = None
+    ) -> ShedTicket:
+        """
+        Admit a request or shed it; admitted requests must `release()`
+        their ticket.
+        
+        Args:
+            is_low_cost: Whether the request will be answered without the
+                LLM; only called when the server is under pressure
+            may_be_cached: Cheap cache probe, False when no cache can
+                answer the request; only called when the server is under
+                pressure (None: assume a cache may answer)
+        
+        Returns:
+            The request's ticket
+        
+        Raises:
+            LoadShed: Request rejected (status 503, or 429 when it needs
+                the LLM under pressure)
+        """
+        ticket = ShedTicket(self)
+        if self.enabled:
+            level = self.level()
+            if level == LoadLevel.OVERLOADED:
+                self._counters["shed_503"] += 1
+                raise LoadShed(level, 503, self.retry_after * 2)
+            if level == LoadLevel.ELEVATED:
+                if is_low_cost():
+                    self._counters["admitted_low_cost"] += 1
+                elif may_be_cached is not None and not may_be_cached():
+                    # Would only be shed at its LLM call, after the whole pipeline
+                    self._counters["shed_429"] += 1
+                    raise LoadShed(level, 429, self.retry_after)
+                else:
+                    # Shed later, at the LLM call, unless a cache answers first
+                    self._counters["admitted_cache_only"] += 1
+                    ticket.cache_only = True
+        
+        _ticket.set(ticket)
+        self.in_flight += 1
+        self._counters["admitted"] += 1
+        return ticket
+    
+    def release(self, ticket: ShedTicket) -> None:
+        if ticket.cache_only:
+            # Reached the end without an LLM call
+            self._counters["served_cache_only"] += 1
+            ticket.cache_only = False
+        if _ticket.get() is ticket:
+            _ticket.set(None)
+        self.in_flight -= 1
+    
+    @contextmanager
+    def admit(
+        self,
+        is_low_cost: Callable[[], bool],
+        may_be_cached: Optional[Callable[[], bool]] = None
+    ) -> Iterator[ShedTicket]:
+        """`acquire` / `release` around a block"""
+        ticket = self.acquire(is_low_cost, may_be_cached)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+    
+    def start(self) -> None:
+        """Start measuring event loop lag"""
+        if self._monitor is None and self.enabled:
+            self._monitor = asyncio.create_task(self._measure_lag())
+    
+    async def stop(self) -> None:
+        if self._monitor:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Load level, its inputs and shed counts"""
+        return {
+            **self._counters,
+            "enabled": self.enabled,
+            "level": self.level().value,
+            "in_flight": self.in_flight,
+            "loop_lag_ms": round(self.lag_ms, 1),
+            "watermarks": {
+                "soft_in_flight": self.soft_in_flight,
+                "hard_in_flight": self.hard_in_flight,
+                "soft_lag_ms": self.soft_lag_ms,
+                "hard_lag_ms": self.hard_lag_ms
+            }
+        }
+    
+    async def _measure_lag(self) -> None:
+        while True:
+            expected = time.monotonic() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag_ms = max(0.0, time.monotonic() - expected) * 1000
+            self._lag_samples.append(lag_ms)
+            if lag_ms >= self.hard_lag_ms:
+                logger.warning(f"🐢 Event loop lag {lag_ms:.0f}ms")
+
+
+def check_llm_call() -> None:
+    """
+    Shed a request admitted cache-only, now that it needs the LLM.
+    
+    Called by the LLM router after its cache missed; a no-op for
+    requests admitted normally, or once the pressure has eased.
+    
+    Raises:
+        LoadShed: Status 429, the server is still under pressure
+    """
+    ticket = _ticket.get()
+    if ticket is None or not ticket.cache_only:
+        return
+    ticket.cache_only = False
+    level = ticket.shedder.level()
+    if level != LoadLevel.NORMAL:
+        ticket.shedder._counters["shed_429"] += 1
+        raise LoadShed(level, 429, ticket.shedder.retry_after)
+
+
+def create_load_shedder() -> LoadShedder:
+    """Load shedder configured from the environment"""
+    return LoadShedder(
+        soft_in_flight=int(os.getenv("SHED_SOFT_IN_FLIGHT", "64")),
+        hard_in_flight=int(os.getenv("SHED_HARD_IN_FLIGHT", "128")),
+        soft_lag_ms=float(os.getenv("SHED_SOFT_LAG_MS", "100")),
+        hard_lag_ms=float(os.getenv("SHED_HARD_LAG_MS", "500")),
+        retry_after_seconds=float(os.getenv("SHED_RETRY_AFTER_SECONDS", "2")),
+        enabled=os.getenv("SHED_ENABLED", "true").lower() == "true"
+    )
@@ -5,7 +5,7 @@ Vector-based knowledge retrieval for agents
 
 import json
 import hashlib
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from dataclasses import dataclass
 import structlog
 
@@ -35,11 +35,18 @@ class KnowledgeBase:
     """
     In-memory knowledge base for Web Shop.
     In production, this would use Qdrant for vector search.
+    
+    Answers cached from an older version are unreachable once the
+    version changes; subscribers are told the version that went away
+    so they can drop them.
     """
     
     def __init__(self):
         self._documents: Dict[str, Document] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self.version = ""
         self._load_knowledge()
+        self._update_version()
     
     def _load_knowledge(self):
         """Load Web Shop knowledge base"""
@@ -151,6 +158,38 @@ class KnowledgeBase:
         
         logger.info(f"Loaded {len(self._documents)} documents into knowledge base")
     
+    def add_document(self, document: Document) -> None:
+        """Add or replace a document in the knowledge base"""
+        self._documents[document.id] = document
+        self._update_version()
+        logger.info(f"Knowledge base updated: {document.id} (version {self.version})")
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """Remove a document from the knowledge base"""
+        if doc_id not in self._documents:
+            return False
+        del self._documents[doc_id]
+        self._update_version()
+        return True
+    
+    def subscribe(self, listener: Callable[[str], None]) -> None:
+        """Call `listener(previous_version)` whenever the documents change"""
+        self._listeners.append(listener)
+    
+    def _update_version(self) -> None:
+        """Fingerprint the document set so caches can detect changes"""
+        digest = hashlib.sha256()
+        for doc_id in sorted(self._documents):
+            digest.update(doc_id.encode("utf-8"))
+            digest.update(self._documents[doc_id].content.encode("utf-8"))
+        previous, self.version = self.version, digest.hexdigest()[:12]
+        if previous and previous != self.version:
+            for listener in self._listeners:
+                try:
+                    listener(previous)
+                except Exception as e:
+                    logger.error(f"Knowledge base listener failed: {e}")
+    
     def search(self, query: str, top_k: int = 3) -> List[Document]:
         """
         Search for relevant documents.
@@ -212,16 +251,7 @@ class RAGRetriever:
             RAGResult with documents and formatted context
         """
         documents = self.kb.search(query, top_k)
-        
-        # Format context for LLM
-        if documents:
-            context_parts = ["Informations pertinentes de la base de connaissances:"]
-            for i, doc in enumerate(documents, 1):
-                context_parts.append(f"\n--- Document {i} ---")
-                context_parts.append(doc.content)
-            context = "\n".join(context_parts)
-        else:
-            context = ""
+        context = self.format_context(documents)
         
         logger.info(f"RAG retrieved {len(documents)} documents for query: {query[:50]}...")
         
@@ -232,6 +262,17 @@ class RAGRetriever:
             source_count=len(documents)
         )
     
+    def format_context(self, documents: List[Document]) -> str:
+        """Format documents as context for the LLM"""
+        if not documents:
+            return ""
+        
+        context_parts = ["Informations pertinentes de la base de connaissances:"]
+        for i, doc in enumerate(documents, 1):
+            context_parts.append(f"\n--- Document {i} ---")
+            context_parts.append(doc.content)
+        return "\n".join(context_parts)
+    
     def augment_prompt(self, system_prompt: str, rag_result: RAGResult) -> str:
         """
         Augment a system prompt with RAG context.
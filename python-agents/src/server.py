@@ -0,0 +1,249 @@
+"""
+Production Server
+Pre-forking multi-process launcher for the agent API
+
+Usage (from python-agents/):
+    SERVER_WORKERS=4 python -m src.server
+"""
+
+import os
+import gc
+import sys
+import time
+import random
+import signal
+import importlib.util
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+# Set in each worker process by the launcher
+WORKER_INDEX_ENV = "SERVER_WORKER_INDEX"
+
+# A worker that dies sooner than this after starting is restarted after a pause
+MIN_WORKER_LIFETIME_SECONDS = 5.0
+
+_started_at = time.time()
+
+
+@dataclass
+class ServerConfig:
+    """How the launcher runs the API"""
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    backlog: int = 2048
+    graceful_timeout_seconds: int = 30
+    
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        return cls(
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=int(os.getenv("PORT", "8000")),
+            workers=max(1, int(os.getenv("SERVER_WORKERS", "1"))),
+            backlog=int(os.getenv("SERVER_BACKLOG", "2048")),
+            graceful_timeout_seconds=int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+        )
+
+
+def worker_info() -> Dict[str, Any]:
+    """Identity of the process serving the request, for per-worker metrics"""
+    return {
+        "pid": os.getpid(),
+        "index": int(os.getenv(WORKER_INDEX_ENV, "0")),
+        "workers": int(os.getenv("SERVER_WORKERS", "1")),
+        "uptime_seconds": round(time.time() - _started_at, 1)
+    }
+
+
+def check_shared_state(workers: int) -> List[str]:
+    """
+    State that would silently break when split across worker processes.
+    
+    Sessions and jobs must live in Redis as soon as there is more than
+    one worker: otherwise a conversation loses its history when its
+    next turn lands on another worker, and job polls get 404s. Caches
+    (semantic cache, LLM response cache) are fine per worker.
+    
+    Returns:
+        One message per problem (empty when the setup is safe)
+    """
+    if workers <= 1:
+        return []
+    
+    problems = []
+    has_redis = bool(os.getenv("REDIS_URL"))
+    if not has_redis:
+        problems.append("REDIS_URL is not set: sessions and jobs would be process-local")
+    if os.getenv("SESSION_CHECKPOINT", "true").lower() != "true":
+        problems.append("SESSION_CHECKPOINT=false: conversations would be process-local")
+    if has_redis and os.getenv("JOBS_BACKEND", "auto").lower() == "memory":
+        problems.append("JOBS_BACKEND=memory: jobs would only be visible to the worker that queued them")
+    return problems
+
+
+def preload() -> Any:
+    """
+    Build everything workers can share before forking.
+    
+    Imports the app, then builds the knowledge base, the compiled
+    workflows, the agents and the regexes they use (guardrails and
+    analysis patterns are compiled on first use, so one throwaway
+    message goes through them). Only objects without connections or
+    loop-bound state are built here; clients, pools and background
+    tasks start in each worker's lifespan.
+    
+    Returns:
+        The ASGI app
+    """
+    started = time.perf_counter()
+    from .main import app
+    from .orchestrator import get_orchestrator
+    from .agents import get_marie_agent
+    from .rag import get_rag_retriever
+    
+    get_orchestrator()
+    marie = get_marie_agent()
+    get_rag_retriever().kb.search("tarifs site e-commerce", 3)
+    
+    sample = "Bonjour, quel est le prix d'un site e-commerce ? contact@example.com"
+    marie.is_low_cost(sample)
+    marie.guardrails.check_input(sample)
+    marie.guardrails.check_output("Un site e-commerce coûte 599€.")
+    
+    # Move everything built so far out of the collector's reach: a
+    # collection in a worker would otherwise write to every object's
+    # header and un-share the pages they sit on
+    gc.collect()
+    gc.freeze()
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"📦 Preloaded app in {elapsed_ms:.0f}ms ({gc.get_freeze_count()} objects frozen)")
+    return app
+
+
+def event_loop_options() -> Dict[str, str]:
+    """uvloop and httptools when installed (uvicorn[standard]), else the pure-Python ones"""
+    return {
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11"
+    }
+
+
+class Launcher:
+    """
+    Pre-fork process manager.
+    
+    The parent preloads the app, binds the listening socket and forks
+    the workers, which share both; each worker runs its own event loop
+    and lifespan (job workers, LLM clients, connection pools), and
+    reports its own stats on /metrics. Dead workers are replaced;
+    SIGTERM / SIGINT stop the workers gracefully, then the parent.
+    """
+    
+    def __init__(self, config: ServerConfig):
+        self.config = config
+        self._children: Dict[int, int] = {}  # pid -> worker index
+        self._spawned_at: Dict[int, float] = {}
+        self._stopping = False
+    
+    def run(self) -> None:
+        import uvicorn
+        
+        problems = check_shared_state(self.config.workers)
+        if problems:
+            for problem in problems:
+                logger.error(f"❌ {problem}")
+            sys.exit(f"Refusing to start {self.config.workers} workers with process-local state")
+        
+        app = preload()
+        options = event_loop_options()
+        uvicorn_config = uvicorn.Config(
+            app,
+            host=self.config.host,
+            port=self.config.port,
+            backlog=self.config.backlog,
+            timeout_graceful_shutdown=self.config.graceful_timeout_seconds,
+            **options
+        )
+        logger.info(
+            f"🚀 Serving on {self.config.host}:{self.config.port} with "
+            f"{self.config.workers} worker(s) ({options['loop']}, {options['http']})"
+        )
+        
+        if self.config.workers == 1:
+            uvicorn.Server(uvicorn_config).run()
+            return
+        
+        sock = uvicorn_config.bind_socket()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for index in range(self.config.workers):
+            self._spawn(index, uvicorn_config, sock)
+        
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self._children.pop(pid, None)
+            if index is None or self._stopping:
+                continue
+            logger.error(f"💥 Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}")
+            if time.monotonic() - self._spawned_at.pop(pid, 0.0) < MIN_WORKER_LIFETIME_SECONDS:
+                time.sleep(1.0)  # Don't spin on a worker that crashes at startup
+            if not self._stopping:
+                self._spawn(index, uvicorn_config, sock)
+        
+        sock.close()
+        logger.info("👋 All workers stopped")
+    
+    def _spawn(self, index: int, uvicorn_config: Any, sock: Any) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = index
+            self._spawned_at[pid] = time.monotonic()
+            return
+        
+        # Worker process: uvicorn installs its own signal handlers
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        os.environ[WORKER_INDEX_ENV] = str(index)
+        random.seed()  # Don't share retry jitter with the other workers
+        global _started_at
+        _started_at = time.time()
+        
+        import uvicorn
+        
+        exit_code = 0
+        try:
+            uvicorn.Server(uvicorn_config).run(sockets=[sock])
+        except BaseException as e:
+            logger.error(f"Worker {index} crashed: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    
+    def _stop(self, signum: int, frame: Optional[Any]) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info(f"🛑 Stopping {len(self._children)} workers...")
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    Launcher(ServerConfig.from_env()).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,13 @@ Tools extend agent capabilities with external actions
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, List
 from dataclasses import dataclass
-import httpx
 import json
 import math
 from datetime import datetime
 import structlog
 
+from ..transport import get_http_transport
+
 logger = structlog.get_logger()
 
 
@@ -72,18 +73,18 @@ class WebSearchTool(BaseTool):
             ToolResult with search results
         """
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    self.base_url,
-                    params={
-                        "q": query,
-                        "format": "json",
-                        "no_html": 1,
-                        "skip_disambig": 1
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
+            client = get_http_transport().client("tools")
+            response = await client.get(
+                self.base_url,
+                params={
+                    "q": query,
+                    "format": "json",
+                    "no_html": 1,
+                    "skip_disambig": 1
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
             
             results = []
             
@@ -0,0 +1,11 @@
+"""
+Transport module
+"""
+
+from .pool import HTTPTransport, PoolConfig, get_http_transport
+
+__all__ = [
+    "HTTPTransport",
+    "PoolConfig",
+    "get_http_transport"
+]
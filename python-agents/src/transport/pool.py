@@ -0,0 +1,301 @@
+"""
+HTTP Transport
+Shared keep-alive connection pools for LLM providers and tools
+"""
+
+import os
+import time
+import asyncio
+import functools
+import importlib
+import importlib.util
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import structlog
+import httpx
+
+logger = structlog.get_logger()
+
+
+# HTTP/2 needs the optional h2 package: pip install "webshop-ai-agents[http2]"
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class PoolConfig:
+    """Limits for one named connection pool"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 120.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    http2: bool = True
+
+
+def pool_config_from_env(name: str, defaults: PoolConfig) -> PoolConfig:
+    """Pool limits overridable with HTTP_<NAME>_* variables"""
+    prefix = f"HTTP_{name.upper()}_"
+    return PoolConfig(
+        max_connections=int(os.getenv(f"{prefix}MAX_CONNECTIONS", str(defaults.max_connections))),
+        max_keepalive_connections=int(os.getenv(
+            f"{prefix}MAX_KEEPALIVE", str(defaults.max_keepalive_connections)
+        )),
+        keepalive_expiry=float(os.getenv(f"{prefix}KEEPALIVE_EXPIRY", str(defaults.keepalive_expiry))),
+        connect_timeout=float(os.getenv(f"{prefix}CONNECT_TIMEOUT", str(defaults.connect_timeout))),
+        read_timeout=float(os.getenv(f"{prefix}READ_TIMEOUT", str(defaults.read_timeout))),
+        http2=os.getenv("HTTP_HTTP2", "true").lower() == "true" and defaults.http2
+    )
+
+
+# Default pools: long-lived LLM calls and streams, short tool calls
+DEFAULT_POOLS = {
+    "llm": PoolConfig(max_connections=100, max_keepalive_connections=50, read_timeout=120.0),
+    "tools": PoolConfig(max_connections=20, max_keepalive_connections=10, read_timeout=10.0)
+}
+
+
+@dataclass
+class PoolCounters:
+    """Traffic of one pool, counted by its transport"""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    
+    def started(self) -> None:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    def finished(self) -> None:
+        self.in_flight -= 1
+
+
+def _httpx_flavour(client_class: type) -> ModuleType:
+    """
+    httpx package a client class is built on.
+    
+    Recent anthropic SDKs ship on `httpx2`, a fork of httpx that rejects
+    httpx transports and limits, so each pool client gets the transport
+    classes of its own package.
+    """
+    for base in client_class.__mro__:
+        if base.__name__ == "AsyncClient":
+            return importlib.import_module(base.__module__.split(".")[0])
+    raise TypeError(f"{client_class.__name__} is not an httpx AsyncClient")
+
+
+@functools.lru_cache(maxsize=None)
+def _counting_transport_class(flavour: ModuleType) -> type:
+    """Counting transport (and its counted body stream) for one httpx flavour"""
+    
+    class _CountedStream(flavour.AsyncByteStream):
+        """Response body that ends its request's in-flight span when closed"""
+        
+        def __init__(self, stream: Any, on_close: Callable[[], None]):
+            self._stream = stream
+            self._on_close: Optional[Callable[[], None]] = on_close
+        
+        async def __aiter__(self) -> AsyncIterator[bytes]:
+            async for chunk in self._stream:
+                yield chunk
+        
+        async def aclose(self) -> None:
+            try:
+                await self._stream.aclose()
+            finally:
+                if self._on_close is not None:
+                    self._on_close()
+                    self._on_close = None
+    
+    class _CountingTransport(flavour.AsyncBaseTransport):
+        """
+        Pool transport counting requests in flight.
+        
+        A request is in flight from the moment it is sent until its response
+        body is closed, so streamed LLM answers count for their whole length.
+        """
+        
+        def __init__(self, transport: Any, counters: PoolCounters):
+            self._transport = transport
+            self._counters = counters
+        
+        async def handle_async_request(self, request: Any) -> Any:
+            self._counters.started()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except BaseException:
+                self._counters.errors += 1
+                self._counters.finished()
+                raise
+            response.stream = _CountedStream(response.stream, self._counters.finished)
+            return response
+        
+        async def aclose(self) -> None:
+            await self._transport.aclose()
+    
+    return _CountingTransport
+
+
+class HTTPTransport:
+    """
+    Named httpx client pools shared across the process.
+    
+    One client per pool keeps TCP/TLS connections (HTTP/2 when
+    available) alive between requests, so providers and tools stop
+    paying for DNS, TCP and TLS on every call. Pools are split by
+    workload so slow tool calls can't starve LLM traffic.
+    The app lifespan pre-connects the pools at startup and closes
+    them on shutdown. Each pool counts its own traffic (requests in
+    flight until their body is closed) for the /metrics endpoint.
+    
+    SDKs that insist on their own client class (e.g.
+    `anthropic.DefaultAsyncHttpxClient`, built on httpx2) get a pool
+    client of that class, with the same limits, counters and lifecycle.
+    """
+    
+    def __init__(self, pools: Optional[Dict[str, PoolConfig]] = None):
+        self._configs = pools or {
+            name: pool_config_from_env(name, config) for name, config in DEFAULT_POOLS.items()
+        }
+        self._clients: Dict[Tuple[str, type], Any] = {}
+        self._counters: Dict[str, PoolCounters] = {}
+        self._preconnect: Dict[str, Dict[str, Any]] = {}
+        if not HTTP2_AVAILABLE and any(config.http2 for config in self._configs.values()):
+            logger.warning(
+                "⚠️ h2 not installed, HTTP pools fall back to HTTP/1.1 "
+                "(pip install \"webshop-ai-agents[http2]\", or set HTTP_HTTP2=false)"
+            )
+    
+    def client(self, pool: str = "llm", client_class: type = httpx.AsyncClient) -> Any:
+        """
+        Shared client of a pool, created on first use.
+        
+        Callers must not close it: the transport owns its lifecycle.
+        
+        Args:
+            pool: Pool name ("llm", "tools")
+            client_class: httpx.AsyncClient or an SDK client class (httpx
+                or httpx2 based)
+        """
+        key = (pool, client_class)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._create_client(pool, client_class)
+            self._clients[key] = client
+        return client
+    
+    async def preconnect(self, targets: List[Tuple[str, Any]]) -> None:
+        """
+        Open connections before the first customer request.
+        
+        Each URL is warmed through the very client that will call it
+        (SDK clients keep their own connections, apart from the plain
+        client of the same pool). Any HTTP response (even 404) means
+        DNS, TCP and TLS are done and the connection is back in the pool;
+        failures are only logged.
+        
+        Args:
+            targets: (base URL, pool client) pairs to warm up
+        """
+        async def warm(url: str, client: Any) -> None:
+            pool = self._pool_of(client)
+            started = time.perf_counter()
+            try:
+                response = await client.head(url)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._preconnect[url] = {
+                    "pool": pool,
+                    "ok": True,
+                    "status": response.status_code,
+                    "http_version": response.http_version,
+                    "ms": round(elapsed_ms, 1)
+                }
+                logger.info(f"🔌 Pre-connected {url} ({response.http_version}, {elapsed_ms:.0f}ms)")
+            except Exception as e:
+                self._preconnect[url] = {"pool": pool, "ok": False, "error": str(e)}
+                logger.warning(f"Pre-connect to {url} failed: {e}")
+        
+        await asyncio.gather(*[warm(url, client) for url, client in targets])
+    
+    async def aclose(self) -> None:
+        """Close every pool"""
+        for (pool, client_class), client in self._clients.items():
+            if not client.is_closed:
+                await client.aclose()
+                logger.info(f"HTTP pool {pool} ({client_class.__name__}) closed")
+        self._clients.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilization and pre-connect results"""
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "pools": {name: self._pool_stats(name) for name in self._configs},
+            "preconnect": self._preconnect
+        }
+    
+    def _pool_of(self, client: Any) -> Optional[str]:
+        for (pool, _), pooled in self._clients.items():
+            if pooled is client:
+                return pool
+        return None
+    
+    def _create_client(self, pool: str, client_class: type) -> Any:
+        config = self._configs.get(pool)
+        if config is None:
+            raise KeyError(f"Unknown HTTP pool: {pool}")
+        
+        # Clients of the same pool (plain and SDK classes) share its counters;
+        # transport, limits and timeout come from the client's own package
+        counters = self._counters.setdefault(pool, PoolCounters())
+        flavour = _httpx_flavour(client_class)
+        transport = flavour.AsyncHTTPTransport(
+            http2=config.http2 and HTTP2_AVAILABLE,
+            limits=flavour.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            )
+        )
+        
+        return client_class(
+            transport=_counting_transport_class(flavour)(transport, counters),
+            timeout=flavour.Timeout(config.read_timeout, connect=config.connect_timeout)
+        )
+    
+    def _pool_stats(self, name: str) -> Dict[str, Any]:
+        config = self._configs[name]
+        counters = self._counters.get(name, PoolCounters())
+        clients = sum(
+            1 for (pool, _), client in self._clients.items()
+            if pool == name and not client.is_closed
+        )
+        limit = config.max_connections * max(1, clients)
+        http2 = config.http2 and HTTP2_AVAILABLE
+        
+        return {
+            "clients": clients,
+            "http2": http2,
+            "max_connections": config.max_connections,
+            "requests": counters.requests,
+            "errors": counters.errors,
+            "in_flight": counters.in_flight,
+            "peak_in_flight": counters.peak_in_flight,
+            # HTTP/1.1 runs one request per connection: the rest wait for one.
+            # HTTP/2 multiplexes them, so nothing is known to be waiting.
+            "queued_requests": 0 if http2 else max(0, counters.in_flight - limit),
+            "utilization": round(min(counters.in_flight, limit) / limit, 4)
+        }
+
+
+# Singleton
+_transport: Optional[HTTPTransport] = None
+
+
+def get_http_transport() -> HTTPTransport:
+    """Get the shared HTTP transport singleton"""
+    global _transport
+    if _transport is None:
+        _transport = HTTPTransport()
+    return _transport
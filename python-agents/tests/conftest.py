@@ -0,0 +1,267 @@
+"""
+Shared test fixtures
+
+Every test starts from fresh singletons and a process-local setup
+(no Redis, no real LLM provider, no network at startup).
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import pytest
+
+from src.llm.models import LLMResponse, SystemPrompt, TokenUsage
+from src.llm.providers import LLMProvider
+
+
+SINGLETONS = [
+    ("src.jobs.manager", "_job_manager"),
+    ("src.orchestrator.engine", "_orchestrator"),
+    ("src.agents.marie_support", "_marie_instance"),
+    ("src.agents.templates", "_templates"),
+    ("src.llm.router", "_router_instance"),
+    ("src.llm.metering", "_meter"),
+    ("src.llm.context", "_packer"),
+    ("src.transport.pool", "_transport"),
+    ("src.memory.memory_system", "_redis_client"),
+    ("src.memory.memory_system", "_short_term"),
+    ("src.memory.memory_system", "_long_term"),
+    ("src.memory.memory_system", "_conversation"),
+    ("src.memory.checkpoint", "_checkpointer"),
+    ("src.memory.semantic_cache", "_semantic_cache"),
+    ("src.rag.retriever", "_retriever")
+]
+
+ISOLATING_ENV = [
+    "REDIS_URL",
+    "ANTHROPIC_API_KEY",
+    "GOOGLE_AI_API_KEY",
+    "LOCAL_LLM_BASE_URL",
+    "LLM_FAKE_MODE",
+    "SERVER_WORKERS"
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    """Fresh singletons, no Redis and no providers for every test"""
+    import importlib
+    
+    for name in ISOLATING_ENV:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PRECONNECT", "false")
+    for module, attribute in SINGLETONS:
+        monkeypatch.setattr(importlib.import_module(module), attribute, None)
+
+
+class ScriptedProvider(LLMProvider):
+    """
+    Provider answering from a script, for router and agent tests.
+    
+    `chunks` is streamed (or joined for completions); `fail_after`
+    raises after that many chunks, `delay` is waited before answering.
+    """
+    
+    name = "scripted"
+    
+    def __init__(
+        self,
+        chunks: Optional[List[str]] = None,
+        fail_after: Optional[int] = None,
+        delay: float = 0.0,
+        usage: Optional[TokenUsage] = None,
+        error: Optional[Exception] = None
+    ):
+        super().__init__(default_model="scripted")
+        self.chunks = chunks if chunks is not None else ["Bonjour", " !"]
+        self.fail_after = fail_after
+        self.delay = delay
+        self.usage = usage or TokenUsage(input_tokens=10, output_tokens=5)
+        self.error = error or RuntimeError("Scripted provider failure")
+        self.calls = 0
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail_after is not None:
+            raise self.error
+        return LLMResponse(text="".join(self.chunks), provider=self.name, model=model, usage=self.usage)
+    
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: SystemPrompt,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        usage: TokenUsage
+    ) -> AsyncIterator[str]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        for index, chunk in enumerate(self.chunks):
+            if index == self.fail_after:
+                raise self.error
+            yield chunk
+        if self.fail_after is not None and self.fail_after >= len(self.chunks):
+            raise self.error
+        usage.add(self.usage)
+
+
+@pytest.fixture
+def install_router(monkeypatch) -> Callable[..., Any]:
+    """Install an LLM router serving from the given providers (in fallback order)"""
+    import src.llm.router as router_module
+    
+    def install(**providers: LLMProvider):
+        monkeypatch.setattr(
+            router_module.LLMRouter,
+            "_init_providers",
+            lambda self: self.providers.update(providers)
+        )
+        router = router_module.LLMRouter()
+        monkeypatch.setattr(router_module, "_router_instance", router)
+        return router
+    
+    return install
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the redis.asyncio client: strings, lists and
+    hashes, with pipelines, transactions and WATCH.
+    
+    Every write bumps a per-key counter, so a watched key written by
+    anyone before `execute` fails the transaction like Redis does.
+    """
+    
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.writes: Dict[str, int] = {}
+    
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+    
+    def __getattr__(self, name: str):
+        command = getattr(self, f"_{name}")
+        
+        async def run(*args, **kwargs):
+            return command(*args, **kwargs)
+        
+        return run
+    
+    def _touch(self, key: str) -> None:
+        self.writes[key] = self.writes.get(key, 0) + 1
+    
+    def _get(self, key):
+        return self.data.get(key)
+    
+    def _set(self, key, value):
+        self.data[key] = str(value)
+        self._touch(key)
+        return True
+    
+    def _setex(self, key, ttl, value):
+        return self._set(key, value)
+    
+    def _delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            if self.data.pop(key, None) is not None:
+                deleted += 1
+                self._touch(key)
+        return deleted
+    
+    def _incr(self, key):
+        value = int(self.data.get(key) or 0) + 1
+        self._set(key, value)
+        return value
+    
+    def _expire(self, key, ttl):
+        return key in self.data
+    
+    def _rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+        self._touch(key)
+        return len(self.data[key])
+    
+    def _lrange(self, key, start, end):
+        values = self.data.get(key, [])
+        return values[start:] if end == -1 else values[start:end + 1]
+    
+    def _hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+        self._touch(key)
+        return len(mapping)
+    
+    def _hdel(self, key, *fields):
+        values = self.data.get(key, {})
+        removed = [values.pop(field) for field in fields if field in values]
+        self._touch(key)
+        return len(removed)
+    
+    def _hincrby(self, key, field, amount=1):
+        values = self.data.setdefault(key, {})
+        values[field] = str(int(values.get(field) or 0) + amount)
+        self._touch(key)
+        return int(values[field])
+    
+    def _hgetall(self, key):
+        return dict(self.data.get(key, {}))
+    
+    def _keys(self, pattern):
+        prefix = pattern.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+    
+    async def scan_iter(self, match: str = "*"):
+        for key in self._keys(match):
+            yield key
+
+
+class FakePipeline:
+    """Pipeline of a FakeRedis: commands run at once while watching, else on `execute`"""
+    
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.queued: List[Any] = []
+        self.watched: Dict[str, int] = {}
+        self.immediate = False
+    
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        self.queued, self.watched, self.immediate = [], {}, False
+    
+    async def watch(self, *keys: str) -> None:
+        self.watched = {key: self.redis.writes.get(key, 0) for key in keys}
+        self.immediate = True
+    
+    def multi(self) -> None:
+        self.immediate = False
+    
+    def __getattr__(self, name: str):
+        command = getattr(self.redis, f"_{name}")
+        if self.immediate:
+            async def run(*args, **kwargs):
+                return command(*args, **kwargs)
+            return run
+        
+        def queue(*args, **kwargs):
+            self.queued.append((command, args, kwargs))
+            return self
+        
+        return queue
+    
+    async def execute(self) -> List[Any]:
+        from redis.exceptions import WatchError
+        
+        if any(self.redis.writes.get(key, 0) != count for key, count in self.watched.items()):
+            raise WatchError("Watched variable changed")
+        return [command(*args, **kwargs) for command, args, kwargs in self.queued]
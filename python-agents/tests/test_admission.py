@@ -0,0 +1,116 @@
+"""
+Provider admission: concurrency slots, bounded queue, token buckets
+"""
+
+import asyncio
+
+import pytest
+
+from src.llm.admission import AdmissionRejected, ProviderAdmission, TokenBucket
+
+from .conftest import ScriptedProvider
+
+
+async def hold(admission: ProviderAdmission, release: asyncio.Event, tokens: int = 10) -> None:
+    async with admission.admit(tokens):
+        await release.wait()
+
+
+async def test_requests_beyond_the_concurrency_limit_wait_their_turn():
+    admission = ProviderAdmission("claude", max_concurrency=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(admission, release))
+    await asyncio.sleep(0)
+    
+    waiter = asyncio.create_task(hold(admission, asyncio.Event()))
+    await asyncio.sleep(0)
+    assert admission.stats()["queue_depth"] == 1
+    assert not waiter.done()
+    
+    release.set()
+    await holder
+    await asyncio.sleep(0.01)
+    assert admission.stats()["in_flight"] == 1
+    waiter.cancel()
+
+
+async def test_full_queue_is_rejected_at_once():
+    admission = ProviderAdmission("claude", max_concurrency=1, max_queue=0)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(admission, release))
+    await asyncio.sleep(0)
+    
+    with pytest.raises(AdmissionRejected, match="queue full"):
+        async with admission.admit(10):
+            pass
+    
+    assert admission.stats()["rejected_queue_full"] == 1
+    release.set()
+    await holder
+
+
+async def test_wait_for_a_slot_times_out():
+    admission = ProviderAdmission("claude", max_concurrency=1, max_wait_seconds=0.02)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(admission, release))
+    await asyncio.sleep(0)
+    
+    with pytest.raises(AdmissionRejected, match="concurrency wait timeout"):
+        async with admission.admit(10):
+            pass
+    
+    stats = admission.stats()
+    assert (stats["rejected_timeout"], stats["queue_depth"]) == (1, 0)
+    release.set()
+    await holder
+
+
+async def test_exhausted_token_budget_is_rejected_with_retry_after():
+    admission = ProviderAdmission("claude", tokens_per_minute=600, max_wait_seconds=0.1)
+    async with admission.admit(600):
+        pass
+    
+    with pytest.raises(AdmissionRejected, match="rate limit budget exhausted") as rejected:
+        async with admission.admit(300):
+            pass
+    
+    assert rejected.value.retry_after == pytest.approx(30, rel=0.05)
+
+
+async def test_real_usage_corrects_the_token_bucket():
+    admission = ProviderAdmission("claude", tokens_per_minute=600)
+    
+    async with admission.admit(500) as ticket:
+        ticket.actual_tokens = 100
+    
+    stats = admission.stats()
+    assert stats["tokens_bucket"] == pytest.approx(500, abs=1)
+    assert stats["token_corrections"] == 1
+
+
+def test_token_bucket_refills_and_goes_into_debt():
+    bucket = TokenBucket(rate_per_minute=60)
+    
+    bucket.take(60)
+    bucket.adjust(-30)
+    
+    assert not bucket.available(1)
+    assert bucket.seconds_until(1) == pytest.approx(31, abs=0.1)
+
+
+async def test_router_reports_the_rejection_when_no_provider_admits(install_router):
+    provider = ScriptedProvider()
+    router = install_router(claude=provider)
+    router.admission["claude"] = ProviderAdmission("claude", max_concurrency=1, max_queue=0)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(router.admission["claude"], release))
+    await asyncio.sleep(0)
+    
+    with pytest.raises(AdmissionRejected):
+        await router.complete([{"role": "user", "content": "Bonjour"}])
+    
+    assert provider.calls == 0
+    # Rejections are not provider failures
+    assert router.stats()["breakers"]["claude"]["failures"] == 0
+    release.set()
+    await holder
@@ -0,0 +1,170 @@
+"""
+Batch chat: bounded concurrency, per-session order, NDJSON results
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.orchestrator import BatchItem, LoadLevel, LoadShed, Orchestrator, get_orchestrator
+
+
+class EchoAgent:
+    """Answers with the message, tracking how many turns run at once"""
+    
+    name, role = "Echo", "Test"
+    
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.seen = []
+    
+    async def process(self, state):
+        if state.user_input == "boom":
+            raise RuntimeError("agent failure")
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            self.seen.append(state.user_input)
+            return state.user_input.upper()
+        finally:
+            self.running -= 1
+    
+    def is_low_cost(self, message):
+        return False
+
+
+def orchestrator_with(agent) -> Orchestrator:
+    orchestrator = Orchestrator(execution_mode="direct")
+    orchestrator.registry.register("marie", agent)
+    return orchestrator
+
+
+async def collect(orchestrator: Orchestrator, items, concurrency=None) -> list:
+    return [result async for result in orchestrator.invoke_batch("marie", items, concurrency)]
+
+
+async def test_sessions_run_concurrently_up_to_the_limit():
+    agent = EchoAgent()
+    items = [BatchItem(f"m{i}", f"s-{i}") for i in range(6)]
+    
+    results = await collect(orchestrator_with(agent), items, concurrency=2)
+    
+    assert sorted(result["index"] for result in results) == list(range(6))
+    assert all(result["message"] == items[result["index"]].message.upper() for result in results)
+    assert agent.peak == 2
+
+
+async def test_messages_of_a_session_keep_their_order():
+    agent = EchoAgent()
+    items = [BatchItem(f"a{i}", "s-a") for i in range(3)] + [BatchItem(f"b{i}", "s-b") for i in range(3)]
+    
+    await collect(orchestrator_with(agent), items, concurrency=4)
+    
+    assert [m for m in agent.seen if m.startswith("a")] == ["a0", "a1", "a2"]
+    assert [m for m in agent.seen if m.startswith("b")] == ["b0", "b1", "b2"]
+    assert agent.peak == 2
+
+
+async def test_concurrency_is_capped_by_the_server(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_CONCURRENCY", "3")
+    agent = EchoAgent()
+    orchestrator = Orchestrator(execution_mode="direct")
+    orchestrator.registry.register("marie", agent)
+    
+    await collect(orchestrator, [BatchItem(f"m{i}", f"s-{i}") for i in range(8)], concurrency=50)
+    
+    assert agent.peak == 3
+
+
+async def test_a_failed_message_does_not_fail_the_batch():
+    orchestrator = orchestrator_with(EchoAgent())
+    
+    results = await collect(orchestrator, [BatchItem("boom", "s-1"), BatchItem("ok", "s-2")])
+    
+    by_index = {result["index"]: result for result in results}
+    assert by_index[0]["success"] is False
+    assert by_index[1]["success"] is True
+    assert orchestrator.stats()["batches"]["items"] == 2
+
+
+async def test_shed_messages_wait_and_retry():
+    orchestrator = orchestrator_with(EchoAgent())
+    shedder = orchestrator.shedder
+    admit = shedder.acquire
+    sheds = []
+    
+    def acquire_once_overloaded(*probes):
+        if not sheds:
+            sheds.append(True)
+            raise LoadShed(LoadLevel.OVERLOADED, 503, 0.01)
+        return admit(*probes)
+    
+    shedder.acquire = acquire_once_overloaded
+    
+    results = await collect(orchestrator, [BatchItem("ok", "s-1")])
+    
+    assert results[0]["success"] is True
+    assert orchestrator.stats()["batches"]["shed_waits"] == 1
+    assert shedder.in_flight == 0
+
+
+async def test_consumer_leaving_cancels_the_rest():
+    agent = EchoAgent()
+    orchestrator = orchestrator_with(agent)
+    batch = orchestrator.invoke_batch("marie", [BatchItem(f"m{i}", "s-1") for i in range(10)], 1)
+    
+    first = await batch.__anext__()
+    await batch.aclose()
+    await asyncio.sleep(0.05)
+    
+    assert first["index"] == 0
+    assert len(agent.seen) < 10
+    assert orchestrator.stats()["sessions"]["active_sessions"] == 0
+
+
+def post_batch(requests: list, **extra):
+    from src.main import app
+    
+    with TestClient(app) as client:
+        get_orchestrator().registry.register("marie", EchoAgent())
+        response = client.post("/agents/marie/chat/batch", json={"requests": requests, **extra})
+        return response, [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_endpoint_streams_results_then_a_summary():
+    requests = [{"message": "bonjour", "session_id": "s-1"}, {"message": "boom", "session_id": "s-2"}]
+    
+    response, lines = post_batch(requests, concurrency=2)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [line["type"] for line in lines] == ["result", "result", "summary"]
+    results = {line["index"]: line for line in lines[:2]}
+    assert results[0]["message"] == "BONJOUR"
+    assert results[1]["success"] is False
+    assert {k: lines[-1][k] for k in ("total", "succeeded", "failed")} == {"total": 2, "succeeded": 1, "failed": 1}
+
+
+@pytest.mark.parametrize("requests, status", [
+    ([], 400),
+    ([{"message": "m", "session_id": "s"}] * 3, 413)
+])
+def test_endpoint_rejects_empty_and_oversized_batches(requests, status, monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_ITEMS", "2")
+    
+    response, _ = post_batch(requests)
+    
+    assert response.status_code == status
+
+
+def test_endpoint_rejects_unknown_agents():
+    from src.main import app
+    
+    with TestClient(app) as client:
+        response = client.post("/agents/nobody/chat/batch", json={"requests": [{"message": "m", "session_id": "s"}]})
+    
+    assert response.status_code == 404
@@ -0,0 +1,117 @@
+"""
+Session checkpoints shared by several workers through Redis
+"""
+
+import json
+
+from src.memory import SessionCheckpointer
+from src.memory.memory_system import ConversationMemory, ShortTermMemory
+
+from .conftest import FakeRedis
+
+
+class Worker:
+    """One server process: its own memories, the shared Redis"""
+    
+    def __init__(self, redis: FakeRedis, **kwargs):
+        self.conversation = ConversationMemory()
+        self.short_term = ShortTermMemory()
+        self.checkpointer = SessionCheckpointer(redis, self.conversation, self.short_term, **kwargs)
+    
+    async def turn(self, session_id: str, question: str, answer: str, load: bool = True) -> None:
+        if load:
+            await self.checkpointer.load(session_id)
+        self.conversation.add_message(session_id, "user", question)
+        self.conversation.add_message(session_id, "assistant", answer)
+        self.short_term.store(session_id, "last_intent", question)
+        await self.checkpointer.save(session_id, {"agent": "marie", "context": {"turn": question}})
+    
+    def history(self, session_id: str) -> list:
+        return [m["content"] for m in self.conversation.get_messages(session_id, last_n=20)]
+
+
+class RacingRedis(FakeRedis):
+    """Redis where, once `racing`, another worker writes the session before every transaction"""
+    
+    racing = False
+    
+    def pipeline(self, transaction=True):
+        if self.racing and transaction:
+            self._incr("webshop:session:s-1:version")
+        return super().pipeline(transaction)
+
+
+def stored_history(redis: FakeRedis, session_id: str) -> list:
+    return [json.loads(m)["content"] for m in redis.data[f"webshop:session:{session_id}:messages"]]
+
+
+async def test_next_turn_on_another_worker_sees_the_session():
+    redis = FakeRedis()
+    first, second = Worker(redis), Worker(redis)
+    
+    await first.turn("s-1", "q1", "a1")
+    saved = await second.checkpointer.load("s-1")
+    
+    assert second.history("s-1") == ["q1", "a1"]
+    assert second.short_term.retrieve("s-1", "last_intent") == "q1"
+    assert saved["context"] == {"turn": "q1"}
+
+
+async def test_writes_are_deltas_and_reads_hit_the_cache():
+    redis = FakeRedis()
+    worker = Worker(redis)
+    
+    await worker.turn("s-1", "q1", "a1")
+    await worker.turn("s-1", "q2", "a2")
+    
+    stats = worker.checkpointer.stats()
+    assert stats["messages_written"] == 4
+    assert stats["cache_hits"] == 1
+    assert stored_history(redis, "s-1") == ["q1", "a1", "q2", "a2"]
+
+
+async def test_concurrent_write_is_rejected_and_replayed():
+    redis = FakeRedis()
+    first, second = Worker(redis), Worker(redis)
+    await first.turn("s-1", "q1", "a1")
+    
+    # Second worker answers a turn the first one doesn't know about
+    await second.turn("s-1", "q2", "a2")
+    # First worker's next turn runs on its stale local copy
+    await first.turn("s-1", "q3", "a3", load=False)
+    
+    assert stored_history(redis, "s-1") == ["q1", "a1", "q2", "a2", "q3", "a3"]
+    assert first.history("s-1") == ["q1", "a1", "q2", "a2", "q3", "a3"]
+    assert redis.data["webshop:session:s-1:version"] == "3"
+    assert first.checkpointer.stats()["conflicts"] == 1
+    # The first worker is in sync again: no reload needed
+    assert first.checkpointer.is_cached("s-1")
+    
+    third = Worker(redis)
+    await third.checkpointer.load("s-1")
+    assert third.history("s-1") == ["q1", "a1", "q2", "a2", "q3", "a3"]
+    assert third.short_term.retrieve("s-1", "last_intent") == "q3"
+
+
+async def test_endless_conflicts_give_up_and_reload_next_time():
+    redis = RacingRedis()
+    worker = Worker(redis, max_conflict_retries=2)
+    await worker.turn("s-1", "q1", "a1")
+    
+    redis.racing = True
+    await worker.turn("s-1", "q2", "a2", load=False)
+    
+    stats = worker.checkpointer.stats()
+    assert stats["conflicts"] == 3
+    assert stats["conflicts_unresolved"] == 1
+    assert not worker.checkpointer.is_cached("s-1")
+
+
+async def test_without_redis_checkpoints_are_no_ops():
+    worker = Worker(None)
+    
+    await worker.turn("s-1", "q1", "a1")
+    
+    assert worker.checkpointer.stats()["saves"] == 0
+    assert worker.checkpointer.is_cached("s-1")
+    assert worker.history("s-1") == ["q1", "a1"]
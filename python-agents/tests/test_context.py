@@ -0,0 +1,117 @@
+"""
+Token estimation and budgeted context packing
+"""
+
+from dataclasses import dataclass
+
+from src.llm.context import (
+    ContextPacker,
+    context_window,
+    estimate_tokens,
+    input_budget,
+    truncate_to_tokens
+)
+
+
+@dataclass
+class Doc:
+    id: str
+    content: str
+    score: float
+
+
+def turn(role: str, words: int) -> dict:
+    return {"role": role, "content": " ".join(["mot"] * words)}
+
+
+def test_estimate_counts_words_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Bonjour !") == 3
+    assert estimate_tokens("anticonstitutionnellement") == 7
+
+
+def test_truncate_keeps_the_beginning_within_budget():
+    text = " ".join(f"mot{i}" for i in range(200))
+    
+    cut = truncate_to_tokens(text, 50)
+    
+    assert cut.startswith("mot0 mot1")
+    assert cut.endswith("…")
+    assert estimate_tokens(cut) <= 50
+    assert truncate_to_tokens("court", 50) == "court"
+
+
+def test_budget_reserves_the_output_and_honours_the_cap():
+    assert context_window("claude-sonnet-4-20250514") == 200_000
+    assert context_window("mystery-model") == 8192
+    assert input_budget("claude-sonnet-4-20250514", 2048) == 197_952
+    assert input_budget("claude-sonnet-4-20250514", 2048, max_input_tokens=6000) == 6000
+
+
+def test_everything_fits_untouched():
+    packer = ContextPacker()
+    messages = [turn("user", 5), turn("assistant", 5), turn("user", 5)]
+    
+    packed = packer.pack(1000, ["système"], messages, [Doc("a", "vitrine 299€", 0.9)])
+    
+    assert packed.messages == messages
+    assert [doc.id for doc in packed.documents] == ["a"]
+    assert (packed.dropped_messages, packed.dropped_documents, packed.truncated) == (0, 0, [])
+
+
+def test_oldest_turns_are_dropped_first():
+    packer = ContextPacker()
+    messages = [turn("user", 40), turn("assistant", 40), turn("user", 10), turn("assistant", 10), turn("user", 10)]
+    
+    packed = packer.pack(80, [], messages)
+    
+    assert packed.messages == messages[2:]
+    assert packed.dropped_messages == 2
+    assert packed.tokens <= 80
+
+
+def test_history_never_opens_with_an_assistant_turn():
+    packer = ContextPacker()
+    messages = [turn("user", 40), turn("assistant", 10), turn("user", 10)]
+    
+    packed = packer.pack(30, [], messages)
+    
+    assert [m["role"] for m in packed.messages] == ["user"]
+    assert packed.dropped_messages == 2
+
+
+def test_best_documents_win_and_the_last_one_is_truncated():
+    packer = ContextPacker()
+    documents = [
+        Doc("low", " ".join(["bas"] * 100), 0.2),
+        Doc("high", " ".join(["haut"] * 50), 0.9),
+        Doc("mid", " ".join(["moyen"] * 200), 0.5)
+    ]
+    
+    packed = packer.pack(200, [], [turn("user", 5)], documents)
+    
+    assert [doc.id for doc in packed.documents] == ["high", "mid"]
+    assert packed.documents[1].content.endswith("…")
+    assert packed.truncated == ["document:mid"]
+    assert packed.dropped_documents == 1
+    # The caller's documents are left intact
+    assert not documents[2].content.endswith("…")
+
+
+def test_oversized_user_message_is_truncated_not_dropped():
+    packer = ContextPacker()
+    
+    packed = packer.pack(100, [], [turn("user", 1000)])
+    
+    assert len(packed.messages) == 1
+    assert packed.truncated == ["current_message"]
+    assert packed.tokens <= 100
+
+
+def test_fixed_parts_alone_over_budget_are_reported():
+    packer = ContextPacker()
+    
+    packed = packer.pack(10, [" ".join(["système"] * 50)], [turn("user", 5)])
+    
+    assert packed.tokens > packed.budget
+    assert packer.stats()["over_budget"] == 1
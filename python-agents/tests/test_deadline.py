@@ -0,0 +1,238 @@
+"""
+Request deadlines: budgets, stage cancellation and the HTTP surface
+"""
+
+import asyncio
+
+import pytest
+
+from src.orchestrator import Orchestrator
+from src.orchestrator import engine as engine_module
+from src.orchestrator.deadline import (
+    DeadlineExceeded,
+    check,
+    detached_context,
+    has_budget,
+    iterate_within,
+    remaining,
+    request_deadline,
+    within
+)
+
+from .conftest import ScriptedProvider
+
+
+def test_nested_budgets_only_shorten_the_deadline():
+    assert remaining() is None
+    
+    with request_deadline(10):
+        with request_deadline(60):
+            assert remaining() <= 10
+        with request_deadline(1):
+            assert remaining() <= 1
+            assert not has_budget(5)
+        with request_deadline(None):
+            assert 1 < remaining() <= 10
+    
+    assert remaining() is None
+    assert has_budget(1000)
+
+
+def test_spent_budget_fails_the_next_stage():
+    with request_deadline(0.001):
+        asyncio.run(asyncio.sleep(0.01))
+        with pytest.raises(DeadlineExceeded) as exceeded:
+            check("rag")
+    
+    assert exceeded.value.stage == "rag"
+    assert isinstance(exceeded.value, asyncio.TimeoutError)
+
+
+async def test_slow_stage_is_cancelled_at_the_deadline():
+    cancelled = asyncio.Event()
+    
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    with request_deadline(0.02):
+        with pytest.raises(DeadlineExceeded, match="during llm"):
+            await within(slow(), "llm")
+    
+    assert cancelled.is_set()
+
+
+async def test_no_budget_left_never_starts_the_stage():
+    started = []
+    
+    async def stage():
+        started.append(True)
+    
+    with request_deadline(0.001):
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceeded):
+            await within(stage(), "tools")
+    
+    assert started == []
+
+
+async def test_a_stage_own_timeout_is_not_a_deadline():
+    async def stage():
+        async with asyncio.timeout(0.01):
+            await asyncio.sleep(1)
+    
+    with request_deadline(5):
+        with pytest.raises(TimeoutError) as raised:
+            await within(stage(), "tools")
+    
+    assert not isinstance(raised.value, DeadlineExceeded)
+
+
+async def test_stalled_stream_is_stopped_and_closed():
+    closed = []
+    
+    async def stream():
+        try:
+            yield "Bonjour"
+            await asyncio.sleep(5)
+            yield "jamais"
+        finally:
+            closed.append(True)
+    
+    received = []
+    with request_deadline(0.05):
+        with pytest.raises(DeadlineExceeded):
+            async for chunk in iterate_within(stream(), "llm_stream"):
+                received.append(chunk)
+    
+    assert received == ["Bonjour"]
+    assert closed == [True]
+
+
+async def test_detached_context_has_no_deadline():
+    with request_deadline(1):
+        context = detached_context()
+    
+    assert context.run(remaining) is None
+
+
+class StubbornAgent:
+    """Ignores the deadline entirely"""
+    
+    name, role = "Stubborn", "Test"
+    
+    async def process(self, state):
+        await asyncio.sleep(5)
+        return "trop tard"
+    
+    def is_low_cost(self, message):
+        return False
+
+
+async def test_hard_stop_catches_work_ignoring_the_deadline(monkeypatch):
+    monkeypatch.setattr(engine_module, "DEADLINE_GRACE_SECONDS", 0.01)
+    orchestrator = Orchestrator(execution_mode="direct")
+    orchestrator.registry.register("marie", StubbornAgent())
+    
+    with pytest.raises(DeadlineExceeded, match="orchestrator"):
+        await orchestrator.invoke("marie", "Bonjour", "s-1", timeout_seconds=0.02)
+    
+    assert orchestrator.stats()["deadlines"]["exceeded"] == 1
+    # The session is free for the next turn
+    assert orchestrator.stats()["sessions"]["active_sessions"] == 0
+
+
+def test_caller_budget_is_capped_by_the_server(monkeypatch):
+    monkeypatch.setenv("ORCHESTRATOR_REQUEST_TIMEOUT_SECONDS", "30")
+    orchestrator = Orchestrator()
+    
+    assert orchestrator._budget(None) == 30
+    assert orchestrator._budget(5) == 5
+    assert orchestrator._budget(120) == 30
+    # Non-positive budgets can't opt out of the cap
+    assert orchestrator._budget(0) == 30
+    assert orchestrator._budget(-1) == 30
+
+
+async def test_router_does_not_fall_back_once_the_deadline_passed(install_router):
+    claude = ScriptedProvider(chunks=["claude"], delay=5)
+    gemini = ScriptedProvider(chunks=["gemini"])
+    router = install_router(claude=claude, gemini=gemini)
+    
+    with request_deadline(0.02):
+        with pytest.raises(DeadlineExceeded):
+            await router.complete([{"role": "user", "content": "Bonjour"}])
+    
+    assert gemini.calls == 0
+    # Running out of time is not held against the provider
+    assert router.stats()["breakers"]["claude"]["failures"] == 0
+
+
+QUESTION = "Je voudrais un site vitrine pour mon restaurant, vous proposez quoi ?"
+
+
+def chat(timeout_seconds: float):
+    from fastapi.testclient import TestClient
+    from src.main import app
+    
+    with TestClient(app) as client:
+        return client.post("/agents/marie/chat", json={
+            "message": QUESTION,
+            "session_id": "s-slow",
+            "timeout_seconds": timeout_seconds
+        })
+
+
+def test_short_budget_answers_without_the_llm(install_router):
+    provider = ScriptedProvider(delay=5)
+    install_router(claude=provider)
+    
+    response = chat(0.1)
+    
+    assert response.status_code == 200
+    assert "souci technique" in response.json()["message"]
+    assert provider.calls == 0
+
+
+def test_llm_cut_off_by_the_deadline_degrades_to_the_fallback(install_router, monkeypatch):
+    import time
+    import src.agents.marie_support as marie_module
+    
+    monkeypatch.setattr(marie_module, "LLM_MIN_BUDGET_SECONDS", 0.01)
+    provider = ScriptedProvider(delay=5)
+    install_router(claude=provider)
+    
+    started = time.monotonic()
+    response = chat(0.1)
+    
+    assert time.monotonic() - started < 2
+    assert provider.calls == 1
+    assert response.status_code == 200
+    assert "souci technique" in response.json()["message"]
+
+
+def test_work_past_the_hard_stop_gets_a_504(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.main import app
+    from src.orchestrator import get_orchestrator
+    
+    monkeypatch.setattr(engine_module, "DEADLINE_GRACE_SECONDS", 0.01)
+    
+    with TestClient(app) as client:
+        get_orchestrator().registry.register("marie", StubbornAgent())
+        response = client.post("/agents/marie/chat", json={
+            "message": "Bonjour",
+            "session_id": "s-stuck",
+            "timeout_seconds": 0.05
+        })
+    
+    assert response.status_code == 504
+    assert "deadline" in response.json()["detail"]
+
+
+def test_non_positive_budget_is_rejected():
+    assert chat(-1).status_code == 422
+    assert chat(0).status_code == 422
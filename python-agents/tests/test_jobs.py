@@ -0,0 +1,212 @@
+"""
+Background jobs: submission checks, failure reporting and recovery
+"""
+
+import time
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.jobs import InMemoryJobBackend, InvalidJob, Job, JobManager, JobQueueFull, JobStatus
+from src.orchestrator.deadline import DeadlineExceeded
+
+
+async def wait_done(manager: JobManager, job_id: str, timeout: float = 2.0) -> Job:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await manager.get(job_id)
+        if job.done:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} not done after {timeout}s")
+
+
+def make_manager(executor=None, **kwargs) -> JobManager:
+    async def echo(agent_id, action, params):
+        return {"echo": params}
+    
+    manager = JobManager(InMemoryJobBackend(), executor=executor or echo, workers=2, **kwargs)
+    manager.validator = lambda agent_id, action: action in ("chat", "quote")
+    return manager
+
+
+async def test_job_runs_to_success():
+    manager = make_manager()
+    manager.start()
+    try:
+        job = await manager.submit("marie", "chat", {"message": "bonjour"})
+        job = await wait_done(manager, job.id)
+    finally:
+        await manager.stop()
+    
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"echo": {"message": "bonjour"}}
+    assert job.attempts == 1
+
+
+async def test_unknown_action_is_refused_at_submission():
+    manager = make_manager()
+    
+    with pytest.raises(InvalidJob):
+        await manager.submit("marie", "launch_rocket")
+    
+    assert await manager.backend.queued() == 0
+    assert (await manager.stats())["invalid"] == 1
+
+
+async def test_queue_full_is_refused():
+    manager = make_manager(max_queued=1)
+    await manager.submit("marie", "chat")
+    
+    with pytest.raises(JobQueueFull):
+        await manager.submit("marie", "chat")
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://93.184.216.34/hook",
+    "/relative/hook",
+    "http://127.0.0.1:8000/admin",
+    "http://localhost/hook",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.1/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+])
+async def test_callback_to_non_public_addresses_is_refused(url):
+    manager = make_manager()
+    
+    with pytest.raises(InvalidJob):
+        await manager.submit("marie", "chat", callback_url=url)
+
+
+async def test_callback_to_public_address_is_accepted():
+    manager = make_manager()
+    
+    job = await manager.submit("marie", "chat", callback_url="https://93.184.216.34/hook")
+    
+    assert job.callback_url == "https://93.184.216.34/hook"
+
+
+async def test_callback_allow_list():
+    manager = make_manager(callback_allowed_hosts=["*.partner.test", "hooks.example.org"])
+    
+    await manager.submit("marie", "chat", callback_url="https://crm.partner.test/hook")
+    await manager.submit("marie", "chat", callback_url="https://hooks.example.org/hook")
+    for url in ("https://93.184.216.34/hook", "https://partner.test.evil.com/hook", "https://evilpartner.test/x"):
+        with pytest.raises(InvalidJob):
+            await manager.submit("marie", "chat", callback_url=url)
+
+
+@pytest.mark.parametrize("error, expected, counter", [
+    (DeadlineExceeded("llm"), "Request deadline exceeded during llm", "deadlines_exceeded"),
+    (RuntimeError("boom"), "boom", "failed"),
+])
+async def test_failures_are_reported(error, expected, counter):
+    async def fail(agent_id, action, params):
+        raise error
+    
+    manager = make_manager(executor=fail)
+    manager.start()
+    try:
+        job = await wait_done(manager, (await manager.submit("marie", "chat")).id)
+    finally:
+        await manager.stop()
+    
+    assert job.status == JobStatus.FAILED
+    assert job.error == expected
+    assert (await manager.stats())[counter] == 1
+
+
+async def test_slow_job_times_out():
+    async def slow(agent_id, action, params):
+        await asyncio.sleep(10)
+    
+    manager = make_manager(executor=slow, job_timeout_seconds=0.05)
+    manager.start()
+    try:
+        job = await wait_done(manager, (await manager.submit("marie", "chat")).id)
+    finally:
+        await manager.stop()
+    
+    assert job.status == JobStatus.FAILED
+    assert job.error.startswith("Timed out")
+    assert (await manager.stats())["deadlines_exceeded"] == 0
+
+
+async def lost_job(backend: InMemoryJobBackend, attempts: int) -> Job:
+    """A job left RUNNING by a worker that died, its lease already expired"""
+    job = Job(agent_id="marie", action="chat", status=JobStatus.RUNNING, attempts=attempts)
+    await backend.save(job)
+    await backend.lease(job.id, time.time() - 1)
+    return job
+
+
+async def test_job_lost_with_its_worker_fails_once_out_of_attempts():
+    manager = make_manager(lease_seconds=0.1)
+    job = await lost_job(manager.backend, attempts=1)
+    
+    manager.start()
+    try:
+        job = await wait_done(manager, job.id)
+    finally:
+        await manager.stop()
+    
+    assert job.status == JobStatus.FAILED
+    assert "Worker stopped" in job.error
+    assert (await manager.stats())["lost"] == 1
+
+
+async def test_job_lost_with_its_worker_is_requeued():
+    manager = make_manager(lease_seconds=0.1, max_attempts=2)
+    job = await lost_job(manager.backend, attempts=1)
+    
+    manager.start()
+    try:
+        job = await wait_done(manager, job.id)
+    finally:
+        await manager.stop()
+    
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.attempts == 2
+    assert (await manager.stats())["recovered"] == 1
+
+
+async def test_heartbeat_keeps_a_running_job_leased():
+    release = asyncio.Event()
+    
+    async def long_action(agent_id, action, params):
+        await release.wait()
+        return "done"
+    
+    manager = make_manager(executor=long_action, lease_seconds=0.1)
+    manager.start()
+    try:
+        job = await manager.submit("marie", "chat")
+        await asyncio.sleep(0.4)  # Several lease periods
+        assert (await manager.get(job.id)).status == JobStatus.RUNNING
+        release.set()
+        job = await wait_done(manager, job.id)
+    finally:
+        await manager.stop()
+    
+    assert job.status == JobStatus.SUCCEEDED
+    assert (await manager.stats())["recovered"] == 0
+
+
+def test_invoke_endpoint_rejects_unknown_action_and_private_callback():
+    from src.main import app
+    
+    with TestClient(app) as client:
+        unknown = client.post("/agents/marie/invoke", json={"action": "launch_rocket"})
+        private = client.post(
+            "/agents/marie/invoke",
+            json={"action": "chat", "params": {"message": "bonjour"}, "callback_url": "http://127.0.0.1/hook"}
+        )
+        accepted = client.post("/agents/marie/invoke", json={"action": "chat", "params": {"message": "bonjour"}})
+    
+    assert unknown.status_code == 400
+    assert "launch_rocket" in unknown.json()["detail"]
+    assert private.status_code == 400
+    assert accepted.status_code == 202
@@ -0,0 +1,144 @@
+"""
+Self-hosted OpenAI-compatible provider and model routing
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.llm.models import SystemBlock, TokenUsage
+from src.llm.providers import OpenAICompatibleProvider
+
+from .conftest import ScriptedProvider
+
+
+MESSAGES = [{"role": "user", "content": "Prix d'un site vitrine ?"}]
+USAGE = {"prompt_tokens": 120, "completion_tokens": 8, "prompt_tokens_details": {"cached_tokens": 100}}
+
+
+def server(requests: list) -> httpx.MockTransport:
+    """OpenAI-compatible chat completions endpoint, plain and streamed"""
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append((request, body))
+        if not body.get("stream"):
+            return httpx.Response(200, json={
+                "model": body["model"],
+                "choices": [{"message": {"role": "assistant", "content": "299€ HT"}}],
+                "usage": USAGE
+            })
+        events = [{"choices": [{"delta": {"content": chunk}}]} for chunk in ("299€", " HT")]
+        events.append({"choices": [], "usage": USAGE})
+        lines = [f"data: {json.dumps(event)}\n\n" for event in events] + ["data: [DONE]\n\n"]
+        return httpx.Response(200, text="".join(lines), headers={"content-type": "text/event-stream"})
+    
+    return httpx.MockTransport(handler)
+
+
+def local_provider(requests: list, **kwargs) -> OpenAICompatibleProvider:
+    return OpenAICompatibleProvider(
+        base_url="http://llm.internal:8000/v1/",
+        default_model="llama-3.1-8b-instruct",
+        http_client=httpx.AsyncClient(transport=server(requests)),
+        **kwargs
+    )
+
+
+async def test_completion_sends_the_system_prompt_first():
+    requests = []
+    provider = local_provider(requests, api_key="secret")
+    system = [SystemBlock("Tu es MARIE.", cache=True), SystemBlock("Sois brève.")]
+    
+    response = await provider.complete(MESSAGES, system, "qwen2.5-7b", 0.3, 256)
+    
+    request, body = requests[0]
+    assert str(request.url) == "http://llm.internal:8000/v1/chat/completions"
+    assert request.headers["Authorization"] == "Bearer secret"
+    assert body["messages"] == [{"role": "system", "content": "Tu es MARIE.\nSois brève."}] + MESSAGES
+    assert (body["model"], body["temperature"], body["max_tokens"]) == ("qwen2.5-7b", 0.3, 256)
+    assert (response.text, response.provider) == ("299€ HT", "local")
+    assert response.usage == TokenUsage(input_tokens=20, output_tokens=8, cache_read_tokens=100)
+
+
+async def test_stream_yields_deltas_and_fills_usage():
+    requests = []
+    provider = local_provider(requests)
+    usage = TokenUsage()
+    
+    chunks = [chunk async for chunk in provider.stream(MESSAGES, "", "qwen2.5-7b", 0.3, 256, usage)]
+    
+    assert chunks == ["299€", " HT"]
+    assert usage.total_tokens == 128
+    body = requests[0][1]
+    assert body["stream_options"] == {"include_usage": True}
+    assert "Authorization" not in requests[0][0].headers
+
+
+async def test_server_errors_raise():
+    provider = OpenAICompatibleProvider(
+        base_url="http://llm.internal:8000/v1",
+        default_model="llama",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+    )
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider.complete(MESSAGES, "", "llama", 0.3, 256)
+
+
+def test_router_builds_the_local_provider_from_the_environment(monkeypatch):
+    from src.llm.router import LLMRouter
+    
+    monkeypatch.setenv("LOCAL_LLM_BASE_URL", "http://llm.internal:8000/v1")
+    monkeypatch.setenv("LOCAL_LLM_MODEL", "qwen2.5-7b")
+    
+    router = LLMRouter()
+    
+    assert list(router.providers) == ["local"]
+    assert router.providers["local"].default_model == "qwen2.5-7b"
+    assert router.preconnect_targets() == [
+        ("http://llm.internal:8000/v1", router.providers["local"].client)
+    ]
+
+
+def routed(router, model: str) -> list:
+    return [(name, provider_model) for name, _, provider_model in router._route(model)]
+
+
+def test_local_prefix_routes_to_the_local_server_first(install_router):
+    router = install_router(claude=ScriptedProvider(), local=ScriptedProvider())
+    
+    assert routed(router, "local/qwen2.5-7b") == [("local", "qwen2.5-7b"), ("claude", "scripted")]
+    assert routed(router, "local/") == [("local", "scripted"), ("claude", "scripted")]
+    assert routed(router, "claude-sonnet-4-20250514") == [
+        ("claude", "claude-sonnet-4-20250514"),
+        ("local", "scripted")
+    ]
+
+
+def test_custom_routes_from_the_environment(install_router, monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_ROUTES", "llama=local, mistral=local")
+    router = install_router(claude=ScriptedProvider(), local=ScriptedProvider())
+    
+    assert routed(router, "llama-3.1-8b")[0] == ("local", "llama-3.1-8b")
+    assert routed(router, "mistral-7b")[0] == ("local", "mistral-7b")
+
+
+def test_unrouted_model_uses_the_fallback_order(install_router):
+    router = install_router(claude=ScriptedProvider(), local=ScriptedProvider())
+    
+    assert routed(router, "gpt-4o") == [("claude", "scripted"), ("local", "scripted")]
+    # Routes to providers that aren't configured are ignored
+    assert routed(router, "gemini-2.0-flash")[0] == ("claude", "scripted")
+
+
+async def test_local_failure_falls_back_to_claude(install_router):
+    local = ScriptedProvider(chunks=["local"], fail_after=0)
+    claude = ScriptedProvider(chunks=["claude"])
+    router = install_router(claude=claude, local=local)
+    
+    response = await router.complete(MESSAGES, model="local/qwen2.5-7b")
+    
+    assert response.text == "claude"
+    assert (local.calls, claude.calls) == (1, 1)
@@ -0,0 +1,41 @@
+"""
+Memories and their Redis client
+"""
+
+from src.memory import LongTermMemory, get_redis_client
+
+
+class KeyValueRedis:
+    """Redis stand-in for plain keys, replying like a decoding client"""
+    
+    def __init__(self):
+        self.data = {}
+    
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def keys(self, pattern):
+        prefix = pattern.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+
+def test_redis_client_decodes_replies(monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    client = get_redis_client()
+    
+    assert client.connection_pool.connection_kwargs["decode_responses"] is True
+    assert get_redis_client() is client
+
+
+async def test_user_profile_reads_keys_back():
+    memory = LongTermMemory(KeyValueRedis())
+    await memory.store("u-1", "budget", 1500)
+    await memory.store("u-1", "secteur", "restaurant")
+    
+    profile = await memory.get_user_profile("u-1")
+    
+    assert profile["preferences"] == {"budget": 1500, "secteur": "restaurant"}
@@ -0,0 +1,87 @@
+"""
+Token usage metering and session budgets
+"""
+
+from src.llm.metering import BudgetStatus, UsageMeter, get_usage_meter
+from src.llm.models import TokenUsage
+
+from .conftest import FakeRedis
+
+
+def test_budgets_are_disabled_by_default():
+    meter = get_usage_meter()
+    meter.record("marie", "s1", TokenUsage(input_tokens=500_000, output_tokens=500_000))
+    
+    assert meter.session_soft_budget == 0
+    assert meter.session_hard_budget == 0
+    assert meter.budget_status("s1") == BudgetStatus.OK
+
+
+def test_budgets_are_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SESSION_TOKEN_SOFT_BUDGET", "100")
+    monkeypatch.setenv("SESSION_TOKEN_HARD_BUDGET", "200")
+    
+    meter = get_usage_meter()
+    
+    assert (meter.session_soft_budget, meter.session_hard_budget) == (100, 200)
+
+
+def test_session_degrades_then_exhausts():
+    meter = UsageMeter(session_soft_budget=100, session_hard_budget=200)
+    
+    meter.record("marie", "s1", TokenUsage(input_tokens=60, output_tokens=30))
+    assert meter.budget_status("s1") == BudgetStatus.OK
+    meter.record("marie", "s1", TokenUsage(input_tokens=10, output_tokens=10))
+    assert meter.budget_status("s1") == BudgetStatus.DEGRADED
+    meter.record("marie", "s1", TokenUsage(input_tokens=80, output_tokens=20))
+    assert meter.budget_status("s1") == BudgetStatus.EXHAUSTED
+    assert meter.budget_status("other") == BudgetStatus.OK
+    
+    stats = meter.stats()
+    assert stats["degraded_turns"] == 1
+    assert stats["exhausted_turns"] == 1
+
+
+def test_cache_reads_are_not_billed():
+    meter = UsageMeter(session_hard_budget=100)
+    
+    meter.record("marie", "s1", TokenUsage(input_tokens=10, cache_read_tokens=5000, output_tokens=10))
+    
+    assert meter.session_tokens("s1") == 20
+    assert meter.budget_status("s1") == BudgetStatus.OK
+
+
+def test_usage_is_accounted_per_agent():
+    meter = UsageMeter()
+    
+    meter.record("marie", "s1", TokenUsage(input_tokens=10, output_tokens=5), latency_ms=120)
+    meter.record("marie", None, TokenUsage(input_tokens=20, output_tokens=5), latency_ms=80)
+    
+    marie = meter.stats()["agents"]["marie"]
+    assert marie["requests"] == 2
+    assert marie["input_tokens"] == 30
+    assert marie["latency_ms"] == 200
+    assert meter.stats()["sessions_tracked"] == 1
+
+
+async def test_usage_is_flushed_to_redis():
+    redis = FakeRedis()
+    meter = UsageMeter(redis_client=redis)
+    
+    meter.record("marie", "s1", TokenUsage(input_tokens=10, output_tokens=5))
+    assert meter.stats()["pending_keys"] == 2
+    await meter.flush()
+    
+    assert meter.stats()["pending_keys"] == 0
+    day = meter.stats()["day"]
+    assert redis.data[f"webshop:usage:{day}:session:s1"]["input_tokens"] == "10"
+
+
+def test_without_redis_nothing_is_kept_for_flushing():
+    meter = UsageMeter()
+    
+    for index in range(100):
+        meter.record("marie", f"s{index}", TokenUsage(input_tokens=10, output_tokens=5))
+    
+    assert meter.stats()["pending_keys"] == 0
+    assert meter.stats()["agents"]["marie"]["requests"] == 100
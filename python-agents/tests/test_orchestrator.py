@@ -0,0 +1,258 @@
+"""
+Orchestrator: dispatch modes, fan-out and agent state
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.agents.marie_support import MarieAgentV2
+from src.memory import get_conversation_memory
+from src.orchestrator import AgentState, Orchestrator
+
+from .conftest import ScriptedProvider
+
+
+QUESTION = "Je voudrais un site vitrine pour mon restaurant, vous proposez quoi ?"
+
+
+class ContextAgent:
+    """Agent answering with the topic it saw, and recording the new one in the context"""
+    
+    name, role = "Stub", "Test"
+    
+    async def process(self, state):
+        previous = state.context.get("topic")
+        # Replaces the mapping rather than mutating it: only what the
+        # node returns reaches the graph's channels
+        state.context = {**state.context, "topic": state.user_input}
+        return f"avant: {previous}"
+    
+    def is_low_cost(self, message):
+        return False
+
+
+def orchestrator_with_saves(mode: str, saved: list) -> Orchestrator:
+    orchestrator = Orchestrator(execution_mode=mode)
+    orchestrator.registry.register("marie", ContextAgent())
+    
+    async def save(state):
+        saved.append(dict(state.context))
+    
+    orchestrator._save_session = save
+    return orchestrator
+
+
+@pytest.mark.parametrize("mode", ["direct", "graph"])
+async def test_context_written_by_the_agent_is_checkpointed(mode):
+    saved = []
+    orchestrator = orchestrator_with_saves(mode, saved)
+    
+    result = await orchestrator.invoke("marie", "vitrine", "s-1", context={"language": "fr"})
+    
+    assert result["success"] is True
+    assert result["message"] == "avant: None"
+    assert saved == [{"language": "fr", "topic": "vitrine"}]
+    assert orchestrator.stats()["dispatches"][mode] == 1
+
+
+@pytest.mark.parametrize("mode", ["direct", "graph"])
+async def test_modes_answer_alike(mode):
+    orchestrator = orchestrator_with_saves(mode, [])
+    
+    result = await orchestrator.invoke("unknown", "bonjour", "s-2")
+    
+    # Unknown agents are routed to MARIE in both modes
+    assert result == {"success": True, "message": "avant: None", "agent": "UNKNOWN", "session_id": "s-2"}
+
+
+class RecordingProvider(ScriptedProvider):
+    """Scripted provider keeping the messages of every call"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.seen = []
+    
+    async def complete(self, messages, *args, **kwargs):
+        self.seen.append(messages)
+        return await super().complete(messages, *args, **kwargs)
+
+
+async def test_fanout_records_the_turn_once(install_router):
+    provider = RecordingProvider(chunks=["Réponse"])
+    install_router(claude=provider)
+    orchestrator = Orchestrator()
+    orchestrator.registry.register("marie", MarieAgentV2())
+    orchestrator.registry.register("hugo", MarieAgentV2())
+    
+    result = await orchestrator.invoke_fanout(["marie", "hugo"], QUESTION, "s-fan")
+    
+    assert [branch["status"] for branch in result["branches"]] == ["ok", "ok"]
+    history = get_conversation_memory().get_messages("s-fan")
+    assert [(m["role"], m["content"]) for m in history] == [
+        ("user", QUESTION),
+        ("assistant", result["message"])
+    ]
+    # The branches still saw the user message, once (their identical
+    # calls may be coalesced into one)
+    assert provider.seen
+    assert all(messages == [{"role": "user", "content": QUESTION}] for messages in provider.seen)
+
+
+async def test_fanout_masks_pii_in_the_recorded_message(install_router):
+    install_router(claude=ScriptedProvider(chunks=["Réponse"]))
+    orchestrator = Orchestrator()
+    orchestrator.registry.register("marie", MarieAgentV2())
+    
+    await orchestrator.invoke_fanout(["marie"], "Écrivez-moi à jean@example.com pour le devis", "s-pii")
+    
+    history = get_conversation_memory().get_messages("s-pii")
+    assert "jean@example.com" not in history[0]["content"]
+    assert len(history) == 2
+
+
+def test_state_is_slotted():
+    state = AgentState(user_input="Bonjour")
+    
+    assert not hasattr(state, "__dict__")
+    with pytest.raises(AttributeError):
+        state.extra = "oops"
+
+
+def test_fork_reads_through_and_keeps_its_writes():
+    parent = AgentState(
+        messages=({"role": "user", "content": "Bonjour"},),
+        session_id="s-1",
+        context={"language": "fr"},
+        metadata={"source": "web"}
+    )
+    
+    branch = parent.fork(current_agent="hugo")
+    branch.context["topic"] = "logo"
+    branch.metadata["source"] = "branch"
+    
+    assert branch.messages is parent.messages
+    assert (branch.session_id, branch.current_agent) == ("s-1", "hugo")
+    assert dict(branch.context) == {"language": "fr", "topic": "logo"}
+    assert parent.context == {"language": "fr"}
+    assert parent.metadata == {"source": "web"}
+    # Nested forks layer again instead of copying
+    leaf = branch.fork()
+    leaf.context["topic"] = "vitrine"
+    assert (branch.context["topic"], leaf.context["topic"]) == ("logo", "vitrine")
+    assert len(leaf.context.maps) == 3
+
+
+def test_branches_read_history_without_recording_it():
+    parent = AgentState(session_id="s-1", current_agent="marie")
+    
+    branch = Orchestrator._branch_state(parent, "hugo")
+    
+    assert parent.record_history is True
+    assert (branch.current_agent, branch.record_history) == ("hugo", False)
+
+
+class BranchAgent:
+    """Fan-out branch answering after a delay, failing, or asking for escalation"""
+    
+    role = "Test"
+    
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False, escalate: bool = False):
+        self.name, self.delay, self.fail, self.escalate = name, delay, fail, escalate
+    
+    async def process(self, state):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        state.should_escalate = self.escalate
+        state.context["written_by"] = self.name
+        return f"{self.name}: {state.user_input}"
+    
+    def is_low_cost(self, message):
+        return False
+
+
+def fanout_orchestrator(*agents: BranchAgent) -> Orchestrator:
+    orchestrator = Orchestrator()
+    for agent in agents:
+        orchestrator.registry.register(agent.name.lower(), agent)
+    return orchestrator
+
+
+async def test_fanout_runs_branches_concurrently_and_merges_in_order():
+    orchestrator = fanout_orchestrator(BranchAgent("Hugo", delay=0.05), BranchAgent("Lucas", delay=0.05))
+    
+    started = time.perf_counter()
+    result = await orchestrator.invoke_fanout(["lucas", "hugo", "LUCAS"], "logo", "s-1", context={"language": "fr"})
+    elapsed = time.perf_counter() - started
+    
+    assert elapsed < 0.09
+    assert [branch["agent"] for branch in result["branches"]] == ["LUCAS", "HUGO"]
+    assert result["message"] == "**Lucas**\nLucas: logo\n\n**Hugo**\nHugo: logo"
+    assert result["should_escalate"] is False
+
+
+async def test_slow_failing_and_unknown_branches_are_reported():
+    orchestrator = fanout_orchestrator(
+        BranchAgent("Hugo"),
+        BranchAgent("Lucas", delay=5),
+        BranchAgent("Emma", fail=True, escalate=True)
+    )
+    
+    result = await orchestrator.invoke_fanout(["hugo", "lucas", "emma", "noah"], "logo", "s-1", branch_timeout=0.05)
+    
+    statuses = {branch["agent"]: branch["status"] for branch in result["branches"]}
+    assert statuses == {"HUGO": "ok", "LUCAS": "timeout", "EMMA": "error", "NOAH": "unavailable"}
+    # A single answer is passed through as is
+    assert result["message"] == "Hugo: logo"
+    stats = orchestrator.stats()["fanout"]
+    assert (stats["timeouts"], stats["errors"]) == (1, 1)
+
+
+async def test_escalation_in_any_branch_escalates_the_turn():
+    orchestrator = fanout_orchestrator(BranchAgent("Hugo"), BranchAgent("Lucas", escalate=True))
+    
+    result = await orchestrator.invoke_fanout(["hugo", "lucas"], "remboursement", "s-1")
+    
+    assert result["should_escalate"] is True
+
+
+async def test_fanout_without_answers_apologizes_and_records_nothing():
+    orchestrator = fanout_orchestrator(BranchAgent("Hugo", fail=True))
+    
+    result = await orchestrator.invoke_fanout(["hugo"], "logo", "s-empty")
+    
+    assert result["success"] is False
+    assert result["message"].startswith("Désolée")
+    assert [m["role"] for m in get_conversation_memory().get_messages("s-empty")] == ["user"]
+
+
+async def test_branch_writes_stay_in_their_branch():
+    saved = []
+    orchestrator = fanout_orchestrator(BranchAgent("Hugo"), BranchAgent("Lucas"))
+    
+    async def save(state):
+        saved.append(dict(state.context))
+    
+    orchestrator._save_session = save
+    
+    await orchestrator.invoke_fanout(["hugo", "lucas"], "logo", "s-1", context={"language": "fr"})
+    
+    assert saved == [{"language": "fr"}]
+
+
+def test_fanout_endpoint():
+    from fastapi.testclient import TestClient
+    from src.main import app
+    from src.orchestrator import get_orchestrator
+    
+    with TestClient(app) as client:
+        get_orchestrator().registry.register("hugo", BranchAgent("Hugo"))
+        answered = client.post("/chat/fanout", json={"message": "logo", "session_id": "s-1", "agents": ["hugo"]})
+        empty = client.post("/chat/fanout", json={"message": "logo", "session_id": "s-1", "agents": []})
+    
+    assert answered.status_code == 200
+    assert answered.json()["message"] == "Hugo: logo"
+    assert answered.json()["branches"][0]["status"] == "ok"
+    assert empty.status_code == 400
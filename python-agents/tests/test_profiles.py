@@ -0,0 +1,96 @@
+"""
+Per-intent generation profiles and their telemetry
+"""
+
+from src.agents.marie_support import MarieAgentV2
+from src.agents.profiles import Histogram, build_marie_profiles
+from src.analysis import Intent, Sentiment
+from src.orchestrator import Orchestrator
+
+from .conftest import ScriptedProvider
+
+
+def profiles():
+    return build_marie_profiles("claude-sonnet-4-20250514", 1024, 0.7)
+
+
+def test_histogram_percentiles_come_from_bucket_bounds():
+    histogram = Histogram([100, 500, 1000])
+    for value in (50, 80, 300, 400, 450, 2000):
+        histogram.observe(value)
+    
+    assert histogram.percentile(50) == 500
+    assert histogram.percentile(95) is None  # +Inf bucket
+    stats = histogram.stats()
+    assert stats["buckets"] == {"le_100": 2, "le_500": 3, "le_1000": 0, "le_inf": 1}
+    assert Histogram([100]).percentile(50) is None
+
+
+def test_short_factual_intents_use_the_fast_tier(monkeypatch):
+    monkeypatch.setenv("MARIE_FAST_MODEL", "claude-3-5-haiku-test")
+    table = profiles()
+    
+    price = table.select(Intent.ASKING_PRICE, Sentiment.NEUTRAL)
+    hello = table.select(Intent.GREETING, Sentiment.POSITIVE)
+    
+    assert (price.name, price.model, price.max_tokens) == ("factual", "claude-3-5-haiku-test", 300)
+    assert (hello.name, hello.model) == ("smalltalk", "claude-3-5-haiku-test")
+
+
+def test_complaints_and_frustration_get_the_main_model():
+    table = profiles()
+    
+    complaint = table.select(Intent.COMPLAINING, Sentiment.NEGATIVE)
+    frustrated_price = table.select(Intent.ASKING_PRICE, Sentiment.FRUSTRATED)
+    
+    assert complaint.name == frustrated_price.name == "careful"
+    assert complaint.model == "claude-sonnet-4-20250514"
+    assert complaint.max_tokens == 1024
+
+
+def test_unmapped_intents_and_disabled_table_use_the_agent_config(monkeypatch):
+    table = profiles()
+    monkeypatch.setenv("MARIE_GENERATION_PROFILES", "false")
+    disabled = profiles()
+    
+    assert table.select(Intent.UNKNOWN, Sentiment.NEUTRAL).name == "default"
+    assert disabled.select(Intent.ASKING_PRICE, Sentiment.NEUTRAL).name == "default"
+    assert disabled.stats()["enabled"] is False
+
+
+def test_generations_are_recorded_per_profile():
+    table = profiles()
+    factual = table.profiles["factual"]
+    
+    table.observe(factual, 420.0, 90)
+    table.observe(factual, 1800.0, 200)
+    
+    stats = table.stats()["profiles"]["factual"]
+    assert stats["latency_ms"]["count"] == 2
+    assert stats["latency_ms"]["p50"] == 500
+    assert stats["output_tokens"]["p95"] == 256
+    assert table.stats()["profiles"]["default"]["latency_ms"]["count"] == 0
+
+
+class ModelRecordingProvider(ScriptedProvider):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls_by_model = []
+    
+    async def complete(self, messages, system_prompt, model, temperature, max_tokens):
+        self.calls_by_model.append((model, max_tokens, temperature))
+        return await super().complete(messages, system_prompt, model, temperature, max_tokens)
+
+
+async def test_marie_sends_a_price_question_with_the_factual_profile(install_router, monkeypatch):
+    monkeypatch.setenv("MARIE_FAST_MODEL", "claude-3-5-haiku-test")
+    provider = ModelRecordingProvider(chunks=["Un site vitrine coûte 299€"])
+    install_router(claude=provider)
+    marie = MarieAgentV2()
+    orchestrator = Orchestrator()
+    orchestrator.registry.register("marie", marie)
+    
+    await orchestrator.invoke("marie", "Quel est le prix d'un site vitrine ?", "s-price")
+    
+    assert provider.calls_by_model == [("claude-3-5-haiku-test", 300, 0.3)]
+    assert marie.profiles.stats()["profiles"]["factual"]["latency_ms"]["count"] == 1
@@ -0,0 +1,97 @@
+"""
+Provider prompt caching: breakpoints on the static system prompt prefix
+"""
+
+from types import SimpleNamespace
+
+from src.agents.marie_support import MARIE_SYSTEM_PROMPT_V2, MarieAgentV2
+from src.analysis.sentiment import Sentiment
+from src.llm.models import SystemBlock, TokenUsage, system_prompt_payload, system_prompt_text
+from src.llm.providers import ClaudeProvider
+
+from .conftest import ScriptedProvider
+
+
+BLOCKS = [
+    SystemBlock("Tu es MARIE.", cache=True),
+    SystemBlock("Tarifs: vitrine 299€", cache=True),
+    SystemBlock(""),
+    SystemBlock("Le client est content!")
+]
+
+
+def test_breakpoint_blocks_get_cache_control():
+    assert system_prompt_payload(BLOCKS) == [
+        {"type": "text", "text": "Tu es MARIE.", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "Tarifs: vitrine 299€", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "Le client est content!"}
+    ]
+    assert system_prompt_payload("Tu es MARIE.") == "Tu es MARIE."
+
+
+def test_other_providers_get_the_flattened_prompt():
+    assert system_prompt_text(BLOCKS) == "Tu es MARIE.\nTarifs: vitrine 299€\nLe client est content!"
+
+
+async def test_claude_sends_the_blocks_and_reports_cache_reads():
+    sent = {}
+    
+    async def create(**kwargs):
+        sent.update(kwargs)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="Bonjour")],
+            usage=SimpleNamespace(
+                input_tokens=20,
+                output_tokens=5,
+                cache_read_input_tokens=900,
+                cache_creation_input_tokens=0
+            )
+        )
+    
+    provider = ClaudeProvider(api_key="test")
+    provider.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    
+    response = await provider.complete([{"role": "user", "content": "Bonjour"}], BLOCKS, "claude-test", 0.3, 256)
+    
+    assert sent["system"] == system_prompt_payload(BLOCKS)
+    assert response.usage.cache_read_tokens == 900
+
+
+def analysis(sentiment: Sentiment) -> SimpleNamespace:
+    return SimpleNamespace(sentiment=sentiment)
+
+
+def test_marie_prompt_puts_the_static_prefix_first():
+    marie = MarieAgentV2()
+    
+    calm = marie._build_enhanced_prompt(analysis(Sentiment.NEUTRAL), "Vitrine: 299€", "")
+    upset = marie._build_enhanced_prompt(analysis(Sentiment.FRUSTRATED), "Vitrine: 299€", "Total: 299€")
+    
+    assert calm[0] == SystemBlock(MARIE_SYSTEM_PROMPT_V2, cache=True)
+    # Persona and knowledge are shared, cacheable prefixes; per-turn parts come last, uncached
+    assert calm[:2] == upset[:2]
+    assert [block.cache for block in upset] == [True, True, False]
+    assert "DONNÉES CALCULÉES" in upset[-1].text
+
+
+def test_marie_prompt_without_knowledge_keeps_one_breakpoint():
+    marie = MarieAgentV2()
+    
+    blocks = marie._build_enhanced_prompt(analysis(Sentiment.NEUTRAL), "", "")
+    
+    assert [block.cache for block in blocks] == [True, False]
+
+
+async def test_router_reports_prompt_cache_savings(install_router):
+    warm = TokenUsage(input_tokens=100, output_tokens=10, cache_creation_tokens=900)
+    hit = TokenUsage(input_tokens=100, output_tokens=10, cache_read_tokens=900)
+    router = install_router(claude=ScriptedProvider(usage=warm))
+    messages = [{"role": "user", "content": "Bonjour"}]
+    
+    await router.complete(messages, BLOCKS)
+    router.providers["claude"].usage = hit
+    await router.complete(messages, BLOCKS)
+    
+    stats = router.stats()["prompt_cache"]
+    assert (stats["requests"], stats["requests_with_cache_hit"]) == (2, 1)
+    assert stats["cached_input_ratio"] == 0.45
@@ -0,0 +1,120 @@
+"""
+Provider usage reporting and the fake record/replay provider
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm.fake import Cassette, FakeProvider, FakeProviderError
+from src.llm.models import TokenUsage
+from src.llm.providers import ClaudeProvider, GeminiProvider, OpenAICompatibleProvider
+
+from .conftest import ScriptedProvider
+
+
+MESSAGES = [{"role": "user", "content": "Combien coûte un site vitrine ?"}]
+
+
+def test_gemini_cached_tokens_are_counted_once():
+    usage = GeminiProvider._usage(SimpleNamespace(
+        prompt_token_count=1000,
+        cached_content_token_count=800,
+        candidates_token_count=50
+    ))
+    
+    assert usage == TokenUsage(input_tokens=200, output_tokens=50, cache_read_tokens=800)
+    assert usage.total_tokens == 1050
+
+
+def test_gemini_without_cache():
+    usage = GeminiProvider._usage(SimpleNamespace(prompt_token_count=300, candidates_token_count=20))
+    
+    assert usage == TokenUsage(input_tokens=300, output_tokens=20)
+
+
+def test_openai_cached_tokens_are_counted_once():
+    usage = OpenAICompatibleProvider._usage({
+        "prompt_tokens": 1000,
+        "completion_tokens": 50,
+        "prompt_tokens_details": {"cached_tokens": 800}
+    })
+    
+    assert usage.total_tokens == 1050
+    assert usage.cache_read_tokens == 800
+
+
+def test_claude_usage_is_already_split():
+    usage = ClaudeProvider._usage(SimpleNamespace(
+        input_tokens=200,
+        output_tokens=50,
+        cache_read_input_tokens=800,
+        cache_creation_input_tokens=0
+    ))
+    
+    assert usage.total_tokens == 1050
+
+
+def test_router_rate_limits_exclude_cache_reads(install_router):
+    router = install_router(claude=ScriptedProvider())
+    
+    tokens = router._rate_limited_tokens(TokenUsage(input_tokens=200, output_tokens=50, cache_read_tokens=800))
+    
+    assert tokens == 250
+
+
+async def test_synthesized_answers_are_deterministic():
+    first = await FakeProvider(seed=1).complete(MESSAGES, "", "fake", 0.7, 100)
+    second = await FakeProvider(seed=1).complete(MESSAGES, "", "fake", 0.7, 100)
+    
+    assert first.text == second.text
+    assert first.usage.output_tokens > 0
+
+
+async def test_stream_matches_completion():
+    usage = TokenUsage()
+    chunks = [chunk async for chunk in FakeProvider(seed=1).stream(MESSAGES, "", "fake", 0.7, 100, usage)]
+    completion = await FakeProvider(seed=1).complete(MESSAGES, "", "fake", 0.7, 100)
+    
+    assert "".join(chunks) == completion.text
+    assert usage == completion.usage
+
+
+async def test_record_then_replay(tmp_path):
+    cassette_path = str(tmp_path / "cassette.jsonl")
+    upstream = ScriptedProvider(chunks=["Un site vitrine", " coûte 299€."])
+    recorder = FakeProvider(mode="record", cassette=Cassette(cassette_path), upstream=upstream)
+    
+    recorded = await recorder.complete(MESSAGES, "", "fake", 0.7, 100)
+    replayed = await FakeProvider(mode="replay", cassette=Cassette(cassette_path)).complete(
+        MESSAGES, "", "fake", 0.7, 100
+    )
+    
+    assert replayed.text == recorded.text == "Un site vitrine coûte 299€."
+    assert upstream.calls == 1
+
+
+async def test_record_mode_sends_upstream_the_model_real_routing_would(tmp_path, monkeypatch):
+    from src.llm.router import LLMRouter
+    
+    monkeypatch.setenv("LOCAL_LLM_BASE_URL", "http://llm.internal:8000/v1")
+    monkeypatch.setenv("LOCAL_LLM_MODEL", "qwen2.5-7b")
+    monkeypatch.setenv("LLM_FAKE_MODE", "record")
+    monkeypatch.setenv("LLM_FAKE_CASSETTE", str(tmp_path / "cassette.jsonl"))
+    router = LLMRouter()
+    router.providers["fake"].upstream = ScriptedProvider()
+    
+    routed = await router.complete(MESSAGES, model="local/llama-3.1-70b")
+    fallback = await router.complete(MESSAGES, model="claude-sonnet-4-20250514")
+    
+    # The cassette is keyed on the requested model, upstream gets the routed one
+    assert [model for _, _, model in router._route("claude-sonnet-4-20250514")] == ["claude-sonnet-4-20250514"]
+    assert (routed.model, fallback.model) == ("llama-3.1-70b", "qwen2.5-7b")
+
+
+async def test_injected_errors():
+    provider = FakeProvider(error_rate=1.0)
+    
+    with pytest.raises(FakeProviderError):
+        await provider.complete(MESSAGES, "", "fake", 0.7, 100)
+    assert provider.stats()["injected_errors"] == 1
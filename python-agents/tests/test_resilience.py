@@ -0,0 +1,175 @@
+"""
+Circuit breakers and hedged requests across providers
+"""
+
+import asyncio
+
+import pytest
+
+from src.llm.resilience import BreakerState, CircuitBreaker
+
+from .conftest import ScriptedProvider
+
+
+MESSAGES = [{"role": "user", "content": "Bonjour"}]
+
+
+def provider(answer: str, **kwargs) -> ScriptedProvider:
+    scripted = ScriptedProvider(chunks=[answer], **kwargs)
+    scripted.name = answer
+    return scripted
+
+
+def tripped(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker("claude", min_calls=2, **kwargs)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_on_error_rate_and_rejects_calls():
+    breaker = CircuitBreaker("claude", min_calls=4, error_rate_threshold=0.5)
+    
+    breaker.record_success(100)
+    breaker.record_failure()
+    breaker.record_success(100)
+    assert breaker.state == BreakerState.CLOSED
+    breaker.record_failure()
+    
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker("claude", min_calls=2, slow_call_ms=1000)
+    
+    breaker.record_success(1500)
+    breaker.record_success(2000)
+    
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_half_open_lets_one_probe_through_then_closes():
+    breaker = tripped(open_seconds=0)
+    
+    assert breaker.allow()
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success(100)
+    
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.allow()
+    assert breaker.stats()["window_calls"] == 1
+
+
+def test_failed_probe_opens_again():
+    breaker = tripped(open_seconds=0)
+    
+    assert breaker.allow()
+    breaker.record_failure()
+    
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.stats()["opened"] == 2
+
+
+def test_cancelled_probe_frees_the_slot():
+    breaker = tripped(open_seconds=0)
+    
+    assert breaker.allow()
+    breaker.record_cancelled()
+    
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_cooldown_keeps_the_circuit_open():
+    breaker = tripped(open_seconds=60)
+    
+    assert not breaker.allow()
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_latency_percentile_needs_enough_samples():
+    breaker = CircuitBreaker("claude", min_calls=100)
+    for latency in range(1, 21):
+        breaker.record_success(latency * 10)
+    
+    assert breaker.latency_percentile(95) == 190
+    assert breaker.latency_percentile(95, min_samples=50) is None
+
+
+async def test_router_falls_back_then_skips_the_open_circuit(install_router):
+    claude = provider("claude", fail_after=0)
+    gemini = provider("gemini")
+    router = install_router(claude=claude, gemini=gemini)
+    router.breakers["claude"] = CircuitBreaker("claude", min_calls=2, open_seconds=60)
+    
+    answers = [(await router.complete(MESSAGES, model="claude")).text for _ in range(3)]
+    
+    assert answers == ["gemini"] * 3
+    assert claude.calls == 2
+    assert router.stats()["breakers"]["claude"]["state"] == "open"
+
+
+async def test_router_fails_when_every_circuit_is_open(install_router):
+    router = install_router(claude=provider("claude"))
+    router.breakers["claude"] = tripped(open_seconds=60)
+    
+    with pytest.raises(RuntimeError, match="No LLM provider available"):
+        await router.complete(MESSAGES, model="claude")
+
+
+async def test_slow_primary_is_hedged_and_cancelled(install_router):
+    claude = provider("claude", delay=5)
+    gemini = provider("gemini")
+    router = install_router(claude=claude, gemini=gemini)
+    router.hedging_enabled, router.hedge_default_delay_ms = True, 20
+    
+    response = await asyncio.wait_for(router.complete(MESSAGES, model="claude"), timeout=1)
+    await asyncio.sleep(0)
+    
+    assert response.text == "gemini"
+    hedging = router.stats()["hedging"]
+    assert (hedging["fired"], hedging["hedge_wins"], hedging["primary_wins"]) == (1, 1, 0)
+    # The loser is cancelled, which is not held against its circuit
+    assert router.admission["claude"].stats()["in_flight"] == 0
+    assert router.stats()["breakers"]["claude"]["failures"] == 0
+
+
+async def test_fast_primary_is_not_hedged(install_router):
+    claude = provider("claude")
+    gemini = provider("gemini")
+    router = install_router(claude=claude, gemini=gemini)
+    router.hedging_enabled, router.hedge_default_delay_ms = True, 1000
+    
+    response = await router.complete(MESSAGES, model="claude")
+    
+    assert response.text == "claude"
+    assert gemini.calls == 0
+    assert router.stats()["hedging"]["fired"] == 0
+
+
+async def test_failed_primary_falls_back_before_the_hedge_delay(install_router):
+    claude = provider("claude", fail_after=0)
+    gemini = provider("gemini")
+    router = install_router(claude=claude, gemini=gemini)
+    router.hedging_enabled, router.hedge_default_delay_ms = True, 1000
+    
+    response = await asyncio.wait_for(router.complete(MESSAGES, model="claude"), timeout=0.5)
+    
+    assert response.text == "gemini"
+    assert router.stats()["hedging"]["fired"] == 0
+
+
+async def test_remaining_providers_are_tried_after_both_hedged_legs_fail(install_router):
+    claude = provider("claude", fail_after=0)
+    gemini = provider("gemini", fail_after=0)
+    local = provider("local")
+    router = install_router(claude=claude, gemini=gemini, local=local)
+    router.hedging_enabled, router.hedge_default_delay_ms = True, 1000
+    
+    response = await asyncio.wait_for(router.complete(MESSAGES, model="claude"), timeout=0.5)
+    
+    assert response.text == "local"
+    assert (claude.calls, gemini.calls, local.calls) == (1, 1, 1)
@@ -0,0 +1,140 @@
+"""
+LLM response cache: local LRU tier, shared Redis tier, router integration
+"""
+
+from src.llm.cache import ResponseCache
+
+from .conftest import FakeRedis, ScriptedProvider
+
+
+MESSAGES = [{"role": "user", "content": "Prix d'un site vitrine ?"}]
+
+
+def key(cache: ResponseCache, namespace: str = "marie:v1", content: str = "Prix ?") -> str:
+    return cache.make_key(namespace, "claude", "system", [{"role": "user", "content": content}], 0.2, 512)
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+    
+    async def setex(self, key, ttl, value):
+        raise ConnectionError("redis down")
+
+
+def test_keys_cover_the_request_and_the_namespace():
+    cache = ResponseCache()
+    
+    assert key(cache) == key(cache)
+    assert key(cache) != key(cache, content="Prix d'un logo ?")
+    assert key(cache) != key(cache, namespace="marie:v2")
+    assert key(cache).startswith("marie:v1:")
+
+
+async def test_local_hit_then_miss_after_ttl():
+    cache = ResponseCache(ttl_seconds=60)
+    expired = ResponseCache(ttl_seconds=0)
+    
+    await cache.set(key(cache), "299€")
+    await expired.set(key(expired), "299€")
+    
+    assert await cache.get(key(cache)) == "299€"
+    assert await expired.get(key(expired)) is None
+    assert cache.stats()["hits_local"] == 1
+    assert (expired.stats()["expirations"], expired.stats()["misses"]) == (1, 1)
+
+
+async def test_local_tier_evicts_the_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    first, second, third = (key(cache, content=c) for c in ("a", "b", "c"))
+    await cache.set(first, "A")
+    await cache.set(second, "B")
+    
+    await cache.get(first)
+    await cache.set(third, "C")
+    
+    assert await cache.get(second) is None
+    assert await cache.get(first) == "A"
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_redis_tier_is_shared_between_workers():
+    redis = FakeRedis()
+    writer, reader = ResponseCache(redis_client=redis), ResponseCache(redis_client=redis)
+    
+    await writer.set(key(writer), "299€")
+    
+    assert await reader.get(key(reader)) == "299€"
+    # Promoted to the reader's local tier
+    assert await reader.get(key(reader)) == "299€"
+    stats = reader.stats()
+    assert (stats["hits_redis"], stats["hits_local"]) == (1, 1)
+
+
+async def test_redis_errors_degrade_to_the_local_tier():
+    cache = ResponseCache(redis_client=BrokenRedis())
+    
+    await cache.set(key(cache), "299€")
+    
+    assert await cache.get(key(cache)) == "299€"
+    assert await cache.get(key(cache, content="autre")) is None
+    assert cache.stats()["redis_errors"] == 2
+
+
+async def test_invalidate_drops_one_namespace_in_both_tiers():
+    redis = FakeRedis()
+    cache = ResponseCache(redis_client=redis)
+    await cache.set(key(cache, namespace="marie:v1"), "old")
+    await cache.set(key(cache, namespace="hugo:v1"), "kept")
+    
+    removed = await cache.invalidate(namespace="marie:v1")
+    
+    assert removed == 1
+    assert await ResponseCache(redis_client=redis).get(key(cache, namespace="marie:v1")) is None
+    assert await cache.get(key(cache, namespace="hugo:v1")) == "kept"
+
+
+def test_hot_temperatures_are_not_cached():
+    cache = ResponseCache(max_temperature=0.5)
+    
+    assert cache.accepts(0.2)
+    assert not cache.accepts(0.9)
+    assert cache.stats()["bypassed"] == 1
+
+
+async def test_router_serves_identical_requests_from_the_cache(install_router):
+    provider = ScriptedProvider(chunks=["299€"])
+    router = install_router(claude=provider)
+    
+    first = await router.complete(MESSAGES, cache=True, temperature=0.2)
+    second = await router.complete(MESSAGES, cache=True, temperature=0.2)
+    other_namespace = await router.complete(MESSAGES, cache=True, cache_namespace="kb:v2", temperature=0.2)
+    
+    assert (first.provider, second.provider, other_namespace.provider) == ("scripted", "cache", "scripted")
+    assert second.text == "299€"
+    assert provider.calls == 2
+
+
+async def test_router_skips_the_cache_unless_asked_or_too_hot(install_router):
+    provider = ScriptedProvider(chunks=["299€"])
+    router = install_router(claude=provider)
+    
+    await router.complete(MESSAGES, temperature=0.2)
+    await router.complete(MESSAGES, temperature=0.2)
+    await router.complete(MESSAGES, cache=True, temperature=1.0)
+    await router.complete(MESSAGES, cache=True, temperature=1.0)
+    
+    assert provider.calls == 4
+    assert router.cache.stats()["stores"] == 0
+
+
+async def test_streamed_answer_is_cached_once_complete(install_router):
+    provider = ScriptedProvider(chunks=["Un site ", "vitrine"])
+    router = install_router(claude=provider)
+    
+    streamed = [chunk async for chunk in router.chat_stream(MESSAGES, cache=True, temperature=0.2)]
+    replayed = [chunk async for chunk in router.chat_stream(MESSAGES, cache=True, temperature=0.2)]
+    
+    assert streamed == ["Un site ", "vitrine"]
+    assert replayed == ["Un site vitrine"]
+    assert provider.calls == 1
@@ -0,0 +1,151 @@
+"""
+Per-session turn ordering with cross-session concurrency
+"""
+
+import asyncio
+
+import pytest
+
+from src.orchestrator import Orchestrator
+from src.orchestrator.scheduler import SessionBusy, SessionScheduler, create_session_scheduler
+
+
+async def run_turn(scheduler: SessionScheduler, session_id: str, name: str, log: list, delay: float = 0.01):
+    async with scheduler.turn(session_id):
+        log.append(f"{name}:start")
+        await asyncio.sleep(delay)
+        log.append(f"{name}:end")
+
+
+async def test_turns_of_a_session_run_one_at_a_time_in_order():
+    scheduler = SessionScheduler()
+    log = []
+    
+    await asyncio.gather(*[run_turn(scheduler, "s-1", name, log) for name in ("a", "b", "c")])
+    
+    assert log == ["a:start", "a:end", "b:start", "b:end", "c:start", "c:end"]
+    stats = scheduler.stats()
+    assert (stats["turns"], stats["waited"], stats["active_sessions"]) == (3, 2, 0)
+
+
+async def test_sessions_do_not_wait_on_each_other():
+    scheduler = SessionScheduler()
+    log = []
+    
+    await asyncio.gather(run_turn(scheduler, "s-1", "a", log), run_turn(scheduler, "s-2", "b", log))
+    
+    assert log[:2] == ["a:start", "b:start"]
+    assert scheduler.stats()["waited"] == 0
+
+
+async def test_too_many_queued_turns_are_refused():
+    scheduler = SessionScheduler(max_turns_per_session=2)
+    release = asyncio.Event()
+    
+    async def hold():
+        async with scheduler.turn("s-1"):
+            await release.wait()
+    
+    holders = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued_turns"] == 1
+    
+    with pytest.raises(SessionBusy) as busy:
+        async with scheduler.turn("s-1"):
+            pass
+    
+    assert busy.value.queued == 2
+    assert scheduler.stats()["rejected"] == 1
+    # Other sessions are unaffected
+    async with scheduler.turn("s-2"):
+        pass
+    release.set()
+    await asyncio.gather(*holders)
+    assert scheduler.stats()["active_sessions"] == 0
+
+
+async def test_failed_or_cancelled_turns_free_the_session():
+    scheduler = SessionScheduler()
+    
+    with pytest.raises(ValueError):
+        async with scheduler.turn("s-1"):
+            raise ValueError("agent failure")
+    waiting = asyncio.create_task(run_turn(scheduler, "s-1", "a", [], delay=1))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    
+    assert scheduler.stats()["active_sessions"] == 0
+    async with scheduler.turn("s-1"):
+        pass
+
+
+async def test_disabled_scheduler_lets_turns_overlap(monkeypatch):
+    monkeypatch.setenv("SESSION_SERIALIZE_TURNS", "false")
+    scheduler = create_session_scheduler()
+    log = []
+    
+    await asyncio.gather(run_turn(scheduler, "s-1", "a", log), run_turn(scheduler, "s-1", "b", log))
+    
+    assert log[:2] == ["a:start", "b:start"]
+    assert scheduler.stats()["active_sessions"] == 0
+
+
+class SlowAgent:
+    name, role = "Slow", "Test"
+    
+    def __init__(self, log: list):
+        self.log = log
+    
+    async def process(self, state):
+        self.log.append(f"{state.user_input}:start")
+        await asyncio.sleep(0.01)
+        self.log.append(f"{state.user_input}:end")
+        return state.user_input
+    
+    def is_low_cost(self, message):
+        return False
+
+
+async def test_orchestrator_serializes_turns_of_one_session():
+    log = []
+    orchestrator = Orchestrator(execution_mode="direct")
+    orchestrator.registry.register("marie", SlowAgent(log))
+    
+    results = await asyncio.gather(
+        orchestrator.invoke("marie", "q1", "s-1"),
+        orchestrator.invoke("marie", "q2", "s-1"),
+        orchestrator.invoke("marie", "q3", "s-2")
+    )
+    
+    assert [result["message"] for result in results] == ["q1", "q2", "q3"]
+    assert log.index("q1:end") < log.index("q2:start")
+    assert log.index("q3:start") < log.index("q1:end")
+
+
+def test_busy_session_gets_a_429():
+    from fastapi.testclient import TestClient
+    from src.main import app
+    from src.orchestrator import get_orchestrator
+    
+    with TestClient(app) as client:
+        get_orchestrator().scheduler.max_turns_per_session = 0
+        response = client.post("/agents/marie/chat", json={"message": "Bonjour", "session_id": "s-busy"})
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_busy_session_gets_a_429_from_fanout():
+    from fastapi.testclient import TestClient
+    from src.main import app
+    from src.orchestrator import get_orchestrator
+    
+    with TestClient(app) as client:
+        get_orchestrator().scheduler.max_turns_per_session = 0
+        response = client.post(
+            "/chat/fanout", json={"message": "logo", "session_id": "s-busy", "agents": ["hugo"]}
+        )
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
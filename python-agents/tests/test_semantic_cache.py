@@ -0,0 +1,92 @@
+"""
+Semantic answer cache: matching, eviction and knowledge base updates
+"""
+
+import asyncio
+
+import pytest
+
+from src.agents.marie_support import MarieAgentV2
+from src.memory import SemanticCache, get_semantic_cache
+from src.orchestrator import AgentState
+from src.rag import Document
+
+from .conftest import ScriptedProvider
+
+
+def test_paraphrase_hits_in_the_same_context_only():
+    cache = SemanticCache(threshold=0.6)
+    cache.store("pricing", "Quels sont vos tarifs pour un site vitrine ?", "299€")
+    
+    assert cache.lookup("pricing", "Combien coûte un site vitrine ?") == "299€"
+    assert cache.lookup("delivery", "Combien coûte un site vitrine ?") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = SemanticCache(threshold=0.9, max_entries=2)
+    cache.store("k", "site vitrine", "a")
+    cache.store("k", "boutique en ligne", "b")
+    cache.lookup("k", "site vitrine")  # refreshes the first entry
+    
+    cache.store("k", "refonte graphique", "c")
+    
+    assert cache.lookup("k", "site vitrine") == "a"
+    assert cache.lookup("k", "boutique en ligne") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_lfu_evicts_the_least_frequently_used():
+    cache = SemanticCache(threshold=0.9, max_entries=2, eviction="lfu")
+    cache.store("k", "site vitrine", "a")
+    cache.store("k", "boutique en ligne", "b")
+    for _ in range(3):
+        cache.lookup("k", "boutique en ligne")
+    cache.lookup("k", "site vitrine")
+    
+    cache.store("k", "refonte graphique", "c")
+    
+    assert cache.lookup("k", "boutique en ligne") == "b"
+    assert cache.lookup("k", "site vitrine") is None
+
+
+@pytest.mark.parametrize("eviction", ["lru", "lfu"])
+def test_size_stays_bounded(eviction):
+    cache = SemanticCache(max_entries=50, eviction=eviction)
+    for index in range(500):
+        cache.store(f"k{index % 7}", f"question numero {index}", "réponse")
+        cache.lookup(f"k{index % 7}", f"question numero {index // 2}")
+    
+    assert cache.stats()["size"] == 50
+    assert cache.stats()["evictions"] == 450
+
+
+def test_invalidate_drops_matching_context_keys():
+    cache = SemanticCache()
+    cache.store("v1|pricing", "tarifs site vitrine", "a")
+    cache.store("v1|delivery", "délai site vitrine", "b")
+    cache.store("v2|pricing", "tarifs site vitrine", "c")
+    
+    assert cache.invalidate("v1|") == 2
+    assert cache.stats()["size"] == 1
+    assert cache.lookup("v2|pricing", "tarifs site vitrine") == "c"
+
+
+async def test_knowledge_base_update_drops_cached_answers(install_router):
+    router = install_router(claude=ScriptedProvider(chunks=["Un site vitrine coûte 299€"]))
+    agent = MarieAgentV2()
+    state = AgentState(
+        user_input="Je voudrais un site vitrine pour mon restaurant, vous proposez quoi ?",
+        session_id="s-kb",
+        current_agent="marie"
+    )
+    await agent.process(state)
+    assert get_semantic_cache().stats()["size"] == 1
+    assert router.cache.stats()["size"] == 1
+    
+    agent.rag.kb.add_document(Document(id="promo", content="Promotion: -20% sur les sites vitrines", metadata={}))
+    await asyncio.sleep(0)
+    
+    assert get_semantic_cache().stats()["size"] == 0
+    assert router.cache.stats()["size"] == 0
@@ -0,0 +1,56 @@
+"""
+Production launcher: configuration and the multi-worker safety check
+"""
+
+import re
+from pathlib import Path
+
+from src.server import ServerConfig, check_shared_state
+
+
+def test_one_worker_by_default():
+    assert ServerConfig.from_env().workers == 1
+
+
+def test_worker_count_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SERVER_WORKERS", "4")
+    assert ServerConfig.from_env().workers == 4
+    
+    monkeypatch.setenv("SERVER_WORKERS", "0")
+    assert ServerConfig.from_env().workers == 1
+
+
+def test_single_worker_needs_no_shared_state():
+    assert check_shared_state(1) == []
+
+
+def test_several_workers_need_redis():
+    problems = check_shared_state(2)
+    
+    assert len(problems) == 1
+    assert "REDIS_URL" in problems[0]
+
+
+def test_several_workers_with_redis_are_safe(monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "redis://redis:6379")
+    
+    assert check_shared_state(2) == []
+
+
+def test_process_local_sessions_and_jobs_are_refused(monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "redis://redis:6379")
+    monkeypatch.setenv("SESSION_CHECKPOINT", "false")
+    monkeypatch.setenv("JOBS_BACKEND", "memory")
+    
+    problems = check_shared_state(2)
+    
+    assert any("SESSION_CHECKPOINT" in problem for problem in problems)
+    assert any("JOBS_BACKEND" in problem for problem in problems)
+
+
+def test_image_defaults_start_without_redis(monkeypatch):
+    dockerfile = (Path(__file__).parents[1] / "Dockerfile").read_text()
+    workers = re.search(r"^ENV SERVER_WORKERS=(\d+)$", dockerfile, re.MULTILINE).group(1)
+    monkeypatch.setenv("SERVER_WORKERS", workers)
+    
+    assert check_shared_state(ServerConfig.from_env().workers) == []
@@ -0,0 +1,159 @@
+"""
+Load shedding: watermarks, and cached answers under pressure
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.memory import get_conversation_memory
+from src.orchestrator import LoadLevel, LoadShed, LoadShedder, get_orchestrator
+from src.orchestrator.shedding import check_llm_call
+
+from .conftest import ScriptedProvider
+
+
+QUESTION = "Je voudrais un site vitrine pour mon restaurant, vous proposez quoi ?"
+
+
+def shedder_at(in_flight: int) -> LoadShedder:
+    shedder = LoadShedder(soft_in_flight=2, hard_in_flight=4, retry_after_seconds=1.5)
+    shedder.in_flight = in_flight
+    return shedder
+
+
+def test_normal_load_admits_everything():
+    shedder = shedder_at(0)
+    
+    with shedder.admit(lambda: False):
+        check_llm_call()
+        assert shedder.in_flight == 1
+    
+    assert shedder.in_flight == 0
+    assert shedder.stats()["admitted"] == 1
+
+
+def test_hard_watermark_sheds_with_503():
+    shedder = shedder_at(4)
+    
+    with pytest.raises(LoadShed) as shed:
+        shedder.acquire(lambda: True)
+    
+    assert shed.value.status_code == 503
+    assert shed.value.retry_after == 3.0
+    assert shedder.in_flight == 4
+
+
+def test_soft_watermark_admits_low_cost_requests():
+    shedder = shedder_at(2)
+    
+    with shedder.admit(lambda: True):
+        check_llm_call()
+    
+    assert shedder.stats()["admitted_low_cost"] == 1
+    assert shedder.stats()["shed_429"] == 0
+
+
+def test_soft_watermark_sheds_at_the_llm_call():
+    shedder = shedder_at(2)
+    
+    with pytest.raises(LoadShed) as shed:
+        with shedder.admit(lambda: False):
+            check_llm_call()
+    
+    assert shed.value.status_code == 429
+    assert shed.value.level == LoadLevel.ELEVATED
+    stats = shedder.stats()
+    assert (stats["admitted_cache_only"], stats["shed_429"], stats["served_cache_only"]) == (1, 1, 0)
+    assert shedder.in_flight == 2
+
+
+def test_cache_only_request_answered_without_the_llm():
+    shedder = shedder_at(2)
+    
+    with shedder.admit(lambda: False):
+        pass
+    
+    assert shedder.stats()["served_cache_only"] == 1
+
+
+def test_llm_call_allowed_once_pressure_eased():
+    shedder = shedder_at(2)
+    
+    with shedder.admit(lambda: False):
+        shedder.in_flight = 1
+        check_llm_call()
+    
+    assert shedder.stats()["shed_429"] == 0
+
+
+def test_cache_probe_miss_sheds_at_admission():
+    shedder = shedder_at(2)
+    
+    with pytest.raises(LoadShed) as shed:
+        shedder.acquire(lambda: False, lambda: False)
+    
+    assert shed.value.status_code == 429
+    stats = shedder.stats()
+    assert (stats["admitted_cache_only"], stats["shed_429"]) == (0, 1)
+    assert shedder.in_flight == 2
+
+
+async def test_llm_call_made_in_a_child_task_is_seen_at_release():
+    shedder = shedder_at(2)
+    
+    async def call_llm() -> None:
+        check_llm_call()
+    
+    with shedder.admit(lambda: False, lambda: True) as ticket:
+        shedder.in_flight = 1
+        await asyncio.create_task(call_llm())
+        assert ticket.cache_only is False
+    
+    assert shedder.stats()["served_cache_only"] == 0
+
+
+async def test_router_serves_response_cache_hits_under_pressure(install_router):
+    provider = ScriptedProvider(chunks=["299€"])
+    router = install_router(claude=provider)
+    messages = [{"role": "user", "content": "Prix d'un site vitrine ?"}]
+    await router.complete(messages, cache=True, temperature=0.2)
+    shedder = shedder_at(2)
+    
+    with shedder.admit(lambda: False):
+        cached = await router.complete(messages, cache=True, temperature=0.2)
+    with pytest.raises(LoadShed):
+        with shedder.admit(lambda: False):
+            await router.complete([{"role": "user", "content": "Et un e-commerce ?"}], cache=True, temperature=0.2)
+    
+    assert cached.provider == "cache"
+    assert provider.calls == 1
+
+
+def test_chat_under_pressure_is_served_from_the_semantic_cache(install_router):
+    provider = ScriptedProvider(chunks=["Un site vitrine coûte 299€"])
+    install_router(claude=provider)
+    from src.main import app
+    
+    with TestClient(app) as client:
+        warm = client.post("/agents/marie/chat", json={"message": QUESTION, "session_id": "s-warm"})
+        shedder = get_orchestrator().shedder
+        shedder.in_flight = shedder.soft_in_flight
+        cached = client.post("/agents/marie/chat", json={"message": QUESTION, "session_id": "s-cached"})
+        shed = client.post(
+            "/agents/marie/chat",
+            json={"message": "Combien pour refaire le logo de ma boutique ?", "session_id": "s-shed"}
+        )
+        shedder.in_flight = 0
+    
+    assert warm.status_code == 200
+    assert cached.status_code == 200
+    assert cached.json()["message"] == "Un site vitrine coûte 299€"
+    assert provider.calls == 1
+    assert shed.status_code == 429
+    assert shed.headers["Retry-After"] == "2"
+    # Shed by the cache probe, before running the pipeline
+    assert shedder.stats()["admitted_cache_only"] == 1
+    # The shed question isn't left in the history: the client asks again
+    assert get_conversation_memory().get_messages("s-shed") == []
@@ -0,0 +1,124 @@
+"""
+Single-flight coalescing of identical LLM requests
+"""
+
+import asyncio
+
+import pytest
+
+from src.llm.singleflight import SingleFlight
+from src.orchestrator.deadline import DeadlineExceeded, remaining, request_deadline, within
+
+from .conftest import ScriptedProvider
+
+
+class Call:
+    """Shared work that counts its runs and can be held open"""
+    
+    def __init__(self, result="answer", delay=0.05, error=None):
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.runs = 0
+        self.cancelled = False
+        self.deadline_seen = "unset"
+    
+    async def __call__(self):
+        self.runs += 1
+        self.deadline_seen = remaining()
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+async def test_concurrent_callers_share_one_call():
+    flight, call = SingleFlight(), Call()
+    
+    results = await asyncio.gather(*[flight.do("k", call) for _ in range(5)])
+    
+    assert results == ["answer"] * 5
+    assert call.runs == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_errors_are_shared():
+    flight, call = SingleFlight(), Call(error=ValueError("provider down"))
+    
+    results = await asyncio.gather(*[flight.do("k", call) for _ in range(3)], return_exceptions=True)
+    
+    assert all(isinstance(result, ValueError) for result in results)
+    assert call.runs == 1
+
+
+async def test_one_caller_cancelled_leaves_the_others_served():
+    flight, call = SingleFlight(), Call(delay=0.1)
+    
+    first = asyncio.create_task(flight.do("k", call))
+    second = asyncio.create_task(flight.do("k", call))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    
+    assert await second == "answer"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert not call.cancelled
+
+
+async def test_last_caller_leaving_cancels_the_call():
+    flight, call = SingleFlight(), Call(delay=1.0)
+    
+    callers = [asyncio.create_task(flight.do("k", call)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+    
+    assert call.cancelled
+    assert flight.stats()["abandoned"] == 1
+
+
+async def test_shared_call_ignores_the_first_callers_deadline():
+    flight, call = SingleFlight(), Call(delay=0.1)
+    
+    async def short_budget():
+        with request_deadline(0.02):
+            return await within(flight.do("k", call), "llm")
+    
+    async def no_budget():
+        await asyncio.sleep(0.005)
+        return await within(flight.do("k", call), "llm")
+    
+    first, second = await asyncio.gather(short_budget(), no_budget(), return_exceptions=True)
+    
+    assert isinstance(first, DeadlineExceeded)
+    assert second == "answer"
+    assert call.runs == 1
+    assert call.deadline_seen is None
+
+
+async def test_router_waiters_keep_their_own_deadlines(install_router):
+    provider = ScriptedProvider(chunks=["Réponse"], delay=0.1)
+    router = install_router(claude=provider)
+    messages = [{"role": "user", "content": "Quel est le délai ?"}]
+    
+    async def short_budget():
+        with request_deadline(0.02):
+            return await router.complete(messages, model="claude-test")
+    
+    async def longer_budget():
+        await asyncio.sleep(0.005)
+        with request_deadline(5):
+            return await router.complete(messages, model="claude-test")
+    
+    first, second = await asyncio.gather(short_budget(), longer_budget(), return_exceptions=True)
+    
+    assert isinstance(first, DeadlineExceeded)
+    assert second.text == "Réponse"
+    assert provider.calls == 1
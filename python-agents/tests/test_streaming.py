@@ -0,0 +1,98 @@
+"""
+Streamed answers: MARIE's streaming pipeline and the SSE endpoint
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.agents.marie_support import MarieAgentV2
+from src.memory import get_conversation_memory, get_semantic_cache
+from src.orchestrator import AgentState
+
+from .conftest import ScriptedProvider
+
+
+QUESTION = "Je voudrais un site vitrine pour mon restaurant, vous proposez quoi ?"
+
+
+async def collect(agent: MarieAgentV2, session_id: str) -> list:
+    state = AgentState(user_input=QUESTION, session_id=session_id, current_agent="marie")
+    return [chunk async for chunk in agent.process_stream(state)]
+
+
+def sse_events(body: str) -> list:
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+async def test_completed_stream_is_remembered_and_cached(install_router):
+    router = install_router(claude=ScriptedProvider(chunks=["Un site", " vitrine", " coûte..."]))
+    agent = MarieAgentV2()
+    
+    chunks = await collect(agent, "s-ok")
+    
+    assert "".join(chunks) == "Un site vitrine coûte..."
+    history = get_conversation_memory().get_messages("s-ok")
+    assert [m["role"] for m in history] == ["user", "assistant"]
+    assert history[-1]["content"] == "Un site vitrine coûte..."
+    assert get_semantic_cache().stats()["size"] == 1
+    assert router.cache.stats()["size"] == 1
+
+
+async def test_failure_mid_stream_raises_and_keeps_nothing(install_router):
+    router = install_router(claude=ScriptedProvider(chunks=["Un site", " vitrine", " coûte..."], fail_after=2))
+    agent = MarieAgentV2()
+    state = AgentState(user_input=QUESTION, session_id="s-cut", current_agent="marie")
+    
+    received = []
+    with pytest.raises(RuntimeError):
+        async for chunk in agent.process_stream(state):
+            received.append(chunk)
+    
+    assert received == ["Un site", " vitrine"]
+    history = get_conversation_memory().get_messages("s-cut")
+    assert [m["role"] for m in history] == ["user"]
+    assert get_semantic_cache().stats()["size"] == 0
+    assert router.cache.stats()["size"] == 0
+
+
+async def test_failure_before_first_chunk_falls_back(install_router):
+    install_router(claude=ScriptedProvider(fail_after=0))
+    agent = MarieAgentV2()
+    
+    chunks = await collect(agent, "s-fallback")
+    
+    assert len(chunks) == 1
+    assert chunks[0] == agent._get_fallback_response(agent.analyzer.analyze(QUESTION).sentiment)
+    assert get_semantic_cache().stats()["size"] == 0
+
+
+def test_sse_reports_error_instead_of_done_when_cut_off(install_router):
+    install_router(claude=ScriptedProvider(chunks=["Un site", " vitrine", " coûte..."], fail_after=1))
+    from src.main import app
+    
+    with TestClient(app) as client:
+        response = client.post(
+            "/agents/marie/chat/stream",
+            json={"message": QUESTION, "session_id": "s-sse"}
+        )
+    
+    events = sse_events(response.text)
+    assert [event["type"] for event in events] == ["token", "error"]
+    assert events[0]["content"] == "Un site"
+
+
+def test_sse_streams_tokens_then_done(install_router):
+    install_router(claude=ScriptedProvider(chunks=["Un site", " vitrine"]))
+    from src.main import app
+    
+    with TestClient(app) as client:
+        response = client.post(
+            "/agents/marie/chat/stream",
+            json={"message": QUESTION, "session_id": "s-sse-ok"}
+        )
+    
+    events = sse_events(response.text)
+    assert [event["type"] for event in events] == ["token", "token", "done"]
+    assert events[-1]["message"] == "Un site vitrine"
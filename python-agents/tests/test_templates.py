@@ -0,0 +1,105 @@
+"""
+Template fast path for greetings, thanks and goodbyes
+"""
+
+import json
+from dataclasses import replace
+
+from src.agents.marie_support import MarieAgentV2
+from src.agents.templates import DEFAULT_TEMPLATES, ResponseTemplates, load_templates
+from src.analysis import Sentiment, get_text_analyzer
+from src.orchestrator import Orchestrator
+
+from .conftest import ScriptedProvider
+
+
+def answer(templates: ResponseTemplates, text: str, **overrides):
+    analysis = replace(get_text_analyzer().analyze(text), **overrides)
+    return templates.respond(text, analysis)
+
+
+def test_greeting_is_answered_and_variants_rotate():
+    templates = ResponseTemplates()
+    
+    first, second = answer(templates, "Bonjour"), answer(templates, "Bonjour !")
+    
+    assert [first, second] == DEFAULT_TEMPLATES["greeting"]["fr"]["default"]
+    assert templates.stats()["served_by_intent"] == {"greeting": 2}
+
+
+def test_reply_follows_language_and_sentiment():
+    templates = ResponseTemplates()
+    
+    assert answer(templates, "thanks") == DEFAULT_TEMPLATES["thanking"]["en"]["default"][0]
+    assert answer(templates, "Merci beaucoup") == DEFAULT_TEMPLATES["thanking"]["fr"]["positive"][0]
+    assert answer(templates, "Au revoir") in DEFAULT_TEMPLATES["saying_goodbye"]["fr"]["default"]
+
+
+def test_real_requests_go_to_the_llm():
+    templates = ResponseTemplates(max_words=10)
+    
+    assert answer(templates, "Bonjour, quels sont vos tarifs ?") is None
+    assert answer(templates, "Bonjour, un devis svp") is None
+    assert answer(ResponseTemplates(), "Bonjour je veux un site e-commerce") is None
+    assert answer(templates, "Je veux un site vitrine") is None
+
+
+def test_sarcasm_and_upset_customers_go_to_the_llm():
+    templates = ResponseTemplates()
+    
+    assert answer(templates, "merci pour rien") is None
+    assert answer(templates, "Merci", sentiment=Sentiment.FRUSTRATED) is None
+
+
+def test_explicit_template_for_a_sensitive_sentiment_is_used():
+    custom = {"thanking": {"fr": {"negative": ["Désolée, je transmets à l'équipe."]}}}
+    templates = ResponseTemplates(templates=custom)
+    
+    assert answer(templates, "Merci", sentiment=Sentiment.NEGATIVE) == "Désolée, je transmets à l'équipe."
+
+
+def test_disabled_fast_path_answers_nothing():
+    templates = ResponseTemplates(enabled=False)
+    analysis = get_text_analyzer().analyze("Bonjour")
+    
+    assert templates.respond("Bonjour", analysis) is None
+    assert not templates.would_answer("Bonjour", analysis)
+    assert templates.stats()["served_ratio"] == 0.0
+
+
+def test_would_answer_leaves_the_counters_alone():
+    templates = ResponseTemplates()
+    
+    assert templates.would_answer("Bonjour", get_text_analyzer().analyze("Bonjour"))
+    assert templates.stats()["turns"] == 0
+
+
+def test_file_overrides_merge_into_the_defaults(tmp_path):
+    path = tmp_path / "templates.json"
+    path.write_text(json.dumps({"greeting": {"fr": {"default": ["Salut !"]}}}), encoding="utf-8")
+    
+    templates = load_templates(str(path))
+    
+    assert templates["greeting"]["fr"]["default"] == ["Salut !"]
+    assert templates["greeting"]["en"] == DEFAULT_TEMPLATES["greeting"]["en"]
+    assert templates["thanking"] == DEFAULT_TEMPLATES["thanking"]
+    # The defaults themselves are untouched
+    assert DEFAULT_TEMPLATES["greeting"]["fr"]["default"] != ["Salut !"]
+
+
+def test_unreadable_file_keeps_the_defaults(tmp_path):
+    assert load_templates(str(tmp_path / "missing.json")) == DEFAULT_TEMPLATES
+
+
+async def test_marie_answers_a_greeting_without_the_llm(install_router):
+    provider = ScriptedProvider(chunks=["LLM"])
+    install_router(claude=provider)
+    
+    orchestrator = Orchestrator()
+    orchestrator.registry.register("marie", MarieAgentV2())
+    
+    result = await orchestrator.invoke("marie", "Bonjour", "s-hello")
+    
+    assert result["success"] is True
+    assert result["message"] in DEFAULT_TEMPLATES["greeting"]["fr"]["default"]
+    assert provider.calls == 0
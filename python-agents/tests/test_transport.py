@@ -0,0 +1,195 @@
+"""
+Shared HTTP pools: lifecycle, HTTP/2 fallback and traffic counters
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.transport import HTTPTransport, PoolConfig
+from src.transport import pool as pool_module
+
+
+class SDKClient(httpx.AsyncClient):
+    """Stands for an SDK's own client class (e.g. anthropic.DefaultAsyncHttpxClient)"""
+
+
+@pytest.fixture
+def created(monkeypatch):
+    """Pools served by a mock transport; keeps the arguments of every inner transport"""
+    created = []
+    
+    async def body():
+        yield b"chunk-1 "
+        yield b"chunk-2"
+    
+    def handler(request):
+        if request.url.path == "/down":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, content=body())
+    
+    def mock_transport(**kwargs):
+        created.append(kwargs)
+        return httpx.MockTransport(handler)
+    
+    monkeypatch.setattr(pool_module.httpx, "AsyncHTTPTransport", mock_transport)
+    return created
+
+
+def transport_with(**config) -> HTTPTransport:
+    return HTTPTransport(pools={"llm": PoolConfig(**config)})
+
+
+async def test_streamed_request_is_in_flight_until_its_body_is_closed(created):
+    transport = transport_with()
+    client = transport.client("llm")
+    
+    async with client.stream("GET", "https://api.example.com/v1/messages") as response:
+        during = transport.stats()["pools"]["llm"]
+        body = await response.aread()
+    after = transport.stats()["pools"]["llm"]
+    
+    assert body == b"chunk-1 chunk-2"
+    assert during["in_flight"] == 1
+    assert (after["in_flight"], after["requests"], after["peak_in_flight"]) == (0, 1, 1)
+    await transport.aclose()
+
+
+async def test_failed_request_is_counted_and_released(created):
+    transport = transport_with()
+    
+    with pytest.raises(httpx.ConnectError):
+        await transport.client("llm").get("https://api.example.com/down")
+    
+    stats = transport.stats()["pools"]["llm"]
+    assert (stats["requests"], stats["errors"], stats["in_flight"]) == (1, 1, 0)
+    await transport.aclose()
+
+
+async def test_sdk_client_shares_the_pool_counters(created):
+    transport = transport_with()
+    
+    sdk_client = transport.client("llm", SDKClient)
+    await sdk_client.get("https://api.example.com/v1/messages")
+    await transport.client("llm").get("https://api.example.com/v1/messages")
+    
+    assert isinstance(sdk_client, SDKClient)
+    assert transport.client("llm", SDKClient) is sdk_client
+    stats = transport.stats()["pools"]["llm"]
+    assert (stats["clients"], stats["requests"]) == (2, 2)
+    
+    await transport.aclose()
+    assert transport.stats()["pools"]["llm"]["clients"] == 0
+    assert transport.client("llm", SDKClient) is not sdk_client
+
+
+async def test_http11_requests_beyond_the_limit_are_queued(created, monkeypatch):
+    monkeypatch.setattr(pool_module, "HTTP2_AVAILABLE", True)
+    transport = transport_with(max_connections=1, http2=False)
+    client = transport.client("llm")
+    
+    async with client.stream("GET", "https://api.example.com/a"):
+        async with client.stream("GET", "https://api.example.com/b"):
+            stats = transport.stats()["pools"]["llm"]
+    
+    assert created == [{"http2": False, "limits": created[0]["limits"]}]
+    assert (stats["in_flight"], stats["queued_requests"], stats["utilization"]) == (2, 1, 1.0)
+    await transport.aclose()
+
+
+async def test_without_h2_pools_fall_back_to_http11(created, monkeypatch):
+    monkeypatch.setattr(pool_module, "HTTP2_AVAILABLE", False)
+    transport = transport_with(http2=True)
+    
+    await transport.client("llm").get("https://api.example.com/v1/messages")
+    
+    assert created[0]["http2"] is False
+    stats = transport.stats()
+    assert stats["http2_available"] is False
+    assert stats["pools"]["llm"]["http2"] is False
+    await transport.aclose()
+
+
+def test_unknown_pool_is_rejected():
+    with pytest.raises(KeyError):
+        transport_with().client("search")
+
+
+@pytest.fixture
+def anthropic_upstream(monkeypatch):
+    """Anthropic SDK pools (httpx2 based) served by a mock Messages API"""
+    httpx2 = pytest.importorskip("httpx2")
+    requests = []
+    
+    message = json.dumps({
+        "id": "msg_1",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-sonnet-4-20250514",
+        "content": [{"type": "text", "text": "Bonjour"}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 12, "output_tokens": 3}
+    }).encode()
+    
+    async def body():
+        yield message
+    
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        return httpx2.Response(200, headers={"content-type": "application/json"}, content=body())
+    
+    monkeypatch.setattr(httpx2, "AsyncHTTPTransport", lambda **kwargs: httpx2.MockTransport(handler))
+    return requests
+
+
+async def test_real_anthropic_client_runs_over_the_pool(anthropic_upstream):
+    import anthropic
+    
+    transport = transport_with()
+    http_client = transport.client("llm", anthropic.DefaultAsyncHttpxClient)
+    client = anthropic.AsyncAnthropic(api_key="sk-test", http_client=http_client)
+    
+    message = await client.messages.create(
+        model="claude-sonnet-4-20250514",
+        max_tokens=64,
+        messages=[{"role": "user", "content": "Salut"}]
+    )
+    
+    assert (message.content[0].text, message.usage.input_tokens) == ("Bonjour", 12)
+    assert anthropic_upstream == [("POST", "/v1/messages")]
+    stats = transport.stats()["pools"]["llm"]
+    assert (stats["requests"], stats["in_flight"]) == (1, 0)
+    await transport.aclose()
+
+
+async def test_router_builds_claude_over_the_shared_pool(anthropic_upstream, monkeypatch):
+    from src.llm.router import LLMRouter
+    
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.delenv("ANTHROPIC_BASE_URL", raising=False)
+    
+    router = LLMRouter()
+    
+    assert "claude" in router.providers
+    url, client = router.providers["claude"].preconnect_target
+    assert url == "https://api.anthropic.com"
+    assert type(client).__name__ == "_DefaultAsyncHttpxClient"
+
+
+async def test_preconnect_warms_the_client_each_provider_holds(anthropic_upstream, created):
+    import anthropic
+    
+    transport = transport_with()
+    sdk_client = transport.client("llm", anthropic.DefaultAsyncHttpxClient)
+    
+    await transport.preconnect([
+        ("https://api.anthropic.com", sdk_client),
+        ("https://llm.internal/v1", transport.client("llm"))
+    ])
+    
+    assert anthropic_upstream == [("HEAD", "/")]
+    assert transport.stats()["preconnect"]["https://api.anthropic.com"]["pool"] == "llm"
+    assert transport.stats()["pools"]["llm"]["requests"] == 2
+    await transport.aclose()
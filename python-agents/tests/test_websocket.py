@@ -0,0 +1,156 @@
+"""
+WebSocket conversations
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from .conftest import ScriptedProvider
+
+
+QUESTION = "Je voudrais un site vitrine pour mon restaurant, vous proposez quoi ?"
+
+
+def receive_turn(ws) -> list:
+    """Frames of one turn, up to its `done` or `error`"""
+    frames = []
+    while True:
+        frame = ws.receive_json()
+        frames.append(frame)
+        if frame["type"] in ("done", "error"):
+            return frames
+
+
+def test_turn_streams_tokens_then_done(install_router):
+    install_router(claude=ScriptedProvider(chunks=["Un site", " vitrine"]))
+    from src.main import app
+    
+    with TestClient(app) as client, client.websocket_connect("/agents/marie/ws?session_id=ws-1") as ws:
+        assert ws.receive_json() == {"type": "ready", "session_id": "ws-1"}
+        ws.send_json({"type": "message", "message": QUESTION, "id": "t1"})
+        frames = receive_turn(ws)
+        
+        ws.send_json({"type": "state"})
+        state = ws.receive_json()
+    
+    assert [frame["type"] for frame in frames] == ["token", "token", "done"]
+    assert all(frame["id"] == "t1" for frame in frames)
+    assert frames[-1]["message"] == "Un site vitrine"
+    assert state["turns"] == 1
+    assert state["history"] == [
+        {"role": "user", "content": QUESTION},
+        {"role": "assistant", "content": "Un site vitrine"}
+    ]
+    assert state["analysis"]["last_intent"]
+
+
+def test_pipelined_turns_run_in_order(install_router):
+    install_router(claude=ScriptedProvider(chunks=["Réponse"]))
+    from src.main import app
+    
+    with TestClient(app) as client, client.websocket_connect("/agents/marie/ws") as ws:
+        ws.receive_json()
+        for turn_id in (1, 2, 3):
+            ws.send_json({"message": f"{QUESTION} ({turn_id})", "id": turn_id})
+        done = [receive_turn(ws)[-1] for _ in range(3)]
+    
+    assert [frame["id"] for frame in done] == [1, 2, 3]
+    assert all(frame["type"] == "done" for frame in done)
+
+
+def test_bad_frames_get_errors_and_keep_the_connection(install_router):
+    install_router(claude=ScriptedProvider(chunks=["Réponse"]))
+    from src.main import app
+    
+    with TestClient(app) as client, client.websocket_connect("/agents/marie/ws") as ws:
+        ws.receive_json()
+        ws.send_bytes(b"\x00\x01")
+        binary = ws.receive_json()
+        ws.send_text("not json")
+        garbage = ws.receive_json()
+        ws.send_json({"type": "message", "message": ""})
+        empty = ws.receive_json()
+        ws.send_json({"type": "ping"})
+        pong = ws.receive_json()
+    
+    assert binary["type"] == "error" and "Binary" in binary["error"]
+    assert garbage["type"] == "error"
+    assert empty["type"] == "error"
+    assert pong == {"type": "pong"}
+
+
+def test_failure_mid_stream_ends_the_turn_with_an_error(install_router):
+    install_router(claude=ScriptedProvider(chunks=["Un site", " vitrine"], fail_after=1))
+    from src.main import app
+    
+    with TestClient(app) as client, client.websocket_connect("/agents/marie/ws") as ws:
+        ws.receive_json()
+        ws.send_json({"message": QUESTION, "id": 1})
+        frames = receive_turn(ws)
+        ws.send_json({"type": "state"})
+        state = ws.receive_json()
+    
+    assert [frame["type"] for frame in frames] == ["token", "error"]
+    assert state["turns"] == 0
+    assert [message["role"] for message in state["history"]] == ["user"]
+
+
+def test_unknown_agent_is_refused():
+    from src.main import app
+    
+    with TestClient(app) as client:
+        try:
+            with client.websocket_connect("/agents/nobody/ws") as ws:
+                ws.receive_json()
+        except WebSocketDisconnect as e:
+            assert e.code == 1008
+        else:
+            raise AssertionError("Connection should have been refused")
+
+
+class BrokenSocket:
+    """WebSocket whose sends start failing after the `ready` frame"""
+    
+    def __init__(self, frames):
+        self.incoming: "asyncio.Queue[dict]" = asyncio.Queue()
+        for frame in frames:
+            self.incoming.put_nowait({"type": "websocket.receive", "text": frame})
+        self.sent = []
+        self.closed = None
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, text):
+        if self.sent:
+            raise RuntimeError("Connection reset by peer")
+        self.sent.append(text)
+    
+    async def receive(self):
+        return await self.incoming.get()
+    
+    async def close(self, code=1000, reason=None):
+        self.closed = code
+
+
+async def test_send_failure_closes_the_connection():
+    from src.main import agent_chat_ws
+    from src.orchestrator import get_orchestrator
+    
+    class Agent:
+        name, role = "Stub", "Test"
+        
+        async def process_stream(self, state):
+            yield "partial"
+        
+        def is_low_cost(self, message):
+            return True
+    
+    get_orchestrator().registry.register("stub", Agent())
+    socket = BrokenSocket(['{"message": "bonjour"}', '{"message": "encore"}'])
+    
+    await asyncio.wait_for(agent_chat_ws(socket, "stub"), 2.0)
+    
+    assert socket.closed == 1011